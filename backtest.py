@@ -0,0 +1,119 @@
+"""
+离线回测脚本
+
+使用本地K线存储中的历史数据回测策略，策略参数、交易对和周期默认取config.py中的实盘配置，
+手续费、滑点、资金费率等取backtest_config
+
+使用方法:
+    python backtest.py                                  # 回测trading_config中配置的策略
+    python backtest.py dc_strategy --symbol BTC-USDT-SWAP --timeframe 1h
+    python backtest.py sar_emax_strategy --fetch        # 先从交易所补充K线到本地存储再回测
+    python backtest.py dc_strategy --trades trades.csv  # 导出逐笔交易记录
+"""
+
+import csv
+import argparse
+import datetime
+from core.backtester import Backtester
+from core.kline_store import KlineStore
+from core.logger_manager import logger_manager
+from config.config import trading_config, position_config, backtest_config, kline_store_config
+
+
+def load_history(symbol, timeframe, bars, fetch):
+    """
+    读取回测用的历史K线
+
+    Args:
+        symbol: 交易对
+        timeframe: 时间周期
+        bars: K线数量
+        fetch: 是否先从交易所获取K线写入本地存储
+
+    Returns:
+        tuple: (K线数组, 合约规格)，合约规格获取失败时为None
+    """
+    store = KlineStore.get_instance() or KlineStore(kline_store_config.get('path', '~/.lhcxy/kline_store'))
+    instrument = None
+
+    if fetch:
+        from core.trader import OkxTrader
+        # K线和合约规格都是公共接口，不需要API密钥
+        trader = OkxTrader('', '', '')
+        rows = trader.fetch_all_ohlcv(symbol, timeframe, bars)
+        written = store.append(symbol, timeframe, rows)
+        print(f"从交易所获取 {len(rows)} 根K线，写入本地存储 {written} 根")
+        response = trader.fetch_instrument(symbol)
+        if response and response.get('data'):
+            instrument = response['data'][0]
+
+    return store.read(symbol, timeframe, bars), instrument
+
+
+def main():
+    """主函数，处理命令行参数"""
+    parser = argparse.ArgumentParser(description='策略离线回测工具')
+    parser.add_argument('strategy', nargs='?', default=trading_config['strategy'], help='策略名称，默认使用trading_config中的策略')
+    parser.add_argument('--symbol', default=trading_config['symbol'], help='交易对')
+    parser.add_argument('--timeframe', default=trading_config['timeframe'], help='K线时间周期')
+    parser.add_argument('--bars', type=int, default=backtest_config.get('bars', 5000), help='回测K线数量')
+    parser.add_argument('--fetch', action='store_true', help='先从交易所获取K线写入本地存储')
+    parser.add_argument('--balance', type=float, default=backtest_config.get('initial_balance', 10000), help='初始资金(USDT)')
+    parser.add_argument('--fee', type=float, default=backtest_config.get('fee_rate', 0.0005), help='手续费率')
+    parser.add_argument('--slippage', type=float, default=backtest_config.get('slippage', 0.0002), help='滑点比例')
+    parser.add_argument('--funding', type=float, default=backtest_config.get('funding_rate', 0.0001), help='每8小时资金费率')
+    parser.add_argument('--ct-val', type=float, default=None, help='合约面值，默认从交易所获取（未获取时为1）')
+    parser.add_argument('--trades', default=None, help='导出逐笔交易记录的CSV文件路径')
+    args = parser.parse_args()
+
+    from main import get_strategy_class
+    strategy_class, strategy_config = get_strategy_class(args.strategy)
+
+    ohlcv, instrument = load_history(args.symbol, args.timeframe, args.bars, args.fetch)
+    if len(ohlcv) == 0:
+        print(f"本地没有{args.symbol} {args.timeframe}的K线数据，请使用--fetch从交易所获取")
+        return
+    instrument = dict(instrument or {})
+    if args.ct_val is not None:
+        instrument['ctVal'] = str(args.ct_val)
+
+    # 与实盘main.py相同的配置合并方式
+    config = {**trading_config, **strategy_config, **position_config,
+              'symbol': args.symbol, 'timeframe': args.timeframe}
+
+    backtester = Backtester(
+        strategy_class, config, ohlcv,
+        instrument=instrument,
+        initial_balance=args.balance,
+        fee_rate=args.fee,
+        slippage=args.slippage,
+        funding_rate=args.funding,
+        warmup_bars=backtest_config.get('warmup_bars', 100)
+    )
+    result = backtester.run()
+    metrics = result['metrics']
+
+    start = datetime.datetime.fromtimestamp(result['timestamps'][0] / 1000)
+    end = datetime.datetime.fromtimestamp(result['timestamps'][-1] / 1000)
+    print("=" * 50)
+    print(f"策略: {args.strategy}  交易对: {args.symbol}  周期: {args.timeframe}")
+    print(f"回测区间: {start:%Y-%m-%d %H:%M} ~ {end:%Y-%m-%d %H:%M}  共 {metrics['bars']} 根K线")
+    print(f"合约面值: {backtester.trader.face_value}")
+    print(f"初始资金: {metrics['initial_balance']:.2f}  最终资金: {metrics['final_balance']:.2f}")
+    print(f"总收益率: {metrics['total_return']:.2%}  最大回撤: {metrics['max_drawdown']:.2%}")
+    print(f"交易次数: {metrics['trades']}  胜率: {metrics['win_rate']:.2%}")
+    print(f"手续费: {metrics['total_fees']:.2f}  资金费: {metrics['total_funding']:.2f}")
+    print("=" * 50)
+
+    if args.trades and result['trades']:
+        with open(args.trades, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(result['trades'][0].keys()))
+            writer.writeheader()
+            writer.writerows(result['trades'])
+        print(f"交易记录已导出到 {args.trades}")
+
+    logger_manager.log_system("backtest", f"回测完成 {args.strategy} {args.symbol}: {metrics}", "info")
+
+
+if __name__ == "__main__":
+    main()
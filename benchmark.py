@@ -0,0 +1,334 @@
+"""
+策略流水线基准测试
+
+按StrategyTemplate.run()的步骤逐段计时：获取K线、on_bar（含取最新K线）、获取持仓、before_signal_generation（含DataFrame复制）、
+calculate_indicators、_print_indicator_data、generate_signals、after_signal_generation、_execute_trade。
+交易所使用进程内模拟器(OkxSimulator)回放固定种子生成的K线，不需要API密钥，不会下真实订单。
+结果写成JSON报告（包含提交号和运行环境），可以用--compare与之前的报告对比，发现热点路径的性能退化。
+
+说明：
+- 每轮计时前模拟时钟前进一根K线，与实盘每根新K线运行一次的情况一致
+- _execute_trade按OPEN_LONG、OPEN_SHORT、CLOSE_ALL轮流执行，保证每轮都走完下单路径；
+  其中等待交易所更新的time.sleep不计入耗时，报告中单独记录跳过的等待秒数
+- 运行期间工作目录切换到临时目录，持仓跟踪器写入的交易历史不会污染data/trade_history.json
+
+使用方法:
+    python benchmark.py                                        # 所有策略，1k/10k/100k根K线
+    python benchmark.py --strategies dc_strategy --bars 1000 10000 --repeats 10
+    python benchmark.py --output bench/current.json --compare bench/baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import datetime
+import tempfile
+import statistics
+import subprocess
+import logging
+import numpy as np
+from contextlib import contextmanager
+from core.trader import OkxTrader
+from core.okx_simulator import OkxSimulator
+from core.data_feed import KlineBuffer
+from core.logger_manager import logger_manager
+from core.signal_types import OPEN_LONG, OPEN_SHORT, CLOSE_ALL
+from core.time_utils import get_seconds_from_timeframe
+from config.config import trading_config, position_config
+from main import STRATEGY_MAPPING, get_strategy_class
+
+STAGES = [
+    'data_fetch',
+    'on_bar',
+    'fetch_position',
+    'before_signal_generation',
+    'calculate_indicators',
+    'print_indicator_data',
+    'generate_signals',
+    'after_signal_generation',
+    'execute_trade',
+]
+
+# _execute_trade轮流使用的信号
+FORCED_SIGNALS = [OPEN_LONG, OPEN_SHORT, CLOSE_ALL]
+
+
+def synthetic_ohlcv(n, timeframe, end_ms, seed=0, start_price=100.0):
+    """
+    生成固定种子的合成K线（几何布朗运动）
+
+    Args:
+        n: K线数量
+        timeframe: 时间周期
+        end_ms: 最后一根K线的开盘时间戳(毫秒)
+        seed: 随机种子
+        start_price: 起始价格
+
+    Returns:
+        list: [[timestamp, open, high, low, close, volume], ...]
+    """
+    rng = np.random.default_rng(seed)
+    timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+    timestamps = end_ms - timeframe_ms * np.arange(n - 1, -1, -1, dtype=np.int64)
+    returns = rng.normal(0, 0.01, n)
+    close = start_price * np.exp(np.cumsum(returns))
+    open_ = np.concatenate([[start_price], close[:-1]])
+    spread = np.abs(rng.normal(0, 0.004, (2, n)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.uniform(500, 1500, n)
+    rows = np.column_stack([timestamps, open_, high, low, close, volume])
+    return rows.tolist()
+
+
+@contextmanager
+def skip_sleep(counter):
+    """把time.sleep替换为只记录等待秒数，退出时恢复"""
+    original = time.sleep
+
+    def fake_sleep(seconds):
+        counter[0] += seconds
+
+    time.sleep = fake_sleep
+    try:
+        yield
+    finally:
+        time.sleep = original
+
+
+def run_stages(strategy, forced_signal):
+    """
+    按StrategyTemplate.run()的顺序执行一次完整流程，返回各阶段耗时(秒)
+
+    Args:
+        strategy: 策略实例
+        forced_signal: 传给_execute_trade的信号
+    """
+    timings = {}
+    clock = time.perf_counter
+
+    start = clock()
+    strategy.df = strategy.data_feed.update()
+    timings['data_fetch'] = clock() - start
+
+    start = clock()
+    strategy.on_bar(strategy.df.tail(1).iloc[0])
+    timings['on_bar'] = clock() - start
+
+    start = clock()
+    position = strategy.trader.fetch_position(strategy.symbol)
+    strategy.position_tracker.update_position(strategy.symbol, position)
+    timings['fetch_position'] = clock() - start
+
+    start = clock()
+    df_processed = strategy.before_signal_generation(strategy.df.copy())
+    timings['before_signal_generation'] = clock() - start
+
+    start = clock()
+    indicators_df = strategy.calculate_indicators(df_processed)
+    timings['calculate_indicators'] = clock() - start
+
+    start = clock()
+    strategy._print_indicator_data(indicators_df)
+    timings['print_indicator_data'] = clock() - start
+
+    start = clock()
+    signal = strategy.generate_signals(indicators_df)
+    timings['generate_signals'] = clock() - start
+
+    start = clock()
+    strategy.after_signal_generation(signal, indicators_df)
+    timings['after_signal_generation'] = clock() - start
+
+    start = clock()
+    strategy._execute_trade(forced_signal, indicators_df)
+    timings['execute_trade'] = clock() - start
+
+    return timings
+
+
+def bench_strategy(name, bars, repeats, timeframe, symbol, seed, incremental):
+    """
+    对单个策略在指定K线数量下计时
+
+    Returns:
+        dict: 各阶段的min/median/mean耗时(毫秒)及总耗时
+    """
+    strategy_class, strategy_config = get_strategy_class(name)
+    timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+
+    # 多生成repeats+1根K线，每轮计时前时钟前进一根
+    total_bars = bars + repeats + 1
+    end_ms = (int(time.time() * 1000) // timeframe_ms) * timeframe_ms
+    rows = synthetic_ohlcv(total_bars, timeframe, end_ms, seed)
+    now = [(rows[bars - 1][0] + 1000) / 1000]
+
+    simulator = OkxSimulator(instruments={symbol: (rows[0][1], 1.0)}, clock=lambda: now[0],
+                             max_ohlcv_limit=total_bars, seed=seed)
+    simulator.load_ohlcv(symbol, timeframe, rows)
+    trader = OkxTrader('', '', '', exchange=simulator)
+
+    config = {**trading_config, **strategy_config, **position_config,
+              'symbol': symbol, 'timeframe': timeframe, 'incremental_kline': incremental}
+    strategy = strategy_class(trader, config)
+    strategy.notification_manager = None  # 不发送通知
+    strategy.data_feed.store = None  # 不读写本地K线存储
+    strategy.data_feed.limit = bars
+    if strategy.data_feed.buffer is not None:
+        # 增量模式的K线缓冲区在DataFeed初始化时按默认数量分配，按本次K线数量重新分配
+        strategy.data_feed.buffer = KlineBuffer(bars, timeframe_ms)
+
+    samples = {stage: [] for stage in STAGES}
+    sleep_skipped = [0.0]
+    with skip_sleep(sleep_skipped):
+        # 第一轮用于预热（导入、JIT编译、缓存），不计入结果
+        run_stages(strategy, FORCED_SIGNALS[0])
+        for i in range(repeats):
+            now[0] += timeframe_ms / 1000
+            timings = run_stages(strategy, FORCED_SIGNALS[(i + 1) % len(FORCED_SIGNALS)])
+            for stage, seconds in timings.items():
+                samples[stage].append(seconds * 1000)
+
+    result = {}
+    for stage in STAGES:
+        values = samples[stage]
+        result[stage] = {
+            'min_ms': round(min(values), 4),
+            'median_ms': round(statistics.median(values), 4),
+            'mean_ms': round(statistics.fmean(values), 4),
+        }
+    result['total_median_ms'] = round(sum(result[stage]['median_ms'] for stage in STAGES), 4)
+    result['sleep_seconds_skipped'] = round(sleep_skipped[0], 3)
+    return result
+
+
+def environment_info():
+    """记录提交号和运行环境，保证报告可以跨提交对比"""
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except OSError:
+            return ''
+
+    import pandas as pd
+    try:
+        import numba
+        numba_version = numba.__version__
+    except ImportError:
+        numba_version = None
+
+    return {
+        'commit': git('rev-parse', 'HEAD'),
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+        'time': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'numba': numba_version,
+    }
+
+
+def compare(report, baseline, threshold):
+    """
+    与基准报告对比，打印变慢超过阈值的阶段
+
+    Args:
+        report: 本次报告
+        baseline: 基准报告
+        threshold: 允许的变慢比例，例如0.2表示慢20%以内不算退化
+
+    Returns:
+        list: 退化的(策略, K线数, 阶段, 基准耗时, 本次耗时)
+    """
+    regressions = []
+    for name, by_bars in report['results'].items():
+        for bars, stages in by_bars.items():
+            base_stages = baseline.get('results', {}).get(name, {}).get(bars)
+            if not base_stages:
+                continue
+            for stage in STAGES:
+                old = base_stages.get(stage, {}).get('median_ms')
+                new = stages[stage]['median_ms']
+                # 忽略0.05毫秒以下的阶段，避免计时噪声
+                if old and new > old * (1 + threshold) and new - old > 0.05:
+                    regressions.append((name, bars, stage, old, new))
+    return regressions
+
+
+def main():
+    """主函数，处理命令行参数"""
+    parser = argparse.ArgumentParser(description='策略流水线基准测试')
+    parser.add_argument('--strategies', nargs='+', default=list(STRATEGY_MAPPING), help='要测试的策略，默认全部')
+    parser.add_argument('--bars', nargs='+', type=int, default=[1000, 10000, 100000], help='K线数量')
+    parser.add_argument('--repeats', type=int, default=5, help='每组计时轮数（另有1轮预热）')
+    parser.add_argument('--timeframe', default='15m', help='K线时间周期')
+    parser.add_argument('--symbol', default='BENCH-USDT-SWAP', help='模拟交易对')
+    parser.add_argument('--seed', type=int, default=42, help='合成K线的随机种子')
+    parser.add_argument('--incremental', action='store_true', help='DataFeed使用增量模式')
+    parser.add_argument('--verbose', action='store_true', help='保留INFO日志输出（默认只输出WARNING以上）')
+    parser.add_argument('--output', default=None, help='JSON报告路径，默认benchmark_results/<提交号>.json')
+    parser.add_argument('--compare', default=None, help='用于对比的基准JSON报告')
+    parser.add_argument('--threshold', type=float, default=0.2, help='判定为性能退化的变慢比例')
+    args = parser.parse_args()
+
+    report = {
+        'meta': environment_info(),
+        'config': {
+            'timeframe': args.timeframe, 'repeats': args.repeats, 'seed': args.seed,
+            'incremental': args.incremental, 'sleep_excluded': True, 'stages': STAGES,
+        },
+        'results': {},
+    }
+    output = os.path.abspath(args.output or os.path.join(
+        'benchmark_results', f"{report['meta']['commit'][:10] or 'unknown'}.json"))
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if not args.verbose:
+        for name in ['strategy', 'position', 'system', 'trade', 'market']:
+            logger_manager.get_logger(name).setLevel(logging.WARNING)
+
+    original_dir = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix='lhcxy_bench_')
+    os.chdir(work_dir)
+    try:
+        for name in args.strategies:
+            report['results'][name] = {}
+            for bars in args.bars:
+                start = time.perf_counter()
+                result = bench_strategy(name, bars, args.repeats, args.timeframe, args.symbol,
+                                        args.seed, args.incremental)
+                report['results'][name][str(bars)] = result
+                print(f"{name:<25} {bars:>7}根K线  流水线中位数 {result['total_median_ms']:>10.2f}ms  "
+                      f"指标 {result['calculate_indicators']['median_ms']:>9.2f}ms  "
+                      f"(用时 {time.perf_counter() - start:.1f}秒)")
+    finally:
+        os.chdir(original_dir)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"基准测试报告已写入 {output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        base_commit = baseline.get('meta', {}).get('commit', '')[:10]
+        if not regressions:
+            print(f"与基准({base_commit})相比没有超过{args.threshold:.0%}的性能退化")
+            return
+        print(f"与基准({base_commit})相比发现 {len(regressions)} 处性能退化:")
+        for name, bars, stage, old, new in regressions:
+            print(f"  {name} {bars}根K线 {stage}: {old:.3f}ms -> {new:.3f}ms (+{new / old - 1:.0%})")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,167 @@ trading_config = {
     'leverage': 1,              # 杠杆倍数
     'amount': 1,             # 固定仓位大小
     'use_dynamic_position': True,  # 是否使用动态仓位
+    'incremental_kline': True,  # 是否增量获取K线（只获取上次更新以来的新K线，减少请求数据量）
+    'batch_reverse': True,      # 反手时平仓和反向开仓在一个批量下单请求中提交
     'is_test': False            # 测试模式，实盘如果设置True,仓位只会开30%资金
 }
 
+# 交易所后端配置
+exchange_config = {
+    'backend': 'okx',            # okx: 连接OKX实盘; simulator: 使用进程内模拟交易所（离线联调、压测）
+    # 模拟交易所参数，仅backend为simulator时生效
+    'simulator': {
+        'initial_balance': 10000,    # 初始USDT余额
+        'fee_rate': 0.0005,          # 手续费率
+        'slippage': 0.0002,          # 市价单滑点比例
+        'latency': 0.0,              # 每次请求的固定延迟(秒)
+        'jitter': 0.0,               # 额外随机延迟上限(秒)
+        'fault_rate': 0.0,           # 请求随机失败的概率
+        'seed': 0,                   # 延迟和故障注入的随机种子
+    },
+}
+
+# WebSocket推送配置（需要安装websocket-client，未安装或未启用时回退到REST轮询）
+websocket_config = {
+    'enabled': True,                                         # 是否使用WebSocket推送K线确认和标记价格
+    'public_url': 'wss://ws.okx.com:8443/ws/v5/public',      # 标记价格、行情频道（模拟盘: wss://wspap.okx.com:8443/ws/v5/public）
+    'business_url': 'wss://ws.okx.com:8443/ws/v5/business',  # K线频道
+    'private_url': 'wss://ws.okx.com:8443/ws/v5/private',    # 持仓、订单频道
+    'ping_interval': 20,         # 无消息多少秒后发送心跳（OKX 30秒无数据断开）
+    'reconnect_delay': 3,        # 断线重连间隔(秒)
+    'candle_timeout': 60,        # K线收盘后等待确认推送的最长秒数，超时回退到按时钟等待
+}
+
+# 交易所只读接口缓存配置（进程内所有OkxTrader共用，下单后自动清除该账户的余额和持仓缓存）
+cache_config = {
+    'enabled': True,             # 是否启用缓存
+    'maxsize': 1024,             # 最多缓存的条目数
+    'ttl': {                     # 各接口缓存有效期(秒)，0表示不缓存
+        'account': 10,           # 账户余额
+        'account_position': 5,   # 账户持仓详情（设置杠杆后验证用）
+        'instrument': 3600,      # 单个合约规格
+        'instruments': 3600,     # 所有合约列表
+        'leverage': 600,         # 已设置的杠杆，相同杠杆不重复设置
+    },
+}
+
+# 合约规格索引配置（一次获取所有永续合约的规格保存到本地，多个账户目录/进程可共用同一文件）
+instrument_registry_config = {
+    'enabled': True,                         # 是否启用合约规格索引
+    'path': '~/.lhcxy/instruments.json',     # 保存文件路径（模拟交易所只保存在内存中）
+    'refresh_interval': 3600,                # 刷新间隔(秒)
+}
+
+# REST请求限流配置（同一台机器上的所有进程共用令牌桶，触发限频后自动降速再逐步恢复）
+rate_limit_config = {
+    'enabled': True,                  # 是否启用（关闭时使用ccxt自带的单实例限流）
+    'path': '~/.lhcxy/rate_limit',    # 令牌桶状态目录，多个账户目录/进程需指向同一目录
+    # 接口分组: rate每秒请求数, burst瞬时突发数, scope: ip按IP共用 / account按账户
+    'groups': {
+        'market': {'rate': 18, 'burst': 36, 'scope': 'ip'},        # 行情（K线每2秒40次，行情每2秒20次）
+        'public': {'rate': 4, 'burst': 8, 'scope': 'ip'},          # 公共数据（标记价格每2秒10次）
+        'trade': {'rate': 25, 'burst': 50, 'scope': 'account'},    # 下单、撤单、条件单（每2秒60次）
+        'account': {'rate': 4, 'burst': 8, 'scope': 'account'},    # 余额、持仓、杠杆（每2秒10次）
+        'default': {'rate': 4, 'burst': 8, 'scope': 'account'},    # 其他接口
+    },
+    'penalty': 0.5,                   # 触发限频后速率乘以该系数
+    'recovery': 0.02,                 # 每次成功请求后速率系数恢复的量
+    'min_factor': 0.1,                # 速率系数下限
+    'pause_seconds': 2,               # 触发限频后整组暂停的秒数（响应头有Retry-After时以其为准）
+}
+
+# 订单成交确认配置（下单后按订单ID等待成交再查询持仓，代替固定等待）
+order_tracker_config = {
+    'timeout': 10,               # 等待订单成交的最长秒数，超时后直接查询持仓
+    'poll_interval': 0.1,        # 未接入订单推送时轮询订单状态的初始间隔(秒)，每次翻倍
+    'max_poll_interval': 1.0,    # 轮询间隔上限(秒)
+    'stream_grace': 1.0,         # 接入订单推送时，超过该秒数仍未收到成交推送则同时轮询订单状态
+}
+
+# 日志配置
+logging_config = {
+    'level': 'INFO',             # 日志级别，DEBUG时输出逐行指标数据和完整持仓字典
+    'async': True,               # 异步写日志：交易线程只把日志放入队列，由后台线程写控制台和文件
+    'queue_size': 10000,         # 异步日志队列长度，队列满时丢弃新日志（见logger_manager.stats()）
+    'console': True,             # 是否输出到控制台
+    'jsonl': False,              # 是否另外写结构化日志 logs/<名称>.jsonl（每行一条JSON）
+    'indicator_rows_level': 'DEBUG',  # 每根K线打印指标数据行使用的日志级别，设为INFO恢复逐行输出
+}
+
+# 交易账本配置（已平仓交易追加写入SQLite，首次启动时自动导入旧的data/trade_history.json）
+trade_ledger_config = {
+    'path': 'data/trade_ledger.db',  # 账本文件路径
+    'memory_window': 200,            # PositionTracker.history在内存中保留的最近交易条数
+}
+
+# 多账户/多交易对同进程运行配置（python run_supervisor.py，代替每个账户目录各起一组main.py和tp_sl_monitor.py）
+supervisor_config = {
+    # 账户名 -> api_keys: API密钥文件路径（格式与config/api_keys.py相同）; alias: 通知和持仓报告中的账户名，默认取trading_config
+    'accounts': {
+        'main': {'api_keys': 'config/api_keys.py', 'alias': None},
+        # 'sub2': {'api_keys': '~/lhcxy2/config/api_keys.py', 'alias': '量化机器人_子号2'},
+    },
+    # 策略实例，inst_id/timeframe/strategy为None时使用trading_config中的设置（跟随选币程序修改的交易对）
+    'instances': [
+        {'account': 'main', 'inst_id': None, 'timeframe': None, 'strategy': None},
+        # {'account': 'sub2', 'inst_id': 'BTC-USDT-SWAP', 'timeframe': '1h', 'strategy': 'dc_strategy'},
+    ],
+    'tp_sl_monitor': True,       # 是否为每个账户在同一进程中运行止盈止损监控器
+    'max_workers': 8,            # 同时运行的策略实例数上限
+    'buffer_seconds': 30,        # 未使用WebSocket推送时，K线收盘后等待交易所数据产生的秒数
+    'async_trader': False,       # 是否使用异步交易接口（所有账户的REST请求在同一个事件循环和连接池中并发）
+}
+
+# 本地K线存储配置（多个账户目录/进程共用同一目录即可共享已下载的K线）
+kline_store_config = {
+    'enabled': True,                     # 是否启用本地K线存储
+    'path': '~/.lhcxy/kline_store',      # 存储目录
+}
+
+# 离线回测配置（python backtest.py，交易对、周期、策略参数与实盘共用上面的配置）
+backtest_config = {
+    'bars': 5000,                # 回测使用的K线数量
+    'warmup_bars': 100,          # 指标预热K线数量，这部分K线不产生交易
+    'initial_balance': 10000,    # 初始资金(USDT)
+    'fee_rate': 0.0005,          # 手续费率（吃单0.05%）
+    'slippage': 0.0002,          # 滑点比例
+    'funding_rate': 0.0001,      # 每8小时资金费率（正数表示多头支付）
+}
+
+# 参数寻优配置（python optimize.py，手续费等回测参数取backtest_config）
+optimizer_config = {
+    'method': 'grid',                # 寻优方式: grid(网格), random(随机), bayes(贝叶斯)
+    'n_trials': 200,                 # random/bayes模式评估的参数组合数量
+    'max_workers': None,             # 进程数，None表示使用全部CPU核
+    'objective': 'return_drawdown',  # 排序目标: return_drawdown(收益回撤比), total_return(总收益率)
+    'min_trades': 5,                 # 交易次数少于该值的参数组合排在最后
+    'output_dir': 'optimize_results',  # 结果表格输出目录
+    # 各策略的参数空间：(最小值, 最大值, 步长) 或 候选值列表
+    'param_space': {
+        'sar_emax_strategy': {
+            'ema_period': (10, 60, 5),
+            'sar_acceleration': (0.01, 0.05, 0.01),
+            'sar_maximum': [0.1, 0.2, 0.3],
+        },
+        'sar_ema_strategy': {
+            'ema_period': (10, 60, 5),
+            'sar_acceleration': (0.01, 0.05, 0.01),
+            'sar_maximum': [0.1, 0.2, 0.3],
+        },
+        'sar_strategy': {
+            'sar_acceleration': (0.01, 0.05, 0.01),
+            'sar_maximum': [0.1, 0.2, 0.3],
+        },
+        'dual_ema_strategy': {
+            'fast_ema_period': (5, 30, 5),
+            'slow_ema_period': (30, 120, 10),
+        },
+        'dc_strategy': {
+            'channel_period': (10, 60, 5),
+        },
+    },
+}
+
 
 # 仓位管理配置
 position_config = {
@@ -118,6 +276,16 @@ notification_config = {
     'notify_on_take_profit_stop_loss': True,  # 止盈止损触发通知
 }
 
+# 通知后台发送配置（发送通知不阻塞交易线程，同一webhook短时间内的多条消息合并为汇总消息）
+notification_dispatcher_config = {
+    'enabled': True,             # 是否启用后台发送（关闭时在调用线程中同步发送）
+    'queue_size': 1000,          # 发送队列长度，队列满时丢弃新消息
+    'min_interval': 3,           # 同一webhook的发送间隔(秒)，企业微信机器人每分钟最多20条
+    'rate_limit_backoff': 60,    # 触发企业微信限频后该webhook暂停的秒数
+    'request_timeout': 10,       # 单次HTTP请求超时(秒)
+    'flush_timeout': 5,          # 进程退出时等待剩余消息发送的最长秒数
+}
+
 # 持仓报告配置
 position_report_config = {
     'enabled': True,                # 是否启用定期持仓报告
@@ -163,6 +331,11 @@ coin_selector_strategy_config = {
     'rsi_period': 14,
     'atr_period': 14,
 
+    # K线并发获取配置（OKX K线接口限制为每2秒40次）
+    'fetch_workers': 8,  # 并发线程数
+    'fetch_rate': 15,  # 每秒最多请求次数
+    'vectorized_scoring': True,  # 是否使用向量化评分引擎一次性计算所有币种评分
+
     # 选币权重配置
     'volume_weight': 0.2,  # 交易量权重
     'volatility_weight': 0.2,  # 波动性权重
@@ -7,7 +7,9 @@
 
 # 监控进程基本配置
 monitor_config = {
-    'check_interval': 30,       # 监控价格检查间隔（秒）
+    'mode': 'local',            # local: 监控器检测到触发后平仓; exchange: 在交易所挂止盈止损条件单，监控器只定期核对
+    'check_interval': 30,       # 监控价格检查间隔（秒），exchange模式下为条件单核对间隔
+    'reconcile_interval': 300,  # 使用WebSocket推送时，通过REST全量核对持仓的间隔（秒）
     'max_retries': 5,           # 最大重试次数
     'retry_delay': 3,         # 初始重试延迟（秒）
     'log_level': 'INFO',        # 日志级别
@@ -0,0 +1,624 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+异步交易接口
+
+AsyncOkxTrader基于ccxt.async_support，同一事件循环中的所有实例（多个账户）共用一个aiohttp会话和keep-alive连接池，
+多个请求可以用asyncio.gather并发等待；SyncOkxTrader把它包装成与OkxTrader相同的同步接口，
+请求在后台事件循环线程中执行，策略、止盈止损监控器等现有调用方不需要修改。
+"""
+
+import asyncio
+import inspect
+import threading
+from core.logger_manager import logger_manager
+from core.retry_utils import async_retry
+from core.ttl_cache import TTLCache, cached, ACCOUNT_CACHE_NAMES
+from core.rate_limiter import install_rate_limiter
+
+
+class EventLoopThread:
+    """
+    后台事件循环线程，同步代码通过run()把协程提交到这里执行
+
+    同一进程中通常只需要一个，用get_instance()获取
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """获取单例实例"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = EventLoopThread()
+            return cls._instance
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="okx-async-loop", daemon=True)
+        self._thread.start()
+
+    def run(self, coro, timeout=None):
+        """
+        在后台事件循环中执行协程并等待结果
+
+        Args:
+            coro: 协程
+            timeout: 超时秒数
+
+        Returns:
+            协程的返回值
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("不能在事件循环线程中同步等待协程")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self):
+        """停止事件循环"""
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+_sessions = {}  # 事件循环 -> aiohttp.ClientSession
+
+
+def get_shared_session(limit=100, keepalive_timeout=30):
+    """
+    获取当前事件循环共用的aiohttp会话，必须在事件循环中调用
+
+    Args:
+        limit: 连接池最大连接数
+        keepalive_timeout: 空闲连接保持秒数
+
+    Returns:
+        aiohttp.ClientSession
+    """
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=keepalive_timeout, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(connector=connector)
+        _sessions[loop] = session
+    return session
+
+
+async def close_shared_session():
+    """关闭当前事件循环共用的aiohttp会话"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+
+class AsyncOkxTrader:
+    """
+    异步OKX交易类
+
+    方法与OkxTrader同名同参数、返回值相同，但都是协程。exchange可以是ccxt.async_support.okx，
+    也可以是同步的后端（如OkxSimulator），同步后端的调用直接在事件循环中执行
+    """
+
+    def __init__(self, api_key, secret_key, passphrase, exchange=None):
+        """
+        初始化异步交易类
+
+        Args:
+            api_key: OKX API密钥
+            secret_key: OKX API密钥
+            passphrase: OKX API密码
+            exchange: 交易所后端，默认在第一次请求时创建ccxt.async_support.okx并接入共用会话
+        """
+        self.logger = logger_manager.get_system_logger()
+        self._credentials = (api_key, secret_key, passphrase)
+        self.exchange = exchange
+        # 只读接口缓存，与OkxTrader共用
+        self.cache = TTLCache.get_instance()
+        self.cache_namespace = api_key or id(self)
+
+    async def _exchange(self):
+        """获取交易所后端，第一次调用时在当前事件循环中创建"""
+        if self.exchange is None:
+            import ccxt.async_support as ccxt_async
+            from config.config import exchange_config
+
+            if exchange_config.get('backend', 'okx') == 'simulator':
+                from core.okx_simulator import OkxSimulator
+                self.exchange = OkxSimulator(**exchange_config.get('simulator', {}))
+            else:
+                api_key, secret_key, passphrase = self._credentials
+                self.exchange = install_rate_limiter(ccxt_async.okx({
+                    'apiKey': api_key,
+                    'secret': secret_key,
+                    'password': passphrase,
+                    'enableRateLimit': True,
+                    'session': get_shared_session(),
+                    'options': {
+                        'defaultType': 'swap',  # 默认使用永续合约
+                    }
+                }), api_key)
+        return self.exchange
+
+    async def _call(self, method, *args, **kwargs):
+        """调用交易所后端方法，兼容同步和异步后端"""
+        exchange = await self._exchange()
+        result = getattr(exchange, method)(*args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    def invalidate_account(self):
+        """清除本账户的余额和持仓缓存"""
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_namespace, ACCOUNT_CACHE_NAMES)
+
+    async def close(self):
+        """关闭交易所连接（共用会话由close_shared_session关闭）"""
+        if self.exchange is not None and hasattr(self.exchange, 'close'):
+            result = self.exchange.close()
+            if inspect.isawaitable(result):
+                await result
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_position(self, symbol):
+        """获取持仓信息，没有该交易对的持仓时返回None"""
+        self.logger.info(f'获取持仓信息:{symbol}')
+        try:
+            position = await self._call('fetch_position', symbol)
+            if position and position.get('contracts', 0) > 0:
+                inst_id = position['info'].get('instId', '')
+                if inst_id == symbol:
+                    position['symbol'] = symbol
+                    logger_manager.log_trade(
+                        "position",
+                        symbol,
+                        position['side'],
+                        float(position['contracts']),
+                        position['markPrice'],
+                        additional_info={
+                            "entryPrice": position['entryPrice'],
+                            "mark_price": position['markPrice'],
+                            "unrealized_pnl": position['unrealizedPnl'],
+                            "leverage": position.get('leverage', 1)
+                        }
+                    )
+                    return position
+                self.logger.warning(f"警告：API返回的持仓交易对({inst_id})与请求的交易对({symbol})不匹配")
+            self.logger.info(f"{symbol}没有仓位")
+        except Exception as e:
+            self.logger.error(f"获取持仓信息时发生错误: {str(e)}")
+        return None
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_all_positions(self):
+        """获取所有持仓信息"""
+        self.logger.info("获取所有持仓信息")
+        try:
+            return await self._call('fetch_positions')
+        except Exception as e:
+            self.logger.error(f"获取所有持仓信息时发生错误: {str(e)}")
+            return []
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def create_order(self, symbol, side, amount, type='market'):
+        """
+        创建订单（开仓）
+
+        Args:
+            symbol: 交易对
+            side: 交易方向，'buy'或'sell'
+            amount: 数量
+            type: 订单类型，默认为'market'（市价单）
+        """
+        self.logger.info(f"开始创建{side}订单 - {symbol} - 数量: {amount} - 类型: {type}")
+        pos_side = 'short' if side == 'sell' else 'long' if side == 'buy' else ''
+        try:
+            order = await self._call('create_order', symbol=symbol, type=type, side=side, amount=amount,
+                                     params={'tdMode': 'cross', 'posSide': pos_side})
+            self.invalidate_account()
+            price = order.get('price', order.get('average', 0))
+            if not price and type == 'market':
+                price = await self.fetch_market_price(symbol)
+            logger_manager.log_trade("open", symbol, side, amount, price, order.get('id', 'unknown'),
+                                     {"pos_side": pos_side, "order_type": type})
+            self.logger.info(f"{side}订单已提交: id:{order.get('id', 'unknown')}")
+            return order
+        except Exception as e:
+            error_msg = f"创建订单失败: {str(e)}"
+            self.logger.error(error_msg)
+            from core.notification_manager import NotificationManager
+            NotificationManager.send_system_error(error_msg, f"{symbol} create_order 订单创建错误")
+            raise
+
+    async def _close_side(self, symbol, amount, pos_side):
+        """按方向市价平仓"""
+        side = 'sell' if pos_side == 'long' else 'buy'
+        name = '平多仓' if pos_side == 'long' else '平空仓'
+        self.logger.info(f'开始{name} {symbol} - 数量: {amount}')
+        position = await self._call('fetch_position', symbol)
+        if not position:
+            self.logger.warning(f'当前{symbol}没有仓位，无法执行平仓')
+            return None
+        try:
+            order = await self._call('create_order', symbol=symbol, type='market', side=side, amount=amount,
+                                     params={'tdMode': 'cross', 'posSide': pos_side, 'reduceOnly': True})
+            self.invalidate_account()
+            logger_manager.log_trade("close", symbol, side, amount, position.get('markPrice', 0),
+                                     order.get('id', 'unknown'),
+                                     {"pos_side": pos_side, "entryPrice": position.get('entryPrice', 0)})
+            self.logger.info(f"{name}订单已提交: {order.get('id', 'unknown')}")
+            return order
+        except Exception as e:
+            error_msg = f"{name}失败: {str(e)}"
+            self.logger.error(error_msg)
+            from core.notification_manager import NotificationManager
+            NotificationManager.send_system_error(error_msg, f"{symbol} close_{pos_side}_position 订单创建错误")
+            raise
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def close_long_position(self, symbol, amount):
+        """平多仓"""
+        return await self._close_side(symbol, amount, 'long')
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def close_short_position(self, symbol, amount):
+        """平空仓"""
+        return await self._close_side(symbol, amount, 'short')
+
+    async def reverse_position(self, symbol, pos_side, close_amount, open_amount, price=0):
+        """反手批量下单，参数和返回值与OkxTrader.reverse_position相同，不自动重试"""
+        side = 'buy' if pos_side == 'short' else 'sell'
+        new_pos_side = 'long' if pos_side == 'short' else 'short'
+        params = [
+            {'instId': symbol, 'tdMode': 'cross', 'side': side, 'posSide': pos_side, 'ordType': 'market',
+             'sz': f"{float(close_amount):.8f}".rstrip('0').rstrip('.'), 'reduceOnly': True},
+            {'instId': symbol, 'tdMode': 'cross', 'side': side, 'posSide': new_pos_side, 'ordType': 'market',
+             'sz': f"{float(open_amount):.8f}".rstrip('0').rstrip('.')},
+        ]
+        self.logger.info(f"开始反手 {symbol} - 平{pos_side} {close_amount} 并开{new_pos_side} {open_amount}")
+        response = await self._call('private_post_trade_batch_orders', params)
+        self.invalidate_account()
+        orders = []
+        results = response.get('data', [])
+        for i, (action, amount) in enumerate((("close", close_amount), ("open", open_amount))):
+            result = results[i] if i < len(results) else {}
+            if result.get('sCode') != '0':
+                self.logger.error(f"反手{action}订单失败 - {symbol}: {result.get('sCode')} {result.get('sMsg')}")
+                orders.append(None)
+                continue
+            logger_manager.log_trade(action, symbol, side, amount, price, result.get('ordId', 'unknown'),
+                                     {"pos_side": pos_side if action == "close" else new_pos_side, "batch": "reverse"})
+            orders.append({'id': result.get('ordId'), 'info': result})
+        return orders[0], orders[1]
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def close_position(self, symbol):
+        """以市场价进行平仓"""
+        self.logger.info(f'开始以市场价平仓 {symbol}')
+        position = await self._call('fetch_position', symbol)
+        if not position or float(position['contracts']) <= 0:
+            self.logger.warning(f"{symbol}没有持仓，无法执行平仓")
+            return None
+        params = {'instId': symbol, 'mgnMode': 'cross', 'posSide': position['side']}
+        order = await self._call('private_post_trade_close_position', params=params)
+        self.invalidate_account()
+        logger_manager.log_trade("close_all", symbol, "market", float(position['contracts']),
+                                 float(position['markPrice']), order.get('id', 'unknown'),
+                                 {"side": position['side'], "position_value": float(position['notional'])})
+        self.logger.info(f"平仓成功: {order}")
+        return order
+
+    async def fetch_order(self, symbol, order_id):
+        """查询订单状态，不重试"""
+        return await self._call('fetch_order', order_id, symbol)
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def set_leverage(self, symbol, leverage=1):
+        """设置杠杆倍数，与OkxTrader.set_leverage相同，设置后查询账户持仓验证，验证通过后才缓存"""
+        self.logger.info(f"设置杠杆倍数 - {symbol} - {leverage}倍")
+        leverage_key = (self.cache_namespace, 'leverage', symbol)
+        if self.cache is not None and self.cache.get(leverage_key) == leverage:
+            self.logger.info(f"{symbol} 杠杆已设置为 {leverage}倍，跳过设置")
+            return True
+        try:
+            await self._call('set_leverage', leverage, symbol, params={'mgnMode': 'cross'})  # 全仓模式
+            self.logger.info(f"已发送杠杆设置请求: {leverage}倍")
+            # 账户持仓中的杠杆已变化，验证前清除缓存
+            if self.cache is not None:
+                self.cache.invalidate(self.cache_namespace, ('fetch_account_position',))
+
+            # 验证杠杆是否设置成功
+            verified = False
+            try:
+                position_info = await self.fetch_account_position(symbol)
+                if position_info and 'data' in position_info and len(position_info['data']) > 0:
+                    current_leverage = None
+                    for pos in position_info['data']:
+                        if pos.get('instId') == symbol:
+                            current_leverage = int(pos.get('lever', '0'))
+                            break
+
+                    if current_leverage is not None:
+                        if current_leverage == leverage:
+                            verified = True
+                            self.logger.info(f"杠杆设置成功验证: {symbol} 当前杠杆已设置为 {current_leverage}倍")
+                        else:
+                            self.logger.warning(f"杠杆设置异常: 请求设置为{leverage}倍，但当前杠杆为{current_leverage}倍")
+                            # 重试一次
+                            self.logger.info(f"尝试再次设置杠杆为{leverage}倍...")
+                            await self._call('set_leverage', leverage, symbol, params={'mgnMode': 'cross'})
+                else:
+                    self.logger.info(f"无法验证杠杆设置，无持仓信息返回，但已发送设置请求")
+            except Exception as e:
+                self.logger.warning(f"验证杠杆设置时出错: {str(e)}")
+
+            logger_manager.log_trade("set_leverage", symbol, "cross", 0, 0, additional_info={"leverage": leverage})
+            # 未经验证的设置不缓存，下次调用时重新设置
+            if verified and self.cache is not None:
+                from config.config import cache_config
+                self.cache.set(leverage_key, leverage, cache_config.get('ttl', {}).get('leverage', 0))
+            return True
+        except Exception as e:
+            self.logger.error(f"设置杠杆失败: {str(e)}")
+            return False
+
+    @cached('account')
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def get_account(self):
+        """获取账户余额，记录与OkxTrader.get_account相同的余额日志"""
+        self.logger.info("获取账户余额")
+        try:
+            account_balance = await self._call('private_get_account_balance', {'ccy': 'USDT'})
+
+            # 提取关键余额信息并记录
+            if account_balance and 'data' in account_balance and account_balance['data']:
+                balance_data = account_balance['data'][0]
+                if 'details' in balance_data and balance_data['details']:
+                    details = balance_data['details'][0]
+                    total_cash = details.get('cashBal', '0')
+                    avail_bal = details.get('availBal', '0')
+                    frozen_bal = details.get('frozenBal', '0')
+
+                    self.logger.info(f"账户总金额: {total_cash}")
+                    self.logger.info(f"可用余额: {avail_bal}")
+                    self.logger.info(f"冻结金额: {frozen_bal}")
+
+                    logger_manager.log_trade("account_balance", "USDT", "balance", 0, 0,
+                                             additional_info={"total": total_cash, "available": avail_bal,
+                                                              "frozen": frozen_bal})
+
+            return account_balance
+        except Exception as e:
+            self.logger.error(f"获取账户余额失败: {str(e)}")
+            raise
+
+    @cached('account_position')
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_account_position(self, symbol):
+        """获取账户持仓详情"""
+        self.logger.info(f'获取合约信息:{symbol}')
+        try:
+            account_data = await self._call('private_get_account_positions', {'instId': symbol, 'instType': 'SWAP'})
+            self.logger.debug(f"账户持仓详情: {account_data}")
+            return account_data
+        except Exception as e:
+            self.logger.error(f"获取账户持仓详情失败: {str(e)}")
+            raise
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_ticker(self, symbol):
+        """获取最新标记价格"""
+        return await self._call('publicGetPublicMarkPrice', {"instType": "SWAP", "instId": symbol})
+
+    async def fetch_market_price(self, symbol):
+        """
+        直接获取最新市场价格
+
+        Returns:
+            float: 最新标记价格，失败时返回0
+        """
+        try:
+            ticker = await self.fetch_ticker(symbol)
+            if ticker and ticker.get('data'):
+                return float(ticker['data'][0].get('markPx', 0))
+        except Exception as e:
+            self.logger.error(f"获取市场价格失败 - {symbol}: {str(e)}")
+        return 0
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_ohlcv(self, symbol, timeframe='1m', limit=300):
+        """获取K线数据"""
+        self.logger.info(f"获取K线数据 - {symbol} - {timeframe} - 数量: {limit}")
+        return await self._call('fetch_ohlcv', symbol, timeframe, limit=limit)
+
+    async def fetch_all_ohlcv(self, symbol, timeframe='1m', limit=2000):
+        """
+        分批获取更多K线数据，各批次按时间区间并发请求
+
+        Args:
+            symbol: 交易对
+            timeframe: 时间周期
+            limit: 需要获取的K线总数量
+
+        Returns:
+            list: 按时间从早到晚排序的K线
+        """
+        from core.time_utils import get_seconds_from_timeframe
+
+        single_request_limit = 300  # OKX API单次请求限制
+        latest = await self.fetch_ohlcv(symbol, timeframe, single_request_limit)
+        if not latest or len(latest) >= limit:
+            return sorted(latest or [], key=lambda c: c[0])[-limit:]
+
+        timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+        earliest = min(candle[0] for candle in latest)
+        batches = -(-(limit - len(latest)) // single_request_limit)
+        requests = [self._call('fetch_ohlcv', symbol, timeframe,
+                               since=earliest - (i + 1) * single_request_limit * timeframe_ms,
+                               limit=single_request_limit)
+                    for i in range(batches)]
+        candles = {candle[0]: candle for candle in latest}
+        for batch in await asyncio.gather(*requests, return_exceptions=True):
+            if isinstance(batch, Exception):
+                self.logger.warning(f"获取历史K线批次失败: {str(batch)}")
+                continue
+            for candle in batch:
+                candles.setdefault(candle[0], candle)
+        result = sorted(candles.values(), key=lambda c: c[0])[-limit:]
+        self.logger.info(f"批量获取K线完成，总计获取 {len(result)}/{limit} 条K线数据")
+        return result
+
+    def get_timeframe_ms(self, timeframe):
+        """将时间周期转换为毫秒数"""
+        from core.time_utils import get_seconds_from_timeframe
+        return get_seconds_from_timeframe(timeframe) * 1000
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def get_order_book(self, symbol, limit=20):
+        """获取订单簿数据"""
+        return await self._call('fetch_order_book', symbol, limit)
+
+    @cached('instrument')
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_instrument(self, symbol):
+        """获取合约规格信息，失败时返回None"""
+        try:
+            return await self._call('publicGetPublicInstruments', {'instId': symbol, 'instType': 'SWAP'})
+        except Exception as e:
+            self.logger.error(f"获取合约规格时发生错误: {str(e)}")
+            return None
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_all_instruments(self, instType='SWAP'):
+        """一次获取某类产品的所有合约规格"""
+        response = await self._call('publicGetPublicInstruments', {'instType': instType})
+        return response.get('data', [])
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def check_position_is_dual_side(self):
+        """判断是不是双向持仓模式，不是时抛出ValueError"""
+        account_config = await self._call('privateGetAccountConfig')
+        if account_config['data'][0]['posMode'] != 'long_short_mode':
+            raise ValueError("当前持仓模式不是双向持仓模式，程序已停止运行。请去官网改为双向持仓。")
+        print('当前持仓模式：双向持仓')
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_market_tickers(self, instType='SWAP'):
+        """获取所有产品行情信息"""
+        tickers = await self._call('publicGetMarketTickers', {"instType": instType})
+        return tickers['data']
+
+    @cached('instruments')
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def get_instruments(self, instType='SWAP'):
+        """获取所有合约信息"""
+        instruments = await self._call('private_get_account_instruments', {'instType': instType})
+        return instruments['data']
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def place_tp_sl_algo(self, symbol, pos_side, tp_trigger_price=None, sl_trigger_price=None, algo_cl_ord_id=None):
+        """下交易所端止盈止损条件单，参数与OkxTrader.place_tp_sl_algo相同"""
+        params = {
+            'instId': symbol,
+            'tdMode': 'cross',
+            'side': 'sell' if pos_side == 'long' else 'buy',
+            'posSide': pos_side,
+            'ordType': 'oco' if tp_trigger_price and sl_trigger_price else 'conditional',
+            'closeFraction': '1',
+            'reduceOnly': True,
+        }
+        if tp_trigger_price:
+            params.update({'tpTriggerPx': str(tp_trigger_price), 'tpOrdPx': '-1', 'tpTriggerPxType': 'mark'})
+        if sl_trigger_price:
+            params.update({'slTriggerPx': str(sl_trigger_price), 'slOrdPx': '-1', 'slTriggerPxType': 'mark'})
+        if algo_cl_ord_id:
+            params['algoClOrdId'] = algo_cl_ord_id
+        response = await self._call('private_post_trade_order_algo', params)
+        result = response['data'][0]
+        if result.get('sCode') not in (None, '0'):
+            raise Exception(f"{result.get('sCode')}: {result.get('sMsg')}")
+        return result
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_pending_algo_orders(self, symbol=None):
+        """获取未触发的止盈止损条件单"""
+        params = {'ordType': 'conditional,oco', 'instType': 'SWAP'}
+        if symbol:
+            params['instId'] = symbol
+        response = await self._call('private_get_trade_orders_algo_pending', params)
+        return response.get('data', [])
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def fetch_algo_order_history(self, algo_id=None, state='effective'):
+        """获取已结束的止盈止损条件单，参数与OkxTrader.fetch_algo_order_history相同"""
+        params = {'ordType': 'conditional,oco', 'instType': 'SWAP'}
+        if algo_id:
+            params['algoId'] = algo_id
+        else:
+            params['state'] = state
+        response = await self._call('private_get_trade_orders_algo_history', params)
+        return response.get('data', [])
+
+    @async_retry(max_retries=3, base_delay=3.0)
+    async def cancel_algo_orders(self, orders):
+        """撤销条件单"""
+        if not orders:
+            return []
+        params = [{'instId': order['instId'], 'algoId': order['algoId']} for order in orders]
+        response = await self._call('private_post_trade_cancel_algos', params)
+        return response.get('data', [])
+
+
+class SyncOkxTrader:
+    """
+    AsyncOkxTrader的同步外观，接口与OkxTrader相同
+
+    每次调用把协程提交到后台事件循环并等待结果；多个线程（多个策略实例、止盈止损监控器）同时调用时，
+    它们的网络等待在同一个事件循环和连接池中重叠，而不是各自占用一个阻塞连接
+    """
+
+    def __init__(self, api_key, secret_key, passphrase, exchange=None, loop_thread=None):
+        """
+        初始化同步外观
+
+        Args:
+            api_key: OKX API密钥
+            secret_key: OKX API密钥
+            passphrase: OKX API密码
+            exchange: 交易所后端，默认由AsyncOkxTrader创建
+            loop_thread: 后台事件循环线程，默认使用进程共用的EventLoopThread
+        """
+        self.async_trader = AsyncOkxTrader(api_key, secret_key, passphrase, exchange)
+        self.loop_thread = loop_thread or EventLoopThread.get_instance()
+        self.logger = self.async_trader.logger
+
+    @property
+    def exchange(self):
+        return self.async_trader.exchange
+
+    def get_timeframe_ms(self, timeframe):
+        return self.async_trader.get_timeframe_ms(timeframe)
+
+    def __getattr__(self, name):
+        method = getattr(self.async_trader, name)
+        if not inspect.iscoroutinefunction(method):
+            return method
+
+        def call(*args, **kwargs):
+            return self.loop_thread.run(method(*args, **kwargs))
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
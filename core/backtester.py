@@ -0,0 +1,551 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+离线回测引擎
+
+直接复用StrategyTemplate子类的calculate_indicators和generate_signals：
+- 指标只在完整历史数据上计算一次，之后逐根K线把"截至当前K线"的数组视图交给generate_signals，
+  不再为每根K线重新切片DataFrame
+- 交易通过模拟交易类BacktestTrader执行，它实现了策略和PositionManager用到的OkxTrader接口，
+  按合约面值计算盈亏，并模拟手续费、滑点和资金费率
+
+时间口径与实盘一致：实盘在新K线开始时运行策略，iloc[-2]是刚走完的K线，
+回测中第t步的信号以第t根K线的开盘价成交。
+注意：第t行（iloc[-1]）的指标使用的是第t根K线走完后的数据，只读取iloc[-2]及更早数据的策略没有未来函数；
+回测不模拟强平。
+"""
+
+import io
+import logging
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager, redirect_stdout
+from datetime import timedelta
+from core.logger_manager import logger_manager
+from core.signal_types import *  # 导入信号类型常量
+
+FUNDING_INTERVAL_MS = 8 * 60 * 60 * 1000  # OKX永续合约每8小时结算一次资金费（UTC 0/8/16点）
+
+
+class BacktestTrader:
+    """
+    模拟交易类
+
+    实现策略模板和PositionManager用到的OkxTrader方法，所有订单以当前K线开盘价加滑点成交
+    """
+
+    def __init__(self, symbol, ohlcv, instrument=None, initial_balance=10000.0,
+                 fee_rate=0.0005, slippage=0.0002, funding_rate=0.0001):
+        """
+        初始化模拟交易类
+
+        Args:
+            symbol: 交易对
+            ohlcv: K线数组(n, 6)，列依次为timestamp, open, high, low, close, volume
+            instrument: OKX合约规格（fetch_instrument返回的data[0]格式，包含ctVal, minSz, lotSz, tickSz, lever）
+            initial_balance: 初始资金(USDT)
+            fee_rate: 手续费率（按成交名义价值计算），默认0.05%（吃单）
+            slippage: 滑点比例，买入价格上浮、卖出价格下浮
+            funding_rate: 每8小时的资金费率，正数表示多头支付给空头
+        """
+        self.symbol = symbol
+        self.ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        self.instrument = {'instId': symbol, 'instType': 'SWAP', 'ctVal': '1', 'minSz': '1',
+                           'lotSz': '1', 'tickSz': '0.0001', 'lever': '100'}
+        self.instrument.update(instrument or {})
+        self.face_value = float(self.instrument['ctVal'])
+        self.initial_balance = float(initial_balance)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.funding_rate = funding_rate
+        self.logger = logger_manager.get_system_logger()
+
+        self.balance = self.initial_balance  # 已实现的账户余额
+        self.leverage = 1
+        self.positions = {}  # 持仓方向 -> {'contracts', 'entry_price', 'entry_time'}
+        self.trades = []  # 已平仓的交易记录
+        self.total_fees = 0.0
+        self.total_funding = 0.0
+        self.index = 0
+        self._price = float(self.ohlcv[0, 1]) if len(self.ohlcv) else 0.0
+        self._order_id = 0
+
+    # ---------------- 回测引擎调用的方法 ----------------
+
+    def set_bar(self, index):
+        """
+        推进到第index根K线的开盘时刻，跨过资金费结算时间时结算资金费
+
+        Args:
+            index: K线序号
+        """
+        if index > 0 and self.positions:
+            prev_slot = int(self.ohlcv[self.index, 0]) // FUNDING_INTERVAL_MS
+            slot = int(self.ohlcv[index, 0]) // FUNDING_INTERVAL_MS
+            if slot > prev_slot:
+                price = self.ohlcv[index, 1]
+                for side, position in self.positions.items():
+                    notional = position['contracts'] * self.face_value * price
+                    funding = notional * self.funding_rate * (slot - prev_slot)
+                    # 资金费率为正时多头支付、空头收取
+                    funding = -funding if side == 'long' else funding
+                    self.balance += funding
+                    self.total_funding += funding
+                    position['funding'] += funding
+        self.index = index
+        self._price = float(self.ohlcv[index, 1])
+
+    def close_all(self, price=None):
+        """
+        以指定价格平掉所有持仓，用于回测结束时结算
+
+        Args:
+            price: 平仓价格，默认当前价格
+        """
+        if price is not None:
+            self._price = float(price)
+        for side, position in list(self.positions.items()):
+            self._close(side, position['contracts'])
+
+    @property
+    def price(self):
+        """当前成交价格（当前K线开盘价）"""
+        return self._price
+
+    @property
+    def timestamp(self):
+        """当前K线的开盘时间戳(毫秒)"""
+        return int(self.ohlcv[self.index, 0])
+
+    def unrealized_pnl(self, price=None):
+        """
+        计算未实现盈亏
+
+        Args:
+            price: 计算价格，默认当前价格
+        """
+        price = self.price if price is None else price
+        pnl = 0.0
+        for side, position in self.positions.items():
+            diff = price - position['entry_price'] if side == 'long' else position['entry_price'] - price
+            pnl += position['contracts'] * self.face_value * diff
+        return pnl
+
+    def equity(self, price=None):
+        """账户权益 = 余额 + 未实现盈亏"""
+        return self.balance + self.unrealized_pnl(price)
+
+    def _fill(self, side, contracts):
+        """按当前价格加滑点成交并扣除手续费，返回(成交价, 手续费)"""
+        fill_price = self.price * (1 + self.slippage if side == 'buy' else 1 - self.slippage)
+        fee = contracts * self.face_value * fill_price * self.fee_rate
+        self.balance -= fee
+        self.total_fees += fee
+        self._order_id += 1
+        return fill_price, fee
+
+    def _order(self, side, contracts, fill_price):
+        """构造ccxt格式的订单返回值"""
+        return {'id': f"bt-{self._order_id}", 'symbol': self.symbol, 'side': side,
+                'amount': contracts, 'price': fill_price, 'average': fill_price,
+                'timestamp': self.timestamp, 'status': 'closed'}
+
+    def _close(self, pos_side, amount):
+        """平掉指定方向的持仓"""
+        position = self.positions.get(pos_side)
+        if not position:
+            return None
+        contracts = min(float(amount), position['contracts'])
+        if contracts <= 0:
+            return None
+
+        order_side = 'sell' if pos_side == 'long' else 'buy'
+        fill_price, fee = self._fill(order_side, contracts)
+        diff = fill_price - position['entry_price'] if pos_side == 'long' else position['entry_price'] - fill_price
+        pnl = contracts * self.face_value * diff
+        self.balance += pnl
+
+        ratio = contracts / position['contracts']
+        entry_fee = position['fee'] * ratio
+        funding = position['funding'] * ratio
+        self.trades.append({
+            'side': pos_side,
+            'entry_time': position['entry_time'],
+            'exit_time': self.timestamp,
+            'entry_price': position['entry_price'],
+            'exit_price': fill_price,
+            'contracts': contracts,
+            'pnl': pnl,
+            'fee': entry_fee + fee,
+            'funding': funding,
+            'net_pnl': pnl - entry_fee - fee + funding
+        })
+
+        position['contracts'] -= contracts
+        position['fee'] -= entry_fee
+        position['funding'] -= funding
+        if position['contracts'] <= 1e-12:
+            del self.positions[pos_side]
+        return self._order(order_side, contracts, fill_price)
+
+    # ---------------- OkxTrader接口 ----------------
+
+    def create_order(self, symbol, side, amount, type='market'):
+        """
+        创建订单（开仓），buy开多、sell开空，同方向已有持仓时按均价加仓
+
+        Args:
+            symbol: 交易对
+            side: 交易方向，'buy'或'sell'
+            amount: 合约数量
+            type: 订单类型，回测中均按市价成交
+        """
+        contracts = float(amount)
+        if contracts <= 0:
+            raise ValueError(f"下单数量无效: {amount}")
+
+        pos_side = 'long' if side == 'buy' else 'short'
+        fill_price, fee = self._fill(side, contracts)
+        position = self.positions.get(pos_side)
+        if position:
+            total = position['contracts'] + contracts
+            position['entry_price'] = (position['entry_price'] * position['contracts'] + fill_price * contracts) / total
+            position['contracts'] = total
+            position['fee'] += fee
+        else:
+            self.positions[pos_side] = {'contracts': contracts, 'entry_price': fill_price,
+                                        'entry_time': self.timestamp, 'fee': fee, 'funding': 0.0}
+        return self._order(side, contracts, fill_price)
+
+    def close_long_position(self, symbol, amount):
+        """平多仓"""
+        return self._close('long', amount)
+
+    def close_short_position(self, symbol, amount):
+        """平空仓"""
+        return self._close('short', amount)
+
+    def close_position(self, symbol):
+        """以市场价平掉所有持仓"""
+        self.close_all()
+
+    def fetch_position(self, symbol):
+        """获取持仓信息，格式与OkxTrader.fetch_position一致，没有持仓时返回None"""
+        for side in ('long', 'short'):
+            position = self.positions.get(side)
+            if position:
+                pnl = self.unrealized_pnl() if len(self.positions) == 1 else None
+                return {
+                    'symbol': symbol,
+                    'side': side,
+                    'contracts': position['contracts'],
+                    'entryPrice': position['entry_price'],
+                    'markPrice': self.price,
+                    'unrealizedPnl': pnl,
+                    'leverage': self.leverage,
+                    'info': {'instId': symbol, 'posSide': side}
+                }
+        return None
+
+    def fetch_all_positions(self):
+        """获取所有持仓"""
+        position = self.fetch_position(self.symbol)
+        return [position] if position else []
+
+    def set_leverage(self, symbol, leverage=1):
+        """设置杠杆倍数"""
+        self.leverage = leverage
+        return {'code': '0', 'data': [{'instId': symbol, 'lever': str(leverage)}]}
+
+    def get_account(self):
+        """获取账户信息，格式与OKX /api/v5/account/balance一致，可用余额扣除了持仓占用的保证金"""
+        margin = sum(p['contracts'] * self.face_value * p['entry_price'] for p in self.positions.values())
+        margin /= max(float(self.leverage), 1.0)
+        equity = self.equity()
+        return {'code': '0', 'data': [{'totalEq': str(equity), 'details': [{
+            'ccy': 'USDT',
+            'cashBal': str(self.balance),
+            'eq': str(equity),
+            'availBal': str(max(0.0, equity - margin)),
+            'frozenBal': str(margin)
+        }]}]}
+
+    def fetch_instrument(self, symbol):
+        """获取合约规格信息"""
+        return {'code': '0', 'data': [dict(self.instrument)]}
+
+    def fetch_ticker(self, symbol):
+        """获取当前行情"""
+        return {'symbol': symbol, 'last': self.price, 'close': self.price, 'timestamp': self.timestamp}
+
+    def fetch_market_price(self, symbol):
+        """获取当前市场价格"""
+        return self.price
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', limit=100):
+        """获取截至当前K线的历史K线"""
+        rows = self.ohlcv[max(0, self.index + 1 - limit):self.index + 1]
+        return rows.tolist()
+
+
+class BarRow:
+    """
+    单根K线的只读视图，支持row['列名']和row.get('列名')
+    """
+
+    __slots__ = ('_columns', '_index')
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._columns[key][self._index]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def get(self, key, default=None):
+        column = self._columns.get(key)
+        return default if column is None else column[self._index]
+
+
+class _ILocIndexer:
+    """ArrayFrame.iloc的整数位置索引"""
+
+    __slots__ = ('_frame',)
+
+    def __init__(self, frame):
+        self._frame = frame
+
+    def __getitem__(self, position):
+        length = self._frame._length
+        index = position + length if position < 0 else position
+        if index < 0 or index >= length:
+            raise IndexError(f"位置{position}超出范围，当前共{length}根K线")
+        return BarRow(self._frame._columns, index)
+
+
+class ArrayFrame:
+    """
+    截至某根K线的轻量数据视图，代替DataFrame传给generate_signals
+
+    支持策略常用的df.empty、df.columns、len(df)、df.iloc[-n]['列名']和df['列名']，
+    底层直接引用预先计算好的指标数组，创建代价为O(1)
+    """
+
+    __slots__ = ('_columns', '_length', 'iloc')
+
+    def __init__(self, columns, length):
+        """
+        Args:
+            columns: 列名 -> 完整历史的numpy数组
+            length: 当前可见的K线数量
+        """
+        self._columns = columns
+        self._length = length
+        self.iloc = _ILocIndexer(self)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def empty(self):
+        return self._length == 0
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, key):
+        return self._columns[key][:self._length]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+
+def ohlcv_to_frame(ohlcv):
+    """
+    把K线数组转换为DataFeed同格式的DataFrame
+
+    Args:
+        ohlcv: K线数组(n, 6)
+
+    Returns:
+        pandas.DataFrame: 包含candle_begin_time_GMT8, open, high, low, close, volume列
+    """
+    ohlcv = np.asarray(ohlcv, dtype=np.float64)
+    df = pd.DataFrame(ohlcv[:, 1:6], columns=['open', 'high', 'low', 'close', 'volume'])
+    df.insert(0, 'candle_begin_time_GMT8', pd.to_datetime(ohlcv[:, 0].astype(np.int64), unit='ms') + timedelta(hours=8))
+    return df
+
+
+class Backtester:
+    """
+    离线回测引擎
+    """
+
+    def __init__(self, strategy_class, config, ohlcv, instrument=None, initial_balance=10000.0,
+                 fee_rate=0.0005, slippage=0.0002, funding_rate=0.0001, warmup_bars=100):
+        """
+        初始化回测引擎
+
+        Args:
+            strategy_class: StrategyTemplate子类
+            config: 策略配置，与实盘相同（需包含symbol和timeframe）
+            ohlcv: 按时间升序排列的K线数组(n, 6)
+            instrument: OKX合约规格，决定合约面值和下单精度
+            initial_balance: 初始资金(USDT)
+            fee_rate: 手续费率
+            slippage: 滑点比例
+            funding_rate: 每8小时的资金费率
+            warmup_bars: 开始产生信号前预留的K线数量，用于指标预热
+        """
+        self.strategy_class = strategy_class
+        self.config = config
+        self.symbol = config['symbol']
+        self.ohlcv = np.asarray(ohlcv, dtype=np.float64)
+        self.warmup_bars = max(3, warmup_bars)
+        self.trader = BacktestTrader(self.symbol, self.ohlcv, instrument, initial_balance,
+                                     fee_rate, slippage, funding_rate)
+        self.logger = logger_manager.get_strategy_logger()
+
+        with self._quiet():
+            self.strategy = strategy_class(self.trader, config)
+
+    @contextmanager
+    def _quiet(self):
+        """回测期间屏蔽策略和仓位管理的逐笔日志及print输出"""
+        names = ['strategy', 'position', 'system', 'trade']
+        loggers = [logger_manager.get_logger(name) for name in names]
+        levels = [logger.level for logger in loggers]
+        for logger in loggers:
+            logger.setLevel(logging.WARNING)
+        try:
+            with redirect_stdout(io.StringIO()):
+                yield
+        finally:
+            for logger, level in zip(loggers, levels):
+                logger.setLevel(level)
+
+    def _leverage(self):
+        """与实盘_execute_trade相同的杠杆优先级：策略配置 < position_config < symbol_position_config"""
+        from config.config import position_config, symbol_position_config
+        leverage = self.config.get('leverage', 1)
+        leverage = position_config.get('leverage', leverage)
+        if self.symbol in symbol_position_config:
+            leverage = symbol_position_config[self.symbol].get('leverage', leverage)
+        return leverage
+
+    def _open(self, side, position):
+        """开仓，仓位计算方式与实盘一致"""
+        if self.config.get('use_dynamic_position', True):
+            amount = self.strategy.position_manager.get_optimal_position_size(self.symbol, self.trader.price, side)
+        else:
+            amount = self.config.get('amount', 1)
+        if amount <= 0:
+            amount = self.config.get('amount', 1)
+        if position is None:
+            self.trader.set_leverage(self.symbol, self._leverage())
+        self.trader.create_order(self.symbol, side, amount)
+
+    def _apply_signal(self, signal):
+        """
+        按实盘StrategyTemplate._execute_trade的规则处理信号（去掉等待和通知）
+
+        Args:
+            signal: 策略返回的交易信号
+        """
+        if signal is None or not is_valid_signal(signal):
+            return
+        action = get_signal_action(signal)
+        position = self.trader.fetch_position(self.symbol)
+        side = position['side'] if position else None
+
+        if action == OPEN_LONG:
+            if side == 'short':
+                self.trader.close_short_position(self.symbol, position['contracts'])
+                position = None
+            if side != 'long':
+                self._open('buy', position)
+        elif action == OPEN_SHORT:
+            if side == 'long':
+                self.trader.close_long_position(self.symbol, position['contracts'])
+                position = None
+            if side != 'short':
+                self._open('sell', position)
+        elif action in (CLOSE_LONG, CLOSE_ALL) and side == 'long':
+            self.trader.close_long_position(self.symbol, position['contracts'])
+        elif action in (CLOSE_SHORT, CLOSE_ALL) and side == 'short':
+            self.trader.close_short_position(self.symbol, position['contracts'])
+
+    def run(self):
+        """
+        执行回测
+
+        Returns:
+            dict: {'metrics': 统计指标, 'trades': 交易记录列表, 'equity': 每根K线收盘时的权益数组,
+                   'timestamps': 对应的K线时间戳数组}
+        """
+        n = len(self.ohlcv)
+        if n <= self.warmup_bars:
+            raise ValueError(f"K线数量({n})不足，至少需要{self.warmup_bars + 1}根")
+
+        with self._quiet():
+            # 指标在完整历史上只计算一次
+            df = self.strategy.before_signal_generation(ohlcv_to_frame(self.ohlcv))
+            indicators_df = self.strategy.calculate_indicators(df)
+            if indicators_df is None or len(indicators_df) != n:
+                raise ValueError("calculate_indicators返回的行数与K线数量不一致，无法回测")
+            columns = {name: indicators_df[name].to_numpy() for name in indicators_df.columns}
+
+            close = self.ohlcv[:, 4]
+            equity = np.empty(n - self.warmup_bars)
+            for step, t in enumerate(range(self.warmup_bars, n)):
+                self.trader.set_bar(t)
+                signal = self.strategy.generate_signals(ArrayFrame(columns, t + 1))
+                self._apply_signal(signal)
+                equity[step] = self.trader.equity(close[t])
+
+            # 回测结束时按最后一根K线收盘价平掉剩余持仓，计入交易统计
+            self.trader.close_all(close[-1])
+
+        result = {
+            'metrics': self._metrics(equity),
+            'trades': self.trader.trades,
+            'equity': equity,
+            'timestamps': self.ohlcv[self.warmup_bars:, 0].astype(np.int64)
+        }
+        self.logger.info(f"回测完成 - {self.strategy_class.__name__} - {self.symbol} - {result['metrics']}")
+        return result
+
+    def _metrics(self, equity):
+        """计算收益、回撤和交易统计"""
+        initial = self.trader.initial_balance
+        final = self.trader.balance
+        peak = np.maximum.accumulate(np.concatenate([[initial], equity]))[1:]
+        drawdown = 1 - equity / peak
+        trades = self.trader.trades
+        wins = sum(1 for trade in trades if trade['net_pnl'] > 0)
+        return {
+            'bars': len(equity),
+            'initial_balance': initial,
+            'final_balance': final,
+            'total_return': final / initial - 1,
+            'max_drawdown': float(drawdown.max()) if len(drawdown) else 0.0,
+            'trades': len(trades),
+            'win_rate': wins / len(trades) if trades else 0.0,
+            'total_fees': self.trader.total_fees,
+            'total_funding': self.trader.total_funding
+        }
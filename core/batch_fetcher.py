@@ -0,0 +1,170 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+多币种K线并发获取
+
+使用线程池并发请求多个交易对的K线，所有请求都要先从令牌桶取得令牌，
+令牌桶按OKX接口的频率限制发放令牌（/api/v5/market/candles为每2秒40次），
+遇到限频错误时整个令牌桶暂停一段时间，避免继续触发429。
+trader已接入跨进程限流（install_rate_limiter）时不再使用自己的令牌桶，避免同一请求被限流两次
+"""
+
+import time
+import threading
+import ccxt
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.logger_manager import logger_manager
+from core.rate_limiter import installed_limiter
+
+
+class TokenBucket:
+    """
+    线程安全的令牌桶限流器
+    """
+
+    def __init__(self, rate, capacity=None):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒产生的令牌数
+            capacity: 令牌桶容量（允许的瞬时突发请求数），默认等于rate
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        取得令牌，令牌不足时阻塞等待
+
+        Args:
+            tokens: 需要的令牌数
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._paused_until:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                    self._last = now
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return
+                    wait = (tokens - self._tokens) / self.rate
+                else:
+                    wait = self._paused_until - now
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        暂停发放令牌并清空令牌桶，用于收到限频错误后整体退避
+
+        Args:
+            seconds: 暂停秒数
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._last = self._paused_until
+            self._tokens = 0.0
+
+
+class BatchOhlcvFetcher:
+    """
+    多币种K线并发获取器
+    """
+
+    def __init__(self, trader, timeframe, limit=100, max_workers=8, rate=15, burst=None,
+                 store=None, max_retries=3, backoff_seconds=2.0):
+        """
+        初始化并发获取器
+
+        Args:
+            trader: OkxTrader实例
+            timeframe: 时间周期
+            limit: 每个币种获取的K线数量
+            max_workers: 并发线程数
+            rate: 每秒最多请求次数，默认15次，低于OKX限制的每秒20次，给其他进程留出余量
+            burst: 允许的瞬时突发请求数，默认等于rate
+            store: 本地K线存储(KlineStore)，设置后只向交易所请求缺少的K线
+            max_retries: 触发限频时的最大重试次数
+            backoff_seconds: 触发限频后令牌桶暂停的初始秒数，每次重试翻倍
+        """
+        self.trader = trader
+        self.timeframe = timeframe
+        self.limit = limit
+        self.max_workers = max_workers
+        # 已接入跨进程限流时由它统一限频和处理限频后的暂停
+        shared = installed_limiter(getattr(trader, 'exchange', None)) is not None
+        self.bucket = None if shared else TokenBucket(rate, burst)
+        self.store = store
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.logger = logger_manager.get_market_logger()
+
+    def fetch(self, symbols):
+        """
+        并发获取多个交易对的K线
+
+        Args:
+            symbols: 交易对列表
+
+        Returns:
+            dict: 交易对 -> 形状为(n, 6)的numpy数组，列依次为timestamp, open, high, low, close, volume；
+                  获取失败或没有数据的交易对不包含在结果中
+        """
+        symbols = list(dict.fromkeys(symbols))
+        result = {}
+        if not symbols:
+            return result
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(symbols))) as executor:
+            futures = {executor.submit(self._fetch_one, symbol): symbol for symbol in symbols}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    klines = future.result()
+                except Exception as e:
+                    self.logger.error(f"获取{symbol}K线数据失败: {str(e)}")
+                    continue
+                if klines is not None and len(klines) > 0:
+                    result[symbol] = klines
+
+        self.logger.info(f"并发获取K线完成 - {len(result)}/{len(symbols)} 个币种, 耗时 {time.time() - start:.2f}秒")
+        return result
+
+    def _fetch_one(self, symbol):
+        """获取单个交易对的K线，触发限频时暂停整个令牌桶后重试"""
+        for attempt in range(1, self.max_retries + 1):
+            if self.bucket is not None:
+                self.bucket.acquire()
+            try:
+                if self.store is not None:
+                    return self.store.load_ohlcv(self.trader, symbol, self.timeframe, self.limit)
+                klines = self.trader.fetch_ohlcv(symbol, self.timeframe, self.limit)
+                return np.asarray(klines if klines is not None else [], dtype=np.float64)
+            except ccxt.DDoSProtection as e:
+                if attempt >= self.max_retries:
+                    raise
+                if self.bucket is None:
+                    # 跨进程限流器已暂停该接口分组，下次取得令牌时自然等待
+                    self.logger.warning(f"获取{symbol}K线触发限频，等待限流器恢复后重试: {str(e)}")
+                    continue
+                delay = self.backoff_seconds * (2 ** (attempt - 1))
+                self.logger.warning(f"获取{symbol}K线触发限频，暂停 {delay:.1f}秒后重试: {str(e)}")
+                self.bucket.pause(delay)
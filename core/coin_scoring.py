@@ -0,0 +1,236 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+选币横截面评分引擎
+
+把所有候选币种的K线堆叠成(币种数 × K线数)的二维矩阵（K线右对齐，较短的序列左侧用NaN填充），
+一次性向量化计算交易量、波动性、趋势、动量和BTC相关性评分，
+计算量与选币池大小无关，只有EMA递推需要按K线逐列循环。
+评分公式与CoinSelectorStrategy中逐币种的calculate_*_score方法保持一致。
+"""
+
+import numpy as np
+
+
+def _ema(x, span):
+    """
+    按列递推计算EMA，等价于pandas的ewm(span=span, adjust=False).mean()
+
+    Args:
+        x: 二维数组(币种数 × K线数)，左侧NaN视为尚无数据
+        span: EMA周期
+
+    Returns:
+        numpy.ndarray: 与x形状相同的EMA矩阵
+    """
+    alpha = 2.0 / (span + 1)
+    result = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        prev = np.where(np.isnan(prev), col, alpha * col + (1 - alpha) * prev)
+        result[:, t] = prev
+    return result
+
+
+def _stack(series_list, length):
+    """把多个一维序列右对齐堆叠成矩阵，左侧用NaN填充"""
+    matrix = np.full((len(series_list), length), np.nan)
+    for i, series in enumerate(series_list):
+        series = series[-length:]
+        if len(series) > 0:
+            matrix[i, length - len(series):] = series
+    return matrix
+
+
+class CoinScoringEngine:
+    """
+    向量化选币评分引擎
+    """
+
+    def __init__(self, selection_mode='comprehensive', fast_ema=20, slow_ema=55, rsi_period=14, atr_period=14):
+        """
+        初始化评分引擎
+
+        Args:
+            selection_mode: 选币模式: trend(趋势), oscillation(震荡), comprehensive(综合)
+            fast_ema: 快速EMA周期
+            slow_ema: 慢速EMA周期
+            rsi_period: RSI周期
+            atr_period: ATR周期
+        """
+        self.selection_mode = selection_mode
+        self.fast_ema = fast_ema
+        self.slow_ema = slow_ema
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+
+    def score(self, klines_map, btc_klines=None, weights=None, min_bars=30):
+        """
+        计算所有币种的各维度评分
+
+        Args:
+            klines_map: 交易对 -> K线数组(n, 6)，列依次为timestamp, open, high, low, close, volume
+            btc_klines: BTC的K线数组，为None时相关性评分取默认值0.5
+            weights: 各维度权重，包含volume, volatility, trend, momentum, correlation
+            min_bars: 最少需要的K线数量，不足的币种不参与评分
+
+        Returns:
+            list: 各币种的评分字典，格式与CoinSelectorStrategy.calculate_metrics一致
+        """
+        symbols = [s for s, k in klines_map.items() if k is not None and len(k) >= min_bars]
+        if not symbols:
+            return []
+
+        arrays = [np.asarray(klines_map[s], dtype=np.float64) for s in symbols]
+        length = max(len(a) for a in arrays)
+        high = _stack([a[:, 2] for a in arrays], length)
+        low = _stack([a[:, 3] for a in arrays], length)
+        close = _stack([a[:, 4] for a in arrays], length)
+        volume = _stack([a[:, 5] for a in arrays], length)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_score = self.volume_score(volume)
+            volatility_score = self.volatility_score(high, low, close)
+            trend_score = self.trend_score(close)
+            momentum_score = self.momentum_score(close)
+
+            correlation_score = np.full(len(symbols), 0.5)
+            if btc_klines is not None and len(btc_klines) > min_bars:
+                btc_close = _stack([np.asarray(btc_klines, dtype=np.float64)[:, 4]], length)[0]
+                correlation_score = self.correlation_score(close, btc_close)
+
+        weights = weights or {'volume': 0.2, 'volatility': 0.2, 'trend': 0.3, 'momentum': 0.2, 'correlation': 0.1}
+        total = (
+                volume_score * weights['volume'] +
+                volatility_score * weights['volatility'] +
+                trend_score * weights['trend'] +
+                momentum_score * weights['momentum'] +
+                correlation_score * weights['correlation']
+        )
+
+        return [{
+            'symbol': symbol,
+            'volume_score': float(volume_score[i]),
+            'volatility_score': float(volatility_score[i]),
+            'trend_score': float(trend_score[i]),
+            'momentum_score': float(momentum_score[i]),
+            'correlation_score': float(correlation_score[i]),
+            'score': float(total[i])
+        } for i, symbol in enumerate(symbols)]
+
+    def volume_score(self, volume):
+        """交易量评分：近期放量程度和交易量稳定性"""
+        recent_volume = volume[:, -5:].mean(axis=1)
+        past_volume = volume[:, -20:-5].mean(axis=1)
+        volume_change = np.where(past_volume == 0, 1, recent_volume / past_volume)
+
+        window = volume[:, -20:]
+        volume_stability = 1 - np.fmin(1, window.std(axis=1, ddof=1) / window.mean(axis=1))
+
+        score = volume_change * 0.7 + volume_stability * 0.3
+        return np.fmin(1, np.fmax(0, score / 2))
+
+    def volatility_score(self, high, low, close):
+        """波动性评分：ATR相对价格的比例"""
+        prev_close = np.empty_like(close)
+        prev_close[:, 0] = np.nan
+        prev_close[:, 1:] = close[:, :-1]
+        tr = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+        atr = tr[:, -self.atr_period:].mean(axis=1)
+        relative_volatility = atr / close[:, -1]
+
+        if self.selection_mode == 'trend':
+            score = 1 - np.abs(relative_volatility - 0.02) / 0.02
+        elif self.selection_mode == 'oscillation':
+            score = np.fmin(1, relative_volatility / 0.03)
+        else:
+            score = 1 - np.abs(relative_volatility - 0.025) / 0.025
+
+        return np.fmin(1, np.fmax(0, score))
+
+    def trend_score(self, close):
+        """趋势评分：快慢EMA距离和价格变化方向的一致性"""
+        fast = _ema(close, self.fast_ema)[:, -1]
+        slow = _ema(close, self.slow_ema)[:, -1]
+        trend_direction = (fast - slow) / slow
+
+        price_change = (close[:, -1] - close[:, -20]) / close[:, -20]
+        consistency = (((trend_direction > 0) & (price_change > 0)) |
+                       ((trend_direction < 0) & (price_change < 0))).astype(np.float64)
+        strength = np.fmin(1, np.abs(trend_direction) / 0.05)
+
+        if self.selection_mode == 'trend':
+            return strength * 0.7 + consistency * 0.3
+        elif self.selection_mode == 'oscillation':
+            return (1 - strength) * 0.7 + (1 - consistency) * 0.3
+        return strength * 0.5 + consistency * 0.5
+
+    def momentum_score(self, close):
+        """动量评分：RSI和MACD柱状图"""
+        delta = np.diff(close, axis=1)[:, -self.rsi_period:]
+        avg_gain = np.where(delta > 0, delta, 0).mean(axis=1)
+        avg_loss = np.where(delta < 0, -delta, 0).mean(axis=1)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+
+        macd = _ema(close, 12) - _ema(close, 26)
+        histogram = macd - _ema(macd, 9)
+        last_hist = histogram[:, -1]
+        rising = last_hist > 0
+        macd_strength = np.fmin(1, np.abs(last_hist) / 0.01)
+
+        if self.selection_mode == 'trend':
+            rsi_score = np.where(rising, rsi / 100, (100 - rsi) / 100)
+            return rsi_score * 0.5 + macd_strength * 0.5
+        elif self.selection_mode == 'oscillation':
+            rsi_score = 1 - np.abs(rsi - 50) / 50
+            macd_changes = (np.diff(np.sign(histogram[:, -10:]), axis=1) != 0).sum(axis=1)
+            macd_change_score = np.fmin(1, macd_changes / 5)
+            return rsi_score * 0.7 + macd_change_score * 0.3
+
+        rsi_score = np.where(
+            rising,
+            np.where(rsi < 70, rsi / 70, (100 - rsi) / 30),
+            np.where(rsi > 30, (100 - rsi) / 70, rsi / 30)
+        )
+        return rsi_score * 0.6 + macd_strength * 0.4
+
+    def correlation_score(self, close, btc_close):
+        """
+        与BTC收益率的相关性评分，所有币种的皮尔逊相关系数用一次矩阵运算得到
+
+        Args:
+            close: 收盘价矩阵(币种数 × K线数)
+            btc_close: 与close右对齐的BTC收盘价序列
+        """
+        coin_returns = close[:, 1:] / close[:, :-1] - 1
+        btc_returns = np.broadcast_to(btc_close[1:] / btc_close[:-1] - 1, coin_returns.shape)
+
+        mask = ~(np.isnan(coin_returns) | np.isnan(btc_returns))
+        n = mask.sum(axis=1)
+        x = np.where(mask, coin_returns, 0)
+        y = np.where(mask, btc_returns, 0)
+        x = np.where(mask, x - (x.sum(axis=1) / n)[:, None], 0)
+        y = np.where(mask, y - (y.sum(axis=1) / n)[:, None], 0)
+        correlation = (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+        correlation[n < 2] = np.nan
+
+        if self.selection_mode == 'trend':
+            score = (correlation + 1) / 2
+        elif self.selection_mode == 'oscillation':
+            score = 1 - (correlation + 1) / 2
+        else:
+            score = 1 - np.abs(correlation - 0.3)
+
+        return np.fmin(1, np.fmax(0, score))
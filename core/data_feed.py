@@ -13,12 +13,188 @@ okx u本位择时策略实盘框架
 若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
 """
 
+import time
+import threading
+import numpy as np
 import pandas as pd
 from datetime import timedelta
 from core.logger_manager import logger_manager
+from core.time_utils import get_seconds_from_timeframe
+
+# 东八区(GMT+8)相对UTC的毫秒偏移
+GMT8_OFFSET_MS = 8 * 60 * 60 * 1000
+
+
+class KlineBuffer:
+    """
+    K线环形缓冲区
+
+    预先分配2倍容量的NumPy数组保存OHLCV数据，新K线追加到尾部，
+    写满时把最近的K线整体搬回数组头部（均摊O(1)），
+    因此有效数据始终是一段连续内存，可以零拷贝地暴露为DataFrame
+    """
+
+    def __init__(self, capacity, timeframe_ms):
+        """
+        初始化K线缓冲区
+
+        Args:
+            capacity: 保留的最大K线数量
+            timeframe_ms: 单根K线的毫秒数，用于检测K线是否连续
+        """
+        self.capacity = capacity
+        self.timeframe_ms = timeframe_ms
+        self._size = capacity * 2
+        self._ts = np.zeros(self._size, dtype=np.int64)  # 开盘时间戳(毫秒)
+        self._time = np.zeros(self._size, dtype='datetime64[ns]')  # 东八区开盘时间
+        self._values = np.zeros((5, self._size), dtype=np.float64)  # 依次为open, high, low, close, volume
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def last_timestamp(self):
+        """最新一根K线的开盘时间戳(毫秒)，缓冲区为空时返回None"""
+        if self._end == self._start:
+            return None
+        return int(self._ts[self._end - 1])
+
+    def clear(self):
+        """清空缓冲区"""
+        self._start = 0
+        self._end = 0
+
+    def load(self, rows):
+        """
+        用一批K线覆盖缓冲区的全部内容
+
+        Args:
+            rows: 形如[[timestamp, open, high, low, close, volume], ...]的K线数据
+        """
+        rows = self._normalize(rows)
+        rows = rows[-self.capacity:]
+        self.clear()
+        self._write(0, rows)
+        self._end = len(rows)
+
+    def merge(self, rows):
+        """
+        合并新获取的K线：已存在的K线（如上次未走完的K线）原地覆盖，更新的K线追加到尾部
+
+        Args:
+            rows: 形如[[timestamp, open, high, low, close, volume], ...]的K线数据
+
+        Returns:
+            bool: 合并是否成功，新数据与已有数据之间存在缺口时返回False，需要全量重新加载
+        """
+        rows = self._normalize(rows)
+        if len(rows) == 0:
+            return True
+
+        if len(self) == 0:
+            self.load(rows)
+            return True
+
+        last_ts = self._ts[self._end - 1]
+        timestamps = rows[:, 0].astype(np.int64)
+
+        # 覆盖已存在的K线
+        old_mask = timestamps <= last_ts
+        if old_mask.any():
+            view = self._ts[self._start:self._end]
+            old_ts = timestamps[old_mask]
+            pos = np.minimum(np.searchsorted(view, old_ts), len(view) - 1)
+            hit = view[pos] == old_ts
+            idx = self._start + pos[hit]
+            self._values[:, idx] = rows[old_mask][hit][:, 1:6].T
+
+        # 追加新的K线
+        new_rows = rows[~old_mask]
+        if len(new_rows) > 0:
+            if new_rows[0, 0] - last_ts > self.timeframe_ms:
+                return False
+            self._append(new_rows)
+
+        return True
+
+    def to_frame(self):
+        """
+        以DataFrame形式暴露缓冲区中的数据
+
+        返回的DataFrame直接引用缓冲区内存，不做拷贝；
+        缓冲区下一次更新时内容会随之变化，需要长期保存时请自行copy()
+
+        Returns:
+            pandas.DataFrame: 包含candle_begin_time_GMT8, open, high, low, close, volume列的K线数据
+        """
+        s, e = self._start, self._end
+        return pd.DataFrame({
+            'candle_begin_time_GMT8': self._time[s:e],
+            'open': self._values[0, s:e],
+            'high': self._values[1, s:e],
+            'low': self._values[2, s:e],
+            'close': self._values[3, s:e],
+            'volume': self._values[4, s:e],
+        }, copy=False)
+
+    def to_array(self):
+        """
+        获取缓冲区数据的拷贝
+
+        Returns:
+            numpy.ndarray: 形状为(n, 6)的数组，列依次为timestamp, open, high, low, close, volume
+        """
+        s, e = self._start, self._end
+        result = np.empty((e - s, 6), dtype=np.float64)
+        result[:, 0] = self._ts[s:e]
+        result[:, 1:6] = self._values[:, s:e].T
+        return result
+
+    def _normalize(self, rows):
+        """将原始K线转换为按时间排序的float64二维数组"""
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or len(rows) == 0:
+            return np.empty((0, 6), dtype=np.float64)
+        rows = rows[:, :6]
+        if len(rows) > 1 and np.any(np.diff(rows[:, 0]) < 0):
+            rows = rows[np.argsort(rows[:, 0], kind='stable')]
+        return rows
+
+    def _write(self, pos, rows):
+        """从数组位置pos开始写入K线"""
+        n = len(rows)
+        timestamps = rows[:, 0].astype(np.int64)
+        self._ts[pos:pos + n] = timestamps
+        self._time[pos:pos + n] = (timestamps + GMT8_OFFSET_MS).astype('datetime64[ms]')
+        self._values[:, pos:pos + n] = rows[:, 1:6].T
+
+    def _append(self, rows):
+        """在尾部追加K线，空间不足时把最近的K线搬回数组头部"""
+        n = len(rows)
+        if n >= self.capacity:
+            self.load(rows)
+            return
+
+        if self._end + n > self._size:
+            keep = min(len(self), self.capacity - n)
+            src = slice(self._end - keep, self._end)
+            self._ts[:keep] = self._ts[src]
+            self._time[:keep] = self._time[src]
+            self._values[:, :keep] = self._values[:, src]
+            self._start, self._end = 0, keep
+
+        self._write(self._end, rows)
+        self._end += n
+
+        # 只保留最近capacity根K线
+        if len(self) > self.capacity:
+            self._start = self._end - self.capacity
+
 
 class DataFeed:
-    def __init__(self, trader, symbol, timeframe, limit=1200):
+    def __init__(self, trader, symbol, timeframe, limit=1200, incremental=False, store=None):
         """
         初始化数据获取模块
         
@@ -27,14 +203,24 @@ class DataFeed:
             symbol: 交易对
             timeframe: 时间周期，如'1m', '5m', '1h', '1d'等
             limit: 获取K线的数量，默认1000条
+            incremental: 是否启用增量模式，启用后只获取上次更新以来的新K线
+            store: 本地K线存储(KlineStore)，设置后全量获取时优先使用本地已保存的K线
         """
         self.trader = trader
         self.symbol = symbol
         self.timeframe = timeframe
         self.limit = limit
+        self.incremental = incremental
+        self.store = store
         self.data = []  # 存储原始K线数据
         self.df = None  # 存储处理后的DataFrame
         self.logger = logger_manager.get_system_logger()  # 获取系统日志记录器
+
+        # 增量模式下使用K线缓冲区保存历史数据
+        self.buffer = None
+        if self.incremental:
+            timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+            self.buffer = KlineBuffer(limit, timeframe_ms)
         
     def update(self):
         """
@@ -44,9 +230,16 @@ class DataFeed:
             pandas.DataFrame: K线数据
         """
         try:
+            # 增量模式且已有历史数据时，只获取缺少的K线
+            if self.buffer is not None and len(self.buffer) > 0:
+                return self._update_incremental()
+
             # 获取历史K线数据
             self.logger.info(f"获取K线数据 - {self.symbol} - {self.timeframe} - 数量: {self.limit}")
-            ohlcv = self.trader.fetch_ohlcv(self.symbol, self.timeframe, self.limit)
+            if self.store is not None:
+                ohlcv = self.store.load_ohlcv(self.trader, self.symbol, self.timeframe, self.limit).tolist()
+            else:
+                ohlcv = self.trader.fetch_ohlcv(self.symbol, self.timeframe, self.limit)
 
             self.data = ohlcv  # 保存原始数据
             
@@ -55,7 +248,11 @@ class DataFeed:
                 return pd.DataFrame()
             
             # 处理数据
-            self._process_data()
+            if self.buffer is not None:
+                self.buffer.load(ohlcv)
+                self.df = self.buffer.to_frame()
+            else:
+                self._process_data()
             
             self.logger.info(f"成功获取了 {len(self.df)} 条K线数据")
             return self.df
@@ -79,6 +276,48 @@ class DataFeed:
                 self.logger.error(f"发送错误通知失败: {str(notify_error)}")
                 
             return pd.DataFrame()
+
+    def _update_incremental(self):
+        """
+        增量更新K线数据
+
+        只请求上次最新K线之后的数据（包括上次尚未走完、需要被覆盖的那根K线），
+        缺口过大或数据不连续时退回全量获取
+
+        Returns:
+            pandas.DataFrame: K线数据
+        """
+        now_ms = int(time.time() * 1000)
+        missing = max(0, (now_ms - self.buffer.last_timestamp) // self.buffer.timeframe_ms)
+
+        if missing + 2 >= self.limit:
+            self.logger.info(f"距离上次更新缺少 {missing} 根K线，重新全量获取")
+            self.buffer.clear()
+            return self.update()
+
+        # 多取2根：上次未走完的K线和当前正在形成的K线
+        fetch_count = int(missing) + 2
+        self.logger.info(f"增量获取K线数据 - {self.symbol} - {self.timeframe} - 数量: {fetch_count}")
+        ohlcv = self.trader.fetch_ohlcv(self.symbol, self.timeframe, fetch_count)
+
+        self.data = ohlcv  # 保存本次获取的原始数据
+
+        if ohlcv is None or len(ohlcv) == 0:
+            self.logger.warning(f"获取到的K线数据为空 - {self.symbol} - {self.timeframe}")
+            return pd.DataFrame()
+
+        if not self.buffer.merge(ohlcv):
+            self.logger.warning(f"增量K线与已有数据不连续，重新全量获取 - {self.symbol} - {self.timeframe}")
+            self.buffer.clear()
+            return self.update()
+
+        # 已走完的K线写入本地存储，供其他进程复用
+        if self.store is not None:
+            self.store.append(self.symbol, self.timeframe, ohlcv, now_ms)
+
+        self.df = self.buffer.to_frame()
+        self.logger.info(f"增量更新完成，当前共 {len(self.df)} 条K线数据")
+        return self.df
     
     def _process_data(self):
         """处理原始K线数据，转换为DataFrame格式"""
@@ -127,4 +366,37 @@ class DataFeed:
         Returns:
             list: 原始K线数据
         """
-        return self.data 
\ No newline at end of file
+        if self.buffer is not None:
+            return self.buffer.to_array().tolist()
+        return self.data 
+
+
+class SharedDataFeed(DataFeed):
+    """
+    多个策略实例共用的数据源
+
+    同一交易对、周期的多个策略实例（如多个账户跑同一个币）共用一个SharedDataFeed，
+    同一根K线内只有第一次update()真正请求交易所，之后返回缓存数据的副本，避免策略之间互相修改
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.RLock()
+        self._timeframe_ms = get_seconds_from_timeframe(self.timeframe) * 1000
+        self._updated_bar = None
+        self.fetch_count = 0  # 实际请求交易所的次数
+
+    def update(self):
+        """
+        获取或更新K线数据，同一根K线内复用第一次获取的结果
+
+        Returns:
+            pandas.DataFrame: K线数据副本
+        """
+        bar = int(time.time() * 1000) // self._timeframe_ms
+        with self._lock:
+            if self._updated_bar != bar or self.df is None or self.df.empty:
+                df = super().update()
+                self.fetch_count += 1
+                self._updated_bar = bar if df is not None and not df.empty else None
+            return self.df.copy() if self.df is not None else pd.DataFrame()
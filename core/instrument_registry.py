@@ -0,0 +1,207 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+合约规格索引
+
+一次请求获取所有永续合约的规格（面值、下单精度、最小下单量、价格精度、最大杠杆、状态），按instId建立索引并保存到磁盘，
+超过刷新间隔后重新获取。多个进程（多个账户目录）共用同一个文件，其中一个进程刷新后其他进程直接读取文件。
+仓位计算、止盈止损取整和选币都从这里查询，不再逐个交易对请求合约信息
+"""
+
+import os
+import json
+import time
+import threading
+from core.logger_manager import logger_manager
+
+# 索引中保留的OKX原始字段
+INSTRUMENT_FIELDS = ('instId', 'instType', 'ctType', 'ctVal', 'ctValCcy', 'settleCcy',
+                     'lotSz', 'minSz', 'tickSz', 'lever', 'state')
+
+
+class InstrumentRegistry:
+    """永续合约规格索引"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, trader=None):
+        """
+        获取单例实例
+
+        Args:
+            trader: 用于刷新合约列表的OkxTrader，第一次传入后保存
+
+        Returns:
+            InstrumentRegistry: 索引实例，配置中未启用时返回None
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                from config.config import instrument_registry_config, exchange_config
+                if not instrument_registry_config.get('enabled', True):
+                    return None
+                # 模拟交易所的合约是按名称生成的，只保存在内存中，不覆盖实盘的合约文件
+                path = None
+                if exchange_config.get('backend', 'okx') == 'okx':
+                    path = instrument_registry_config.get('path', '~/.lhcxy/instruments.json')
+                cls._instance = cls(path, instrument_registry_config.get('refresh_interval', 3600))
+            if trader is not None and cls._instance.trader is None:
+                cls._instance.trader = trader
+            return cls._instance
+
+    def __init__(self, path=None, refresh_interval=3600, trader=None):
+        """
+        初始化合约规格索引
+
+        Args:
+            path: 保存文件路径，None表示只保存在内存中
+            refresh_interval: 刷新间隔(秒)
+            trader: 用于刷新合约列表的OkxTrader
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.refresh_interval = refresh_interval
+        self.trader = trader
+        self.logger = logger_manager.get_system_logger()
+        self._instruments = {}    # instId -> 合约规格
+        self._updated = 0.0       # 合约列表获取时间
+        self._last_attempt = 0.0  # 上次尝试刷新的时间，避免未知交易对导致反复请求
+        self._lock = threading.RLock()
+
+    def _stale(self):
+        return time.time() - self._updated >= self.refresh_interval
+
+    def _load_file(self):
+        """读取保存文件，文件比内存中的数据新时替换内存数据"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('updated', 0) > self._updated:
+                self._instruments = data.get('instruments', {})
+                self._updated = data['updated']
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"读取合约规格文件失败: {str(e)}")
+
+    def _save_file(self):
+        """写入保存文件（先写临时文件再替换，其他进程不会读到写了一半的文件）"""
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'updated': self._updated, 'instruments': self._instruments}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"保存合约规格文件失败: {str(e)}")
+
+    def refresh(self, force=False):
+        """
+        数据过期时重新获取所有永续合约
+
+        Args:
+            force: 是否忽略刷新间隔立即获取
+
+        Returns:
+            bool: 是否从交易所获取了新数据
+        """
+        with self._lock:
+            if not force:
+                self._load_file()
+                if not self._stale():
+                    return False
+            # 请求失败或未设置trader时，1分钟内不再重试
+            if time.time() - self._last_attempt < 60:
+                return False
+            self._last_attempt = time.time()
+            if self.trader is None:
+                return False
+            try:
+                instruments = self.trader.fetch_all_instruments('SWAP')
+            except Exception as e:
+                self.logger.warning(f"获取合约列表失败: {str(e)}")
+                return False
+            if not instruments:
+                return False
+            self._instruments = {item['instId']: {field: item.get(field, '') for field in INSTRUMENT_FIELDS}
+                                 for item in instruments}
+            self._updated = time.time()
+            self._save_file()
+            self.logger.info(f"合约规格索引已刷新，共 {len(self._instruments)} 个永续合约")
+            return True
+
+    def get(self, inst_id):
+        """
+        获取合约规格
+
+        Args:
+            inst_id: 产品ID，如BTC-USDT-SWAP
+
+        Returns:
+            dict: OKX原始字段（字符串），未知合约返回None
+        """
+        with self._lock:
+            if self._stale():
+                self.refresh()
+            instrument = self._instruments.get(inst_id)
+            if instrument is None and self.refresh(force=True):
+                # 可能是新上线的合约
+                instrument = self._instruments.get(inst_id)
+            return instrument
+
+    def contract_info(self, inst_id):
+        """
+        获取PositionManager.get_contract_info格式的合约信息
+
+        Returns:
+            dict: 未知合约返回None
+        """
+        instrument = self.get(inst_id)
+        if instrument is None:
+            return None
+        return {
+            'min_size': float(instrument.get('minSz') or 0),
+            'size_increment': float(instrument.get('lotSz') or 0),
+            'price_increment': float(instrument.get('tickSz') or 0),
+            'contract_value': float(instrument.get('ctVal') or 0),
+            'contract_type': instrument.get('instType', ''),
+            'face_value': float(instrument.get('ctVal') or 1),  # 合约面值，默认为1
+            'max_leverage': float(instrument.get('lever') or 100),  # 最大杠杆，默认为100倍
+        }
+
+    def tick_size(self, inst_id):
+        """获取价格精度，未知合约返回None"""
+        instrument = self.get(inst_id)
+        return float(instrument.get('tickSz') or 0) if instrument else None
+
+    def symbols(self, ct_type='linear', state='live', settle_ccy='USDT'):
+        """
+        按条件筛选合约
+
+        Args:
+            ct_type: 合约类型，linear为U本位
+            state: 合约状态，live为可交易
+            settle_ccy: 结算币种
+
+        Returns:
+            list: instId列表
+        """
+        with self._lock:
+            if self._stale():
+                self.refresh()
+            return [inst_id for inst_id, item in self._instruments.items()
+                    if item.get('ctType') == ct_type and item.get('state') == state
+                    and item.get('settleCcy', settle_ccy) == settle_ccy]
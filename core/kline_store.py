@@ -0,0 +1,254 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+本地K线存储
+
+按交易对和时间周期把已走完的K线保存为只追加的列式文件，
+每列一个文件（timestamp/open/high/low/close/volume），通过numpy.memmap读取。
+多个进程（主策略、选币、其他子账户目录）共用同一个存储目录，
+读取时先用本地数据，只向交易所请求缺少的最新部分。
+"""
+
+import os
+import time
+import numpy as np
+from contextlib import contextmanager
+from core.logger_manager import logger_manager
+from core.time_utils import get_seconds_from_timeframe
+
+try:
+    import fcntl  # 仅类Unix系统可用，用于进程间文件锁
+except ImportError:
+    fcntl = None
+
+# 列名和对应的数据类型，列顺序与交易所返回的K线一致
+COLUMNS = [
+    ('timestamp', np.int64),
+    ('open', np.float64),
+    ('high', np.float64),
+    ('low', np.float64),
+    ('close', np.float64),
+    ('volume', np.float64),
+]
+
+
+class KlineStore:
+    """
+    本地K线存储类
+
+    每个交易对/时间周期对应一个目录，目录内每列一个只追加的二进制文件，
+    只保存已经走完的K线，正在形成的K线始终从交易所获取
+    """
+
+    _instance = None  # 单例模式
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取单例实例
+
+        Returns:
+            KlineStore: 存储实例，配置中未启用时返回None
+        """
+        if cls._instance is None:
+            from config.config import kline_store_config
+            if not kline_store_config.get('enabled', False):
+                return None
+            cls._instance = cls(kline_store_config.get('path', '~/.lhcxy/kline_store'))
+        return cls._instance
+
+    def __init__(self, root_dir):
+        """
+        初始化K线存储
+
+        Args:
+            root_dir: 存储根目录，支持~表示用户目录
+        """
+        self.root_dir = os.path.expanduser(root_dir)
+        self.logger = logger_manager.get_market_logger()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def _series_dir(self, symbol, timeframe):
+        """获取交易对/时间周期对应的存储目录"""
+        path = os.path.join(self.root_dir, timeframe, symbol)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    @contextmanager
+    def _lock(self, series_dir, exclusive):
+        """
+        进程间文件锁，写入使用排他锁，读取使用共享锁
+
+        Args:
+            series_dir: 存储目录
+            exclusive: 是否排他锁
+        """
+        with open(os.path.join(series_dir, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _row_count(self, series_dir):
+        """已完整写入的K线数量（取各列文件长度的最小值）"""
+        counts = []
+        for name, dtype in COLUMNS:
+            path = os.path.join(series_dir, name)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            counts.append(size // np.dtype(dtype).itemsize)
+        return min(counts)
+
+    def read(self, symbol, timeframe, limit=None):
+        """
+        读取本地保存的K线
+
+        Args:
+            symbol: 交易对
+            timeframe: 时间周期
+            limit: 最多返回最近的多少根K线，None表示全部
+
+        Returns:
+            numpy.ndarray: 形状为(n, 6)的数组，列依次为timestamp, open, high, low, close, volume
+        """
+        series_dir = self._series_dir(symbol, timeframe)
+        with self._lock(series_dir, exclusive=False):
+            n = self._row_count(series_dir)
+            if n == 0:
+                return np.empty((0, 6), dtype=np.float64)
+
+            start = 0 if limit is None else max(0, n - limit)
+            result = np.empty((n - start, 6), dtype=np.float64)
+            for i, (name, dtype) in enumerate(COLUMNS):
+                column = np.memmap(os.path.join(series_dir, name), dtype=dtype, mode='r', shape=(n,))
+                result[:, i] = column[start:n]
+                del column
+            return result
+
+    def last_timestamp(self, symbol, timeframe):
+        """
+        获取本地最新一根K线的开盘时间戳
+
+        Returns:
+            int: 时间戳(毫秒)，没有数据时返回None
+        """
+        rows = self.read(symbol, timeframe, limit=1)
+        return int(rows[-1, 0]) if len(rows) else None
+
+    def append(self, symbol, timeframe, rows, now_ms=None):
+        """
+        追加K线，只保存已经走完且比本地更新的K线
+
+        新数据与本地数据不连续时（例如长时间未运行），清空本地数据后重新写入，
+        保证本地保存的始终是一段连续的K线
+
+        Args:
+            symbol: 交易对
+            timeframe: 时间周期
+            rows: 形如[[timestamp, open, high, low, close, volume], ...]的K线数据
+            now_ms: 当前时间戳(毫秒)，默认取系统时间
+
+        Returns:
+            int: 实际写入的K线数量
+        """
+        rows = np.asarray(rows, dtype=np.float64)
+        if rows.ndim != 2 or len(rows) == 0:
+            return 0
+        rows = rows[np.argsort(rows[:, 0], kind='stable'), :6]
+
+        timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+        if now_ms is None:
+            now_ms = int(time.time() * 1000)
+
+        # 只保存已走完的K线
+        rows = rows[rows[:, 0] + timeframe_ms <= now_ms]
+        if len(rows) == 0:
+            return 0
+
+        series_dir = self._series_dir(symbol, timeframe)
+        with self._lock(series_dir, exclusive=True):
+            n = self._row_count(series_dir)
+            if n > 0:
+                last_ts = int(np.memmap(os.path.join(series_dir, 'timestamp'), dtype=np.int64, mode='r', shape=(n,))[-1])
+                rows = rows[rows[:, 0] > last_ts]
+                if len(rows) == 0:
+                    return 0
+                if rows[0, 0] - last_ts > timeframe_ms:
+                    self.logger.info(f"本地K线与新数据不连续，重建本地存储 - {symbol} - {timeframe}")
+                    n = 0
+
+            # 时间戳列最后写入，读取方以最短的列为准，避免读到写了一半的K线；
+            # 每列从第n行写起，上次写入中断时较长的列多出的数据被覆盖，各列始终按行对齐。
+            # 重建时先清空时间戳列，重写其他列的过程中中断，不会把旧的时间戳和新的价格拼在一起
+            if n == 0:
+                open(os.path.join(series_dir, 'timestamp'), 'wb').close()
+            for i, (name, dtype) in reversed(list(enumerate(COLUMNS))):
+                offset = n * np.dtype(dtype).itemsize
+                with open(os.path.join(series_dir, name), 'r+b' if offset else 'wb') as f:
+                    f.truncate(offset)
+                    f.seek(offset)
+                    f.write(np.ascontiguousarray(rows[:, i], dtype=dtype).tobytes())
+
+        return len(rows)
+
+    def load_ohlcv(self, trader, symbol, timeframe, limit):
+        """
+        优先从本地读取K线，只向交易所请求缺少的最新部分
+
+        Args:
+            trader: OkxTrader实例
+            symbol: 交易对
+            timeframe: 时间周期
+            limit: 需要的K线数量
+
+        Returns:
+            numpy.ndarray: 最近limit根K线（包含正在形成的K线），形状为(n, 6)
+        """
+        timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+        now_ms = int(time.time() * 1000)
+
+        stored = self.read(symbol, timeframe, limit)
+        missing = 0
+        if len(stored) > 0:
+            missing = max(0, (now_ms - int(stored[-1, 0])) // timeframe_ms)
+
+        # 本地数据足够时只请求缺少的部分，多取1根用于和本地数据衔接
+        use_store = len(stored) > 0 and missing + 1 < limit and len(stored) + missing >= limit
+        fetch_count = int(missing) + 1 if use_store else limit
+        fetched = trader.fetch_ohlcv(symbol, timeframe, fetch_count)
+        fetched = np.asarray(fetched if fetched is not None else [], dtype=np.float64)
+        if fetched.ndim != 2 or len(fetched) == 0:
+            return np.empty((0, 6), dtype=np.float64)
+        fetched = fetched[np.argsort(fetched[:, 0], kind='stable'), :6]
+
+        self.append(symbol, timeframe, fetched, now_ms)
+
+        if not use_store:
+            return fetched[-limit:]
+
+        head = stored[stored[:, 0] < fetched[0, 0]]
+        if len(head) > 0 and fetched[0, 0] - head[-1, 0] > timeframe_ms:
+            # 交易所返回的数据与本地数据之间有缺口，退回全量获取
+            self.logger.warning(f"K线数据与本地存储不连续，重新全量获取 - {symbol} - {timeframe}")
+            fetched = np.asarray(trader.fetch_ohlcv(symbol, timeframe, limit) or [], dtype=np.float64)
+            if fetched.ndim != 2 or len(fetched) == 0:
+                return np.empty((0, 6), dtype=np.float64)
+            fetched = fetched[np.argsort(fetched[:, 0], kind='stable'), :6]
+            self.append(symbol, timeframe, fetched, now_ms)
+            return fetched[-limit:]
+
+        self.logger.info(f"使用本地K线 {len(head)} 根，从交易所补充 {len(fetched)} 根 - {symbol} - {timeframe}")
+        return np.vstack([head, fetched])[-limit:]
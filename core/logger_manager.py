@@ -15,26 +15,117 @@ okx u本位择时策略实盘框架
 
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import json
+import queue
+import atexit
+import threading
+from logging.handlers import TimedRotatingFileHandler, QueueHandler, QueueListener
 import datetime
 
+# LogRecord自带的属性，其余属性（logger.info(..., extra={...})传入的字段）写入结构化日志
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonLineFormatter(logging.Formatter):
+    """结构化日志格式，每条日志一行JSON，extra传入的字段原样保留"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+            'thread': record.threadName,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc_info'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _DroppingQueueHandler(QueueHandler):
+    """队列已满时丢弃INFO及以下的日志并计数，WARNING及以上的日志在调用线程中直接写出，不阻塞调用线程"""
+
+    def __init__(self, log_queue, manager):
+        super().__init__(log_queue)
+        self.manager = manager
+
+    def prepare(self, record):
+        # 在调用线程中只合并消息参数（参数可能在之后被修改），格式化和写文件由后台线程完成
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING and self.manager._router is not None:
+                # 警告和错误不能丢，改为同步写（各处理器自带锁，可与后台线程同时写）
+                self.manager._router.handle(record)
+            else:
+                self.manager.dropped += 1
+
+
+class _BlockingQueueListener(QueueListener):
+    """停止时队列已满也等待放入结束标记，保证队列中的日志全部写完"""
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+
+class _RoutingHandler(logging.Handler):
+    """后台线程中按日志记录器名称把日志交给对应的控制台/文件处理器"""
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}  # 日志记录器名称 -> 处理器列表
+
+    def handle(self, record):
+        for handler in self.routes.get(record.name, ()):
+            if record.levelno >= handler.level:
+                handler.handle(record)
+        return True
+
+
 class LoggerManager:
     """
     日志管理类，用于管理量化交易框架的日志记录
     支持将日志同时输出到控制台和文件，按日期自动切分日志文件
+    异步模式下日志记录器只把日志放入队列，由后台线程格式化并写入控制台和文件
     """
     
-    def __init__(self, log_dir="logs", log_level=logging.INFO):
+    def __init__(self, log_dir="logs", log_level=None, config=None):
         """
         初始化日志管理器
         
         Args:
             log_dir (str): 日志文件存储目录，默认为"logs"
-            log_level (int): 日志级别，默认为INFO
+            log_level (int): 日志级别，默认取logging_config，未配置时为INFO
+            config (dict): 日志配置，默认使用logging_config
         """
+        if config is None:
+            try:
+                from config.config import logging_config
+                config = logging_config
+            except ImportError:
+                config = {}
+        self.config = config
         self.log_dir = log_dir
-        self.log_level = log_level
+        self.log_level = log_level if log_level is not None else logging.getLevelName(config.get('level', 'INFO'))
         self.loggers = {}
+        self.dropped = 0  # 异步模式下队列已满丢弃的日志数
+        self._queue = None
+        self._listener = None
+        self._router = None
+        self._lock = threading.Lock()
         
         # 确保日志目录存在
         if not os.path.exists(log_dir):
@@ -54,13 +145,44 @@ class LoggerManager:
         if name in self.loggers:
             return self.loggers[name]
         
-        # 创建新的日志记录器
-        logger = logging.getLogger(name)
-        logger.setLevel(self.log_level)
-        
-        # 如果已有处理器，则不重复添加
-        if logger.handlers:
+        with self._lock:
+            if name in self.loggers:
+                return self.loggers[name]
+            
+            # 创建新的日志记录器
+            logger = logging.getLogger(name)
+            logger.setLevel(self.log_level)
+            
+            # 如果已有处理器，则不重复添加
+            if logger.handlers:
+                return logger
+            
+            handlers = self._create_handlers(name)
+            if self.config.get('async', True):
+                # 异步模式：处理器在后台线程中执行
+                self._start_listener()
+                self._router.routes[name] = handlers
+                logger.addHandler(_DroppingQueueHandler(self._queue, self))
+                logger.propagate = False
+            else:
+                for handler in handlers:
+                    logger.addHandler(handler)
+            
+            # 存储日志记录器实例
+            self.loggers[name] = logger
             return logger
+    
+    def _create_handlers(self, name):
+        """
+        创建日志记录器的控制台、文件和结构化日志处理器
+        
+        Args:
+            name (str): 日志记录器名称
+            
+        Returns:
+            list: 处理器列表
+        """
+        handlers = []
         
         # 创建格式化器
         formatter = logging.Formatter(
@@ -69,9 +191,10 @@ class LoggerManager:
         )
         
         # 创建控制台处理器
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        if self.config.get('console', True):
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            handlers.append(console_handler)
         
         # 创建文件处理器，按天切分
         log_file = os.path.join(self.log_dir, f"{name}.log")
@@ -83,11 +206,55 @@ class LoggerManager:
         )
         file_handler.setFormatter(formatter)
         file_handler.suffix = "%Y-%m-%d.log"  # 日志文件后缀格式
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+        
+        # 结构化日志，每行一条JSON，便于程序分析
+        if self.config.get('jsonl', False):
+            jsonl_handler = TimedRotatingFileHandler(
+                os.path.join(self.log_dir, f"{name}.jsonl"),
+                when="midnight",
+                interval=1,
+                backupCount=30,
+                encoding='utf-8'
+            )
+            jsonl_handler.setFormatter(JsonLineFormatter())
+            jsonl_handler.suffix = "%Y-%m-%d.jsonl"
+            handlers.append(jsonl_handler)
+        
+        return handlers
+    
+    def _start_listener(self):
+        """启动异步模式的后台写日志线程（所有日志记录器共用）"""
+        if self._listener is not None:
+            return
+        self._queue = queue.Queue(maxsize=self.config.get('queue_size', 10000))
+        self._router = _RoutingHandler()
+        self._listener = _BlockingQueueListener(self._queue, self._router)
+        self._listener.start()
+        atexit.register(self.shutdown)
+    
+    def shutdown(self):
+        """写完队列中的日志后停止后台线程，异步模式下程序退出时自动调用"""
+        with self._lock:
+            if self._listener is None:
+                return
+            listener, self._listener = self._listener, None
+        listener.stop()
+        for handlers in self._router.routes.values():
+            for handler in handlers:
+                handler.flush()
+    
+    def stats(self):
+        """
+        异步日志队列状态
         
-        # 存储日志记录器实例
-        self.loggers[name] = logger
-        return logger
+        Returns:
+            dict: 队列中待写入的日志数、丢弃的日志数
+        """
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'dropped': self.dropped,
+        }
     
     def get_trade_logger(self):
         """
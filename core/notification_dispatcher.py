@@ -0,0 +1,246 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+后台通知发送
+
+WeChatNotifier把消息放入有界队列后立即返回，由后台线程发送，交易线程不再等待发送间隔和HTTP请求：
+- 每个webhook单独限频（企业微信机器人每分钟最多20条）
+- 等待发送间隔期间到达的同一webhook的消息合并为一条汇总消息（超过企业微信的长度上限时分多条）
+- 所有webhook共用一个保持连接的requests.Session
+- 触发企业微信限频(errcode 45009)时该webhook暂停后重发
+- 进程退出前尽量发完队列中的消息
+"""
+
+import json
+import time
+import queue
+import atexit
+import threading
+from collections import deque
+import requests
+from core.logger_manager import logger_manager
+
+# 企业微信消息内容的字节数上限
+MAX_CONTENT_BYTES = {'text': 2048, 'markdown': 4096}
+
+# 企业微信接口调用超过限制
+WECHAT_RATE_LIMITED = 45009
+
+# 汇总消息中各条消息之间的分隔
+_SEPARATOR = {'text': '\n\n----------\n\n', 'markdown': '\n\n'}
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """企业微信通知的后台发送线程"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取单例实例
+
+        Returns:
+            NotificationDispatcher: 发送线程，配置中未启用时返回None
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                from config.config import notification_dispatcher_config
+                if not notification_dispatcher_config.get('enabled', True):
+                    return None
+                cls._instance = cls(notification_dispatcher_config)
+                atexit.register(cls._instance.stop)
+            return cls._instance
+
+    def __init__(self, config):
+        """
+        初始化发送线程（第一次提交消息时启动）
+
+        Args:
+            config: 发送配置（queue_size、min_interval、rate_limit_backoff、request_timeout、flush_timeout）
+        """
+        self.min_interval = config.get('min_interval', 3)
+        self.rate_limit_backoff = config.get('rate_limit_backoff', 60)
+        self.request_timeout = config.get('request_timeout', 10)
+        self.flush_timeout = config.get('flush_timeout', 5)
+        self.logger = logger_manager.get_logger("notification")
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        self._queue = queue.Queue(maxsize=config.get('queue_size', 1000))
+        self._pending = {}     # (webhook, msgtype) -> 待发送的消息
+        self._next_send = {}   # webhook -> 下次允许发送的时间
+        self._idle = threading.Condition()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.sent = 0          # 实际发出的请求数
+        self.dropped = 0       # 队列已满丢弃的消息数
+
+    def submit(self, webhook_url, msgtype, content):
+        """
+        提交一条消息，不等待发送
+
+        Args:
+            webhook_url: 企业微信机器人webhook地址
+            msgtype: text或markdown
+            content: 消息内容
+
+        Returns:
+            bool: 是否已放入队列，队列已满时丢弃并返回False
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((webhook_url, msgtype, content))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            self.logger.warning(f"通知队列已满，丢弃消息: {content[:50]}...")
+            return False
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="notification-dispatcher", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout=None):
+        """
+        等待队列中的消息发送完
+
+        Args:
+            timeout: 最长等待秒数，默认取配置
+
+        Returns:
+            bool: 是否已全部发送
+        """
+        timeout = self.flush_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        with self._idle:
+            while self._queue.unfinished_tasks or self._pending:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def stop(self):
+        """发送剩余消息后停止发送线程"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self.flush()
+        try:
+            self._queue.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=1)
+        self.session.close()
+
+    def _run(self):
+        while True:
+            item = self._next_item()
+            stopping = False
+            while item is not None:
+                if item is _STOP:
+                    stopping = True
+                else:
+                    webhook_url, msgtype, content = item
+                    self._pending.setdefault((webhook_url, msgtype), deque()).append(content)
+                self._queue.task_done()
+                # 把已到达的消息一次取完，便于合并
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = None
+            if stopping:
+                return
+            self._send_due()
+            with self._idle:
+                self._idle.notify_all()
+
+    def _next_item(self):
+        """等待下一条消息，有待发送消息时最多等到最早可发送的时间"""
+        if not self._pending:
+            return self._queue.get()
+        wait = min(self._next_send.get(webhook_url, 0) for webhook_url, _ in self._pending) - time.time()
+        try:
+            return self._queue.get(timeout=max(0.0, wait)) if wait > 0 else self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _send_due(self):
+        """发送已过发送间隔的webhook的待发送消息，每个webhook每次只发一条"""
+        now = time.time()
+        sent_webhooks = set()
+        for key in list(self._pending):
+            webhook_url, msgtype = key
+            if webhook_url in sent_webhooks or self._next_send.get(webhook_url, 0) > now:
+                continue
+            messages = self._pending[key]
+            batch = self._take_batch(messages, msgtype)
+            if not messages:
+                del self._pending[key]
+            sent_webhooks.add(webhook_url)
+            self._next_send[webhook_url] = time.time() + self.min_interval
+            if self._post(webhook_url, msgtype, self._digest(batch, msgtype)) == WECHAT_RATE_LIMITED:
+                # 放回队首，暂停后重发
+                self._pending.setdefault(key, deque()).extendleft(reversed(batch))
+                self._next_send[webhook_url] = time.time() + self.rate_limit_backoff
+
+    @staticmethod
+    def _take_batch(messages, msgtype):
+        """从待发送消息中取出合并后不超过长度上限的一批，单条超长的消息单独发送"""
+        limit = MAX_CONTENT_BYTES.get(msgtype, 2048)
+        batch = [messages.popleft()]
+        while messages:
+            if len(NotificationDispatcher._digest(batch + [messages[0]], msgtype).encode('utf-8')) > limit:
+                break
+            batch.append(messages.popleft())
+        return batch
+
+    @staticmethod
+    def _digest(batch, msgtype):
+        if len(batch) == 1:
+            return batch[0]
+        title = f"通知汇总（{len(batch)}条）" if msgtype == 'text' else f"**通知汇总（{len(batch)}条）**"
+        return title + _SEPARATOR.get(msgtype, '\n\n') + _SEPARATOR.get(msgtype, '\n\n').join(batch)
+
+    def _post(self, webhook_url, msgtype, content):
+        """
+        发送一条消息
+
+        Returns:
+            int: 企业微信返回的errcode，请求失败时返回None
+        """
+        message = {"msgtype": msgtype, msgtype: {"content": content}}
+        try:
+            response = self.session.post(webhook_url, data=json.dumps(message), timeout=self.request_timeout)
+            self.sent += 1
+            if response.status_code != 200:
+                self.logger.error(f"通知HTTP请求失败，状态码: {response.status_code}")
+                return None
+            errcode = response.json().get('errcode')
+            if errcode == 0:
+                self.logger.info(f"通知发送成功: {content[:50]}...")
+            elif errcode == WECHAT_RATE_LIMITED:
+                self.logger.warning(f"企业微信通知触发限频，{self.rate_limit_backoff}秒后重发")
+            else:
+                self.logger.error(f"通知发送失败: {response.json().get('errmsg')}")
+            return errcode
+        except Exception as e:
+            self.logger.error(f"发送通知时发生错误: {str(e)}")
+            return None
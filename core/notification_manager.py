@@ -24,6 +24,7 @@ import json
 import time
 import logging
 from typing import Dict, Any, Optional, List, Union
+from core.notification_dispatcher import NotificationDispatcher
 
 class WeChatNotifier:
     """
@@ -54,12 +55,17 @@ class WeChatNotifier:
             content: 消息内容
             
         Returns:
-            bool: 发送是否成功
+            bool: 发送是否成功（启用后台发送时表示是否已放入发送队列）
         """
         if not self.enabled or not self.webhook_url:
             self.logger.warning("通知功能未启用或webhook URL未设置")
             return False
             
+        # 交给后台线程发送，立即返回
+        dispatcher = NotificationDispatcher.get_instance()
+        if dispatcher is not None:
+            return dispatcher.submit(self.webhook_url, "text", content)
+            
         # 检查发送频率
         current_time = time.time()
         if current_time - self.last_send_time < self.min_interval:
@@ -105,12 +111,17 @@ class WeChatNotifier:
             content: markdown格式的消息内容
             
         Returns:
-            bool: 发送是否成功
+            bool: 发送是否成功（启用后台发送时表示是否已放入发送队列）
         """
         if not self.enabled or not self.webhook_url:
             self.logger.warning("通知功能未启用或webhook URL未设置")
             return False
             
+        # 交给后台线程发送，立即返回
+        dispatcher = NotificationDispatcher.get_instance()
+        if dispatcher is not None:
+            return dispatcher.submit(self.webhook_url, "markdown", content)
+            
         # 检查发送频率
         current_time = time.time()
         if current_time - self.last_send_time < self.min_interval:
@@ -0,0 +1,580 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+进程内OKX交易所模拟器
+
+实现OkxTrader用到的ccxt.okx方法（统一接口和OKX原始接口），可以直接替换OkxTrader.exchange，
+用于在没有实盘账户的情况下运行main.py、tp_sl_monitor.py和选币脚本，以及做吞吐量压测：
+- 行情由交易对和时间决定（多个周期的正弦波叠加哈希噪声），同一时间多次请求得到完全相同的K线
+- 订单按标记价格加滑点立即成交，支持双向持仓、全仓杠杆、reduceOnly平仓和一键平仓
+- 可注入固定延迟、抖动和随机故障（网络错误、超时、限频），随机数使用固定种子，调用顺序相同则结果完全一致
+"""
+
+import math
+import time
+import random
+import bisect
+import hashlib
+import threading
+import ccxt
+from core.logger_manager import logger_manager
+from core.time_utils import get_seconds_from_timeframe
+
+# 默认合约：交易对 -> (基准价格, 合约面值)；其他交易对按名称自动生成
+DEFAULT_INSTRUMENTS = {
+    'BTC-USDT-SWAP': (60000.0, 0.01),
+    'ETH-USDT-SWAP': (3000.0, 0.1),
+    'SOL-USDT-SWAP': (150.0, 1.0),
+    'DOGE-USDT-SWAP': (0.15, 1000.0),
+}
+
+# 注入故障时随机抛出的异常类型
+FAULT_TYPES = (ccxt.NetworkError, ccxt.RequestTimeout, ccxt.DDoSProtection)
+
+
+def _unit_hash(*parts):
+    """把任意参数确定性地映射到[0, 1)区间"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') / 2 ** 64
+
+
+def _to_inst_id(symbol):
+    """ccxt统一格式的交易对（BTC/USDT:USDT）转换为OKX格式（BTC-USDT-SWAP），OKX格式原样返回"""
+    if '/' not in symbol:
+        return symbol
+    base, rest = symbol.split('/', 1)
+    quote = rest.split(':', 1)[0]
+    return f"{base}-{quote}-SWAP"
+
+
+def _to_unified(inst_id):
+    """OKX格式的交易对转换为ccxt统一格式"""
+    parts = inst_id.split('-')
+    if len(parts) >= 2:
+        return f"{parts[0]}/{parts[1]}:{parts[1]}"
+    return inst_id
+
+
+class OkxSimulator:
+    """
+    OKX交易所模拟器
+    """
+
+    def __init__(self, initial_balance=10000.0, instruments=None, fee_rate=0.0005, slippage=0.0002,
+                 latency=0.0, jitter=0.0, fault_rate=0.0, fault_methods=None, seed=0,
+                 pos_mode='long_short_mode', clock=None, max_ohlcv_limit=300):
+        """
+        初始化模拟器
+
+        Args:
+            initial_balance: 初始USDT余额
+            instruments: 合约列表，交易对 -> (基准价格, 合约面值)，与DEFAULT_INSTRUMENTS合并
+            fee_rate: 手续费率
+            slippage: 市价单滑点比例
+            latency: 每次调用的固定延迟(秒)
+            jitter: 在固定延迟基础上增加的随机延迟上限(秒)
+            fault_rate: 每次调用失败的概率
+            fault_methods: 只对这些方法注入故障，None表示所有方法
+            seed: 延迟和故障注入使用的随机种子
+            pos_mode: 持仓模式，long_short_mode(双向持仓)或net_mode(单向持仓)
+            clock: 返回当前时间(秒)的函数，默认time.time，可以传入自定义时钟模拟时间推进
+            max_ohlcv_limit: fetch_ohlcv单次最多返回的K线数量，与OKX一致默认300，压测时可调大
+        """
+        self.instruments = dict(DEFAULT_INSTRUMENTS)
+        self.instruments.update(instruments or {})
+        self.balance = float(initial_balance)
+        self.fee_rate = fee_rate
+        self.slippage = slippage
+        self.latency = latency
+        self.jitter = jitter
+        self.fault_rate = fault_rate
+        self.fault_methods = set(fault_methods) if fault_methods else None
+        self.pos_mode = pos_mode
+        self.clock = clock or time.time
+        self.max_ohlcv_limit = max_ohlcv_limit
+
+        self.positions = {}  # (交易对, 持仓方向) -> {'contracts', 'entry_price', 'time'}
+        self.leverages = {}  # 交易对 -> 杠杆倍数
+        self.orders = []  # 成交记录
+        self.call_counts = {}  # 方法名 -> 调用次数
+        self.ohlcv_data = {}  # (交易对, 时间周期) -> 预先加载的K线，用于回放指定的历史数据
+        self.algo_orders = {}  # algoId -> 未触发的止盈止损条件单（OKX原始格式）
+        self.algo_history = {}  # algoId -> 已触发或已撤销的条件单
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._order_id = 0
+        self.logger = logger_manager.get_system_logger()
+
+    # ---------------- 延迟和故障注入 ----------------
+
+    def _call(self, method):
+        """记录调用次数，按配置注入延迟和故障"""
+        with self._lock:
+            self.call_counts[method] = self.call_counts.get(method, 0) + 1
+            self._trigger_algo_orders()
+            delay = self.latency + (self._rng.random() * self.jitter if self.jitter else 0.0)
+            fault = None
+            if self.fault_rate and (self.fault_methods is None or method in self.fault_methods):
+                if self._rng.random() < self.fault_rate:
+                    fault = self._rng.choice(FAULT_TYPES)
+        if delay > 0:
+            time.sleep(delay)
+        if fault is not None:
+            raise fault(f"okx simulator injected {fault.__name__} in {method}")
+
+    # ---------------- 行情模型 ----------------
+
+    def _instrument(self, inst_id):
+        """获取合约的(基准价格, 合约面值)，未知交易对按名称生成"""
+        spec = self.instruments.get(inst_id)
+        if spec is None:
+            # 基准价格分布在0.01到1000之间，合约面值使单张合约价值约为1~10 USDT
+            price = 10 ** (_unit_hash(inst_id, 'price') * 5 - 2)
+            ct_val = 10 ** math.floor(math.log10(10 / price))
+            spec = (price, float(ct_val))
+            self.instruments[inst_id] = spec
+        return spec
+
+    def price_at(self, inst_id, ts_ms):
+        """
+        计算交易对在某一时刻的价格
+
+        Args:
+            inst_id: 交易对
+            ts_ms: 时间戳(毫秒)
+
+        Returns:
+            float: 价格
+        """
+        base, _ = self._instrument(inst_id)
+        phase = _unit_hash(inst_id, 'phase') * 2 * math.pi
+        t = ts_ms / 3600000.0  # 小时
+        minute = int(ts_ms // 60000)
+        noise = (_unit_hash(inst_id, minute) - 0.5) * 0.004
+        log_move = (0.08 * math.sin(2 * math.pi * t / 168 + phase) +
+                    0.03 * math.sin(2 * math.pi * t / 24 + 2 * phase) +
+                    0.01 * math.sin(2 * math.pi * t / 4 + 3 * phase) + noise)
+        return base * math.exp(log_move)
+
+    def _round_price(self, inst_id, price):
+        """按合约价格精度取整"""
+        tick = self._tick_size(inst_id)
+        return round(round(price / tick) * tick, 12)
+
+    def _tick_size(self, inst_id):
+        base, _ = self._instrument(inst_id)
+        return 10 ** (math.floor(math.log10(base)) - 4)
+
+    def mark_price(self, inst_id):
+        """当前标记价格，回放预先加载的K线时取当前K线的收盘价"""
+        now_ms = self.clock() * 1000
+        for (loaded_id, _), rows in self.ohlcv_data.items():
+            if loaded_id == inst_id:
+                end = bisect.bisect_right(rows, now_ms, key=lambda row: row[0])
+                if end > 0:
+                    return rows[end - 1][4]
+        return self._round_price(inst_id, self.price_at(inst_id, now_ms))
+
+    def _candle(self, inst_id, start, timeframe_ms, now_ms):
+        """生成一根K线，正在形成的K线收盘价取当前价格"""
+        end = min(start + timeframe_ms, now_ms)
+        open_price = self.price_at(inst_id, start)
+        close_price = self.price_at(inst_id, end)
+        wick = 0.001 * math.sqrt(timeframe_ms / 60000)
+        high = max(open_price, close_price) * (1 + wick * _unit_hash(inst_id, start, 'high'))
+        low = min(open_price, close_price) * (1 - wick * _unit_hash(inst_id, start, 'low'))
+        volume = 1000 * (0.5 + _unit_hash(inst_id, start, 'volume')) * timeframe_ms / 60000
+        return [start, self._round_price(inst_id, open_price), self._round_price(inst_id, high),
+                self._round_price(inst_id, low), self._round_price(inst_id, close_price), round(volume, 2)]
+
+    def load_ohlcv(self, symbol, timeframe, rows):
+        """
+        预先加载K线，之后fetch_ohlcv直接回放这些数据（只返回开盘时间不晚于当前时钟的K线）
+
+        Args:
+            symbol: 交易对
+            timeframe: 时间周期
+            rows: 按时间升序排列的K线，每行为[timestamp, open, high, low, close, volume]
+        """
+        rows = [list(map(float, row[:6])) for row in rows]
+        for row in rows:
+            row[0] = int(row[0])
+        with self._lock:
+            self.ohlcv_data[(_to_inst_id(symbol), timeframe)] = rows
+
+    def _replay_ohlcv(self, rows, since, limit, now_ms):
+        """从预先加载的K线中截取数据"""
+        end = bisect.bisect_right(rows, now_ms, key=lambda row: row[0])
+        if since is None:
+            return rows[max(0, end - limit):end]
+        start = bisect.bisect_left(rows, since, key=lambda row: row[0])
+        return rows[start:min(end, start + limit)]
+
+    # ---------------- ccxt统一接口 ----------------
+
+    def fetch_ohlcv(self, symbol, timeframe='1m', since=None, limit=None, params=None):
+        """获取K线，单次最多返回max_ohlcv_limit根（默认300，与OKX接口一致）"""
+        self._call('fetch_ohlcv')
+        inst_id = _to_inst_id(symbol)
+        timeframe_ms = get_seconds_from_timeframe(timeframe) * 1000
+        now_ms = int(self.clock() * 1000)
+        current = now_ms // timeframe_ms * timeframe_ms
+        limit = min(limit or 100, self.max_ohlcv_limit)
+
+        rows = self.ohlcv_data.get((inst_id, timeframe))
+        if rows is not None:
+            return [list(row) for row in self._replay_ohlcv(rows, since, limit, now_ms)]
+
+        if since is not None:
+            first = -(-int(since) // timeframe_ms) * timeframe_ms
+        else:
+            first = current - (limit - 1) * timeframe_ms
+        starts = range(first, min(first + limit * timeframe_ms, current + timeframe_ms), timeframe_ms)
+        return [self._candle(inst_id, start, timeframe_ms, now_ms) for start in starts]
+
+    def fetch_order_book(self, symbol, limit=20, params=None):
+        """获取订单簿，以标记价格为中心按价格精度排列"""
+        self._call('fetch_order_book')
+        inst_id = _to_inst_id(symbol)
+        mid = self.mark_price(inst_id)
+        tick = self._tick_size(inst_id)
+        bids = [[self._round_price(inst_id, mid - (i + 1) * tick), 10.0 * (i + 1)] for i in range(limit)]
+        asks = [[self._round_price(inst_id, mid + (i + 1) * tick), 10.0 * (i + 1)] for i in range(limit)]
+        return {'symbol': _to_unified(inst_id), 'bids': bids, 'asks': asks,
+                'timestamp': int(self.clock() * 1000), 'nonce': None}
+
+    def _position_dict(self, inst_id, pos_side, position):
+        """构造ccxt统一格式的持仓"""
+        mark = self.mark_price(inst_id)
+        _, ct_val = self._instrument(inst_id)
+        contracts = position['contracts']
+        entry = position['entry_price']
+        diff = mark - entry if pos_side == 'long' else entry - mark
+        leverage = self.leverages.get(inst_id, 1)
+        notional = contracts * ct_val * mark
+        info = {
+            'instId': inst_id, 'instType': 'SWAP', 'posSide': pos_side, 'pos': str(contracts),
+            'avgPx': str(entry), 'markPx': str(mark), 'lever': str(leverage), 'mgnMode': 'cross',
+            'upl': str(contracts * ct_val * diff), 'notionalUsd': str(notional), 'cTime': str(position['time'])
+        }
+        return {
+            'info': info,
+            'symbol': _to_unified(inst_id),
+            'contracts': contracts,
+            'contractSize': ct_val,
+            'side': pos_side,
+            'entryPrice': entry,
+            'markPrice': mark,
+            'notional': notional,
+            'leverage': leverage,
+            'initialMargin': notional / max(leverage, 1),
+            'unrealizedPnl': contracts * ct_val * diff,
+            'marginMode': 'cross',
+            'timestamp': position['time'],
+        }
+
+    def fetch_position(self, symbol, params=None):
+        """获取单个交易对的持仓，双向持仓时优先返回多仓，没有持仓时返回None"""
+        self._call('fetch_position')
+        inst_id = _to_inst_id(symbol)
+        with self._lock:
+            for pos_side in ('long', 'short'):
+                position = self.positions.get((inst_id, pos_side))
+                if position:
+                    return self._position_dict(inst_id, pos_side, position)
+        return None
+
+    def fetch_positions(self, symbols=None, params=None):
+        """获取所有持仓"""
+        self._call('fetch_positions')
+        inst_ids = {_to_inst_id(s) for s in symbols} if symbols else None
+        with self._lock:
+            return [self._position_dict(inst_id, pos_side, position)
+                    for (inst_id, pos_side), position in list(self.positions.items())
+                    if inst_ids is None or inst_id in inst_ids]
+
+    def _fill(self, inst_id, side, pos_side, amount, reduce_only):
+        """成交一笔市价单，更新持仓和余额，返回成交价"""
+        mark = self.mark_price(inst_id)
+        _, ct_val = self._instrument(inst_id)
+        price = self._round_price(inst_id, mark * (1 + self.slippage if side == 'buy' else 1 - self.slippage))
+        key = (inst_id, pos_side)
+        position = self.positions.get(key)
+
+        if reduce_only:
+            if not position:
+                raise ccxt.InvalidOrder(f"{inst_id} {pos_side} 没有可平仓位")
+            amount = min(amount, position['contracts'])
+            diff = price - position['entry_price'] if pos_side == 'long' else position['entry_price'] - price
+            self.balance += amount * ct_val * diff
+            position['contracts'] -= amount
+            if position['contracts'] <= 1e-12:
+                del self.positions[key]
+        elif position:
+            total = position['contracts'] + amount
+            position['entry_price'] = (position['entry_price'] * position['contracts'] + price * amount) / total
+            position['contracts'] = total
+        else:
+            self.positions[key] = {'contracts': amount, 'entry_price': price, 'time': int(self.clock() * 1000)}
+
+        self.balance -= amount * ct_val * price * self.fee_rate
+        return price, amount
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """
+        创建订单，所有订单按市价立即成交
+
+        Args:
+            symbol: 交易对
+            type: 订单类型
+            side: buy或sell
+            amount: 合约数量
+            price: 限价（忽略）
+            params: OKX参数，支持posSide和reduceOnly
+        """
+        self._call('create_order')
+        params = params or {}
+        inst_id = _to_inst_id(symbol)
+        amount = float(amount)
+        if amount <= 0:
+            raise ccxt.InvalidOrder(f"下单数量无效: {amount}")
+        reduce_only = bool(params.get('reduceOnly', False))
+        pos_side = params.get('posSide') or ('long' if side == 'buy' else 'short')
+        if reduce_only and not params.get('posSide'):
+            pos_side = 'short' if side == 'buy' else 'long'
+
+        with self._lock:
+            fill_price, filled = self._fill(inst_id, side, pos_side, amount, reduce_only)
+            self._order_id += 1
+            order_id = str(self._order_id)
+            timestamp = int(self.clock() * 1000)
+            order = {
+                'id': order_id, 'clientOrderId': None, 'timestamp': timestamp, 'datetime': None,
+                'symbol': _to_unified(inst_id), 'type': type, 'side': side, 'amount': amount,
+                'filled': filled, 'remaining': 0.0, 'price': fill_price, 'average': fill_price,
+                'status': 'closed', 'fee': None,
+                'info': {'ordId': order_id, 'instId': inst_id, 'posSide': pos_side, 'sCode': '0'}
+            }
+            self.orders.append(order)
+        return order
+
+    def fetch_order(self, id, symbol=None, params=None):
+        """查询订单，模拟器的订单下单即成交"""
+        self._call('fetch_order')
+        with self._lock:
+            for order in reversed(self.orders):
+                if order['id'] == str(id):
+                    return dict(order)
+        raise ccxt.OrderNotFound(f"okx {{\"code\":\"51603\",\"msg\":\"Order does not exist\"}} {id}")
+
+    def set_leverage(self, leverage, symbol=None, params=None):
+        """设置杠杆倍数"""
+        self._call('set_leverage')
+        inst_id = _to_inst_id(symbol)
+        with self._lock:
+            self.leverages[inst_id] = int(leverage)
+        return {'code': '0', 'msg': '', 'data': [{'instId': inst_id, 'lever': str(leverage), 'mgnMode': 'cross'}]}
+
+    # ---------------- OKX原始接口 ----------------
+
+    def private_post_trade_close_position(self, params=None):
+        """市价全平指定方向的持仓"""
+        self._call('private_post_trade_close_position')
+        params = params or {}
+        inst_id = params['instId']
+        pos_side = params.get('posSide', 'net')
+        sides = [pos_side] if pos_side in ('long', 'short') else ['long', 'short']
+        with self._lock:
+            closed = False
+            for side in sides:
+                position = self.positions.get((inst_id, side))
+                if position:
+                    self._fill(inst_id, 'sell' if side == 'long' else 'buy', side, position['contracts'], True)
+                    closed = True
+            if not closed:
+                raise ccxt.ExchangeError(f"okx {{\"code\":\"51023\",\"msg\":\"Position does not exist\"}} {inst_id}")
+        return {'code': '0', 'msg': '', 'data': [{'instId': inst_id, 'posSide': pos_side, 'clOrdId': '', 'tag': ''}]}
+
+    def private_post_trade_batch_orders(self, params=None):
+        """批量下单，逐笔成交，每笔单独返回sCode"""
+        self._call('private_post_trade_batch_orders')
+        data = []
+        for item in params or []:
+            try:
+                order = self.create_order(_to_unified(item['instId']), item.get('ordType', 'market'), item['side'],
+                                          item['sz'], params={'posSide': item.get('posSide'),
+                                                              'reduceOnly': item.get('reduceOnly', False)})
+                data.append({'ordId': order['id'], 'clOrdId': item.get('clOrdId', ''), 'sCode': '0', 'sMsg': ''})
+            except ccxt.BaseError as e:
+                data.append({'ordId': '', 'clOrdId': item.get('clOrdId', ''), 'sCode': '51000', 'sMsg': str(e)})
+        code = '0' if all(d['sCode'] == '0' for d in data) else '2'
+        return {'code': code, 'msg': '', 'data': data}
+
+    def _finish_algo_order(self, algo_id, state, **fields):
+        """条件单从未触发列表移入历史"""
+        order = self.algo_orders.pop(algo_id)
+        order.update(fields, state=state, uTime=str(int(self.clock() * 1000)))
+        self.algo_history[algo_id] = order
+        return order
+
+    def _trigger_algo_orders(self):
+        """按当前标记价格检查条件单，触发的条件单市价全平对应方向的持仓，持仓已不存在的条件单自动撤销"""
+        for algo_id, order in list(self.algo_orders.items()):
+            inst_id, pos_side = order['instId'], order['posSide']
+            if (inst_id, pos_side) not in self.positions:
+                self._finish_algo_order(algo_id, 'canceled')
+                continue
+            mark = self.mark_price(inst_id)
+            up = pos_side == 'long'
+            tp, sl = order.get('tpTriggerPx'), order.get('slTriggerPx')
+            hit_tp = tp and (mark >= float(tp) if up else mark <= float(tp))
+            hit_sl = sl and (mark <= float(sl) if up else mark >= float(sl))
+            if hit_tp or hit_sl:
+                self._fill(inst_id, order['side'], pos_side, self.positions[(inst_id, pos_side)]['contracts'], True)
+                self._finish_algo_order(algo_id, 'effective', actualSide='tp' if hit_tp else 'sl',
+                                        actualPx=str(mark), triggerPx=tp if hit_tp else sl)
+
+    def private_post_trade_order_algo(self, params=None):
+        """下止盈止损条件单（conditional/oco），只支持closeFraction=1的全平方式"""
+        self._call('private_post_trade_order_algo')
+        params = dict(params or {})
+        inst_id = params['instId']
+        pos_side = params.get('posSide')
+        with self._lock:
+            if (inst_id, pos_side) not in self.positions:
+                return {'code': '1', 'msg': '', 'data': [{'algoId': '', 'sCode': '51169',
+                                                          'sMsg': 'Order failed because you do not have any positions in this direction'}]}
+            self._order_id += 1
+            algo_id = f"algo{self._order_id}"
+            params.update({'algoId': algo_id, 'instType': 'SWAP', 'state': 'live',
+                           'algoClOrdId': params.get('algoClOrdId', ''), 'cTime': str(int(self.clock() * 1000))})
+            self.algo_orders[algo_id] = params
+        return {'code': '0', 'msg': '', 'data': [{'algoId': algo_id, 'algoClOrdId': params['algoClOrdId'],
+                                                  'sCode': '0', 'sMsg': ''}]}
+
+    def private_get_trade_orders_algo_pending(self, params=None):
+        """获取未触发的条件单"""
+        self._call('private_get_trade_orders_algo_pending')
+        params = params or {}
+        ord_types = params.get('ordType', 'conditional,oco').split(',')
+        inst_id = params.get('instId')
+        with self._lock:
+            data = [dict(order) for order in self.algo_orders.values()
+                    if order['ordType'] in ord_types and (inst_id is None or order['instId'] == inst_id)]
+        return {'code': '0', 'msg': '', 'data': data}
+
+    def private_get_trade_orders_algo_history(self, params=None):
+        """获取已触发或已撤销的条件单，按algoId或state查询"""
+        self._call('private_get_trade_orders_algo_history')
+        params = params or {}
+        with self._lock:
+            if params.get('algoId'):
+                orders = [self.algo_history[params['algoId']]] if params['algoId'] in self.algo_history else []
+            else:
+                orders = [order for order in self.algo_history.values() if order['state'] == params.get('state')]
+            data = [dict(order) for order in reversed(orders)]
+        return {'code': '0', 'msg': '', 'data': data}
+
+    def private_post_trade_cancel_algos(self, params=None):
+        """撤销条件单"""
+        self._call('private_post_trade_cancel_algos')
+        data = []
+        with self._lock:
+            for item in params or []:
+                found = item['algoId'] in self.algo_orders
+                if found:
+                    self._finish_algo_order(item['algoId'], 'canceled')
+                data.append({'algoId': item['algoId'], 'sCode': '0' if found else '51603',
+                             'sMsg': '' if found else 'Order does not exist'})
+        return {'code': '0', 'msg': '', 'data': data}
+
+    def private_get_account_balance(self, params=None):
+        """获取账户余额，可用余额扣除了持仓占用的保证金"""
+        self._call('private_get_account_balance')
+        with self._lock:
+            margin = 0.0
+            upl = 0.0
+            for (inst_id, pos_side), position in self.positions.items():
+                detail = self._position_dict(inst_id, pos_side, position)
+                margin += detail['notional'] / max(detail['leverage'], 1)
+                upl += detail['unrealizedPnl']
+            equity = self.balance + upl
+            details = {
+                'ccy': 'USDT', 'cashBal': str(self.balance), 'eq': str(equity), 'upl': str(upl),
+                'availBal': str(max(0.0, equity - margin)), 'frozenBal': str(margin)
+            }
+        return {'code': '0', 'msg': '', 'data': [{'totalEq': str(equity), 'details': [details]}]}
+
+    def private_get_account_positions(self, params=None):
+        """获取OKX原始格式的持仓列表"""
+        self._call('private_get_account_positions')
+        inst_id = (params or {}).get('instId')
+        with self._lock:
+            data = [self._position_dict(key[0], key[1], position)['info']
+                    for key, position in list(self.positions.items())
+                    if inst_id is None or key[0] == inst_id]
+        return {'code': '0', 'msg': '', 'data': data}
+
+    def publicGetPublicMarkPrice(self, params=None):
+        """获取标记价格"""
+        self._call('publicGetPublicMarkPrice')
+        inst_id = params['instId']
+        return {'code': '0', 'msg': '', 'data': [{'instId': inst_id, 'instType': 'SWAP',
+                                                  'markPx': str(self.mark_price(inst_id)),
+                                                  'ts': str(int(self.clock() * 1000))}]}
+
+    def _instrument_info(self, inst_id):
+        """构造OKX原始格式的合约信息"""
+        _, ct_val = self._instrument(inst_id)
+        return {
+            'instId': inst_id, 'instType': 'SWAP', 'ctType': 'linear', 'ctVal': str(ct_val),
+            'ctValCcy': inst_id.split('-')[0], 'settleCcy': 'USDT', 'minSz': '1', 'lotSz': '1',
+            'tickSz': str(self._tick_size(inst_id)), 'lever': '100', 'state': 'live'
+        }
+
+    def publicGetPublicInstruments(self, params=None):
+        """获取合约信息，指定instId时只返回该合约"""
+        self._call('publicGetPublicInstruments')
+        inst_id = (params or {}).get('instId')
+        inst_ids = [inst_id] if inst_id else list(self.instruments)
+        return {'code': '0', 'msg': '', 'data': [self._instrument_info(i) for i in inst_ids]}
+
+    def private_get_account_instruments(self, params=None):
+        """获取账户可交易的合约列表"""
+        self._call('private_get_account_instruments')
+        return {'code': '0', 'msg': '', 'data': [self._instrument_info(i) for i in list(self.instruments)]}
+
+    def publicGetMarketTickers(self, params=None):
+        """获取所有合约的24小时行情"""
+        self._call('publicGetMarketTickers')
+        now_ms = int(self.clock() * 1000)
+        data = []
+        for inst_id in list(self.instruments):
+            _, ct_val = self._instrument(inst_id)
+            last = self.mark_price(inst_id)
+            open_24h = self._round_price(inst_id, self.price_at(inst_id, now_ms - 86400000))
+            # 24小时成交额在2000万到8000万USDT之间；vol24h单位为张，volCcy24h单位为币
+            volume_usd = 2e7 + 6e7 * _unit_hash(inst_id, now_ms // 86400000, 'volume')
+            vol_ccy = volume_usd / last
+            data.append({
+                'instId': inst_id, 'instType': 'SWAP', 'last': str(last), 'open24h': str(open_24h),
+                'high24h': str(max(last, open_24h)), 'low24h': str(min(last, open_24h)),
+                'vol24h': str(vol_ccy / ct_val), 'volCcy24h': str(vol_ccy), 'ts': str(now_ms)
+            })
+        return {'code': '0', 'msg': '', 'data': data}
+
+    def privateGetAccountConfig(self, params=None):
+        """获取账户配置"""
+        self._call('privateGetAccountConfig')
+        return {'code': '0', 'msg': '', 'data': [{'posMode': self.pos_mode, 'acctLv': '2', 'uid': 'simulator'}]}
@@ -0,0 +1,616 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+OKX WebSocket行情推送
+
+通过OKX v5 WebSocket订阅K线、标记价格、行情、持仓和订单频道，
+让策略在K线确认的瞬间执行、止盈止损在价格变动时立即检查，不再依赖REST轮询。
+依赖可选的websocket-client库，未安装时create_market_stream返回None，调用方回退到REST轮询。
+"""
+
+import hmac
+import json
+import time
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from core.logger_manager import logger_manager
+
+try:
+    import websocket
+except ImportError:  # websocket-client是可选依赖
+    websocket = None
+
+logger = logger_manager.get_logger("websocket")
+
+# 订单频道state中表示订单已结束的取值
+FINAL_ORDER_STATES = {'filled', 'canceled', 'mmp_canceled'}
+
+# 已结束订单保留的最近条数
+FINISHED_ORDERS_KEPT = 200
+
+
+def to_candle_channel(timeframe):
+    """
+    把ccxt周期格式转换为OKX的K线频道名
+
+    Args:
+        timeframe: ccxt周期，如1m、15m、1h、4h、1d
+
+    Returns:
+        str: OKX频道名，如candle1m、candle1H、candle1D
+    """
+    unit = timeframe[-1]
+    if unit in 'hdwM':
+        unit = unit.upper()
+    return f"candle{timeframe[:-1]}{unit}"
+
+
+def sign_login(secret_key, timestamp):
+    """
+    生成WebSocket登录签名
+
+    Args:
+        secret_key: API密钥
+        timestamp: 秒级时间戳字符串
+
+    Returns:
+        str: base64编码的HMAC-SHA256签名
+    """
+    message = f"{timestamp}GET/users/self/verify"
+    digest = hmac.new(secret_key.encode(), message.encode(), hashlib.sha256).digest()
+    return base64.b64encode(digest).decode()
+
+
+def parse_position(raw):
+    """
+    把持仓频道推送的OKX原始持仓转换为与ccxt fetch_positions一致的字段
+
+    Args:
+        raw: 持仓频道data中的一条记录
+
+    Returns:
+        dict: 包含symbol、side、contracts、entryPrice、markPrice、leverage、unrealizedPnl、notional、info
+    """
+    pos = float(raw.get('pos') or 0)
+    side = raw.get('posSide')
+    if side not in ('long', 'short'):
+        side = 'long' if pos > 0 else 'short'
+    return {
+        'symbol': raw.get('instId'),
+        'side': side,
+        'contracts': abs(pos),
+        'entryPrice': float(raw.get('avgPx') or 0),
+        'markPrice': float(raw.get('markPx') or 0),
+        'leverage': float(raw.get('lever') or 1),
+        'unrealizedPnl': float(raw.get('upl') or 0),
+        'notional': float(raw.get('notionalUsd') or 0),
+        'timestamp': int(raw.get('uTime') or 0),
+        'info': raw,
+    }
+
+
+class OkxWebSocketClient:
+    """
+    单条OKX WebSocket连接
+
+    后台线程维持连接，断线后按reconnect_delay重连并自动重新登录、重新订阅；
+    每ping_interval秒没有收到消息就发送文本ping（OKX 30秒无数据会断开连接）。
+    """
+
+    def __init__(self, url, api_key='', secret_key='', passphrase='', ping_interval=20, reconnect_delay=3, name='public'):
+        """
+        初始化连接
+
+        Args:
+            url: WebSocket地址
+            api_key: API密钥，私有频道需要
+            secret_key: API密钥，私有频道需要
+            passphrase: API密码，私有频道需要
+            ping_interval: 心跳间隔(秒)
+            reconnect_delay: 断线重连间隔(秒)
+            name: 连接名称，用于日志
+        """
+        if websocket is None:
+            raise ImportError("未安装websocket-client，请执行 pip install websocket-client")
+        self.url = url
+        self.api_key = api_key
+        self.secret_key = secret_key
+        self.passphrase = passphrase
+        self.ping_interval = ping_interval
+        self.reconnect_delay = reconnect_delay
+        self.name = name
+
+        self._subscriptions = {}  # (channel, instId/instType) -> (arg, [callback])
+        self._connect_callbacks = []  # 每次连接（重连）可用、重新订阅之前调用
+        self._lock = threading.RLock()
+        self._ws = None
+        self._ready = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._last_message = 0.0
+
+    @property
+    def is_connected(self):
+        """连接已建立且（私有频道）已登录"""
+        return self._ready.is_set()
+
+    @staticmethod
+    def _key(arg):
+        return arg.get('channel'), arg.get('instId') or arg.get('instType') or ''
+
+    def start(self):
+        """启动后台连接线程，重复调用无副作用"""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=f"okx-ws-{self.name}", daemon=True)
+            self._thread.start()
+            threading.Thread(target=self._ping_loop, name=f"okx-ws-{self.name}-ping", daemon=True).start()
+
+    def stop(self):
+        """关闭连接并停止重连"""
+        self._stopped.set()
+        self._ready.clear()
+        ws = self._ws
+        if ws is not None:
+            ws.close()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def wait_ready(self, timeout=None):
+        """
+        等待连接建立
+
+        Args:
+            timeout: 超时秒数
+
+        Returns:
+            bool: 是否已连接
+        """
+        return self._ready.wait(timeout)
+
+    def subscribe(self, arg, callback):
+        """
+        订阅频道，已连接时立即发送，未连接时在连接建立后发送
+
+        Args:
+            arg: OKX订阅参数，如{'channel': 'mark-price', 'instId': 'BTC-USDT-SWAP'}
+            callback: 回调函数callback(arg, data)，在连接线程中调用
+        """
+        key = self._key(arg)
+        with self._lock:
+            if key in self._subscriptions:
+                self._subscriptions[key][1].append(callback)
+                return
+            self._subscriptions[key] = (dict(arg), [callback])
+        if self.is_connected:
+            self._send({'op': 'subscribe', 'args': [arg]})
+
+    def unsubscribe(self, arg):
+        """
+        取消订阅频道
+
+        Args:
+            arg: 订阅时使用的参数
+        """
+        with self._lock:
+            removed = self._subscriptions.pop(self._key(arg), None)
+        if removed and self.is_connected:
+            self._send({'op': 'unsubscribe', 'args': [removed[0]]})
+
+    def on_connect(self, callback):
+        """
+        注册连接可用时的回调，每次重连（私有连接为重新登录）后、重新订阅之前在连接线程中调用
+
+        Args:
+            callback: 无参数的回调函数
+        """
+        with self._lock:
+            self._connect_callbacks.append(callback)
+
+    def _send(self, payload):
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            ws.send(payload if isinstance(payload, str) else json.dumps(payload))
+        except Exception as e:
+            logger.warning(f"[{self.name}] 发送WebSocket消息失败: {str(e)}")
+
+    def _resubscribe(self):
+        with self._lock:
+            args = [arg for arg, _ in self._subscriptions.values()]
+            callbacks = list(self._connect_callbacks)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.error(f"[{self.name}] 连接回调出错: {str(e)}")
+        self._ready.set()
+        if args:
+            self._send({'op': 'subscribe', 'args': args})
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                logger.error(f"[{self.name}] WebSocket运行异常: {str(e)}")
+            self._ready.clear()
+            if self._stopped.is_set():
+                break
+            logger.warning(f"[{self.name}] WebSocket连接断开，{self.reconnect_delay}秒后重连")
+            self._stopped.wait(self.reconnect_delay)
+
+    def _ping_loop(self):
+        while not self._stopped.wait(1):
+            if self.is_connected and time.time() - self._last_message >= self.ping_interval:
+                self._send('ping')
+                self._last_message = time.time()
+
+    def _on_open(self, ws):
+        self._last_message = time.time()
+        logger.info(f"[{self.name}] WebSocket已连接 {self.url}")
+        if self.api_key:
+            timestamp = str(int(time.time()))
+            self._send({'op': 'login', 'args': [{
+                'apiKey': self.api_key,
+                'passphrase': self.passphrase,
+                'timestamp': timestamp,
+                'sign': sign_login(self.secret_key, timestamp),
+            }]})
+        else:
+            self._resubscribe()
+
+    def _on_message(self, ws, message):
+        self._last_message = time.time()
+        if message == 'pong':
+            return
+        try:
+            msg = json.loads(message)
+        except ValueError:
+            logger.warning(f"[{self.name}] 无法解析的WebSocket消息: {message}")
+            return
+
+        event = msg.get('event')
+        if event == 'login':
+            if str(msg.get('code')) == '0':
+                logger.info(f"[{self.name}] WebSocket登录成功")
+                self._resubscribe()
+            else:
+                logger.error(f"[{self.name}] WebSocket登录失败: {msg.get('msg')}")
+            return
+        if event == 'error':
+            logger.error(f"[{self.name}] WebSocket错误 {msg.get('code')}: {msg.get('msg')}")
+            return
+        if event:
+            logger.debug(f"[{self.name}] WebSocket事件: {msg}")
+            return
+
+        arg = msg.get('arg')
+        if not arg or 'data' not in msg:
+            return
+        with self._lock:
+            entry = self._subscriptions.get(self._key(arg))
+            callbacks = list(entry[1]) if entry else []
+        for callback in callbacks:
+            try:
+                callback(arg, msg['data'])
+            except Exception as e:
+                logger.error(f"[{self.name}] 处理{arg.get('channel')}推送出错: {str(e)}")
+
+    def _on_error(self, ws, error):
+        logger.warning(f"[{self.name}] WebSocket错误: {error}")
+
+    def _on_close(self, ws, status_code=None, message=None):
+        self._ready.clear()
+
+
+class MarketDataStream:
+    """
+    行情和账户推送缓存
+
+    public连接订阅标记价格和行情，business连接订阅K线，private连接订阅持仓和订单，
+    连接都在第一次订阅时建立。推送写入内存缓存并通知注册的回调。
+    """
+
+    def __init__(self, api_key='', secret_key='', passphrase='', config=None, shared=None):
+        """
+        初始化推送缓存
+
+        Args:
+            api_key: API密钥，订阅持仓/订单频道时需要
+            secret_key: API密钥
+            passphrase: API密码
+            config: 连接配置，默认使用websocket_config
+            shared: 另一个MarketDataStream，传入时复用它的public和business连接，只为本账户新建private连接
+        """
+        if config is None:
+            from config.config import websocket_config
+            config = websocket_config
+        options = {
+            'ping_interval': config.get('ping_interval', 20),
+            'reconnect_delay': config.get('reconnect_delay', 3),
+        }
+        if shared is not None:
+            self.public = shared.public
+            self.business = shared.business
+        else:
+            self.public = OkxWebSocketClient(config.get('public_url', 'wss://ws.okx.com:8443/ws/v5/public'), name='public', **options)
+            self.business = OkxWebSocketClient(config.get('business_url', 'wss://ws.okx.com:8443/ws/v5/business'), name='business', **options)
+        self.private = None
+        if api_key:
+            self.private = OkxWebSocketClient(config.get('private_url', 'wss://ws.okx.com:8443/ws/v5/private'),
+                                              api_key, secret_key, passphrase, name='private', **options)
+
+        self._lock = threading.Condition()
+        self._candles = {}        # (instId, timeframe) -> 最新一根K线
+        self._confirmed = {}      # (instId, timeframe) -> 最新一根已确认K线
+        self._mark_prices = {}    # instId -> (价格, 毫秒时间戳)
+        self._tickers = {}        # instId -> 原始行情
+        self._positions = {}      # (instId, posSide) -> ccxt格式持仓
+        self._orders = {}         # ordId -> 未结束订单的原始推送
+        self._positions_stale = True  # 下一次持仓推送是订阅后的全量快照，用它重建持仓缓存
+        self._finished = OrderedDict()  # ordId -> 已结束订单的最后一次推送，只保留最近FINISHED_ORDERS_KEPT条
+        self.positions_ready = threading.Event()
+        self._positions_subscribed = False
+
+    @property
+    def clients(self):
+        """所有已创建的连接"""
+        return [client for client in (self.public, self.business, self.private) if client is not None]
+
+    @property
+    def is_connected(self):
+        """所有已启动的连接都处于可用状态"""
+        started = [client for client in self.clients if client._thread is not None]
+        return bool(started) and all(client.is_connected for client in started)
+
+    def stop(self):
+        """关闭所有连接（包括与其他MarketDataStream共用的连接）"""
+        for client in self.clients:
+            client.stop()
+        with self._lock:
+            self._lock.notify_all()
+
+    def _subscribe(self, client, arg, handler, callback):
+        def dispatch(arg, data):
+            for item in handler(arg, data):
+                if callback:
+                    callback(item)
+        client.subscribe(arg, dispatch)
+        client.start()
+
+    def subscribe_candles(self, inst_id, timeframe, callback=None):
+        """
+        订阅K线频道
+
+        Args:
+            inst_id: 产品ID，如BTC-USDT-SWAP
+            timeframe: ccxt周期格式
+            callback: 可选，callback(row)，row为[ts, o, h, l, c, vol, confirm]
+        """
+        def handler(arg, data):
+            rows = []
+            with self._lock:
+                for item in data:
+                    row = [int(item[0])] + [float(v) for v in item[1:6]] + [item[8] == '1']
+                    self._candles[(inst_id, timeframe)] = row
+                    if row[6]:
+                        self._confirmed[(inst_id, timeframe)] = row
+                    rows.append(row)
+                self._lock.notify_all()
+            return rows
+        self._subscribe(self.business, {'channel': to_candle_channel(timeframe), 'instId': inst_id}, handler, callback)
+
+    def subscribe_mark_price(self, inst_id, callback=None):
+        """
+        订阅标记价格频道
+
+        Args:
+            inst_id: 产品ID
+            callback: 可选，callback((instId, 价格, 毫秒时间戳))
+        """
+        def handler(arg, data):
+            ticks = []
+            with self._lock:
+                for item in data:
+                    tick = (item['instId'], float(item['markPx']), int(item['ts']))
+                    self._mark_prices[tick[0]] = tick[1:]
+                    ticks.append(tick)
+            return ticks
+        self._subscribe(self.public, {'channel': 'mark-price', 'instId': inst_id}, handler, callback)
+
+    def subscribe_tickers(self, inst_id, callback=None):
+        """
+        订阅行情频道
+
+        Args:
+            inst_id: 产品ID
+            callback: 可选，callback(原始行情dict)
+        """
+        def handler(arg, data):
+            with self._lock:
+                for item in data:
+                    self._tickers[item['instId']] = item
+            return data
+        self._subscribe(self.public, {'channel': 'tickers', 'instId': inst_id}, handler, callback)
+
+    def subscribe_positions(self, callback=None, inst_type='SWAP'):
+        """
+        订阅持仓频道，订阅成功后OKX先推送一次全量持仓，之后在持仓变化时推送
+        私有连接每次重新登录后持仓缓存作废（positions_ready清除），用重新订阅后的全量快照重建
+
+        Args:
+            callback: 可选，callback(ccxt格式持仓)，平仓后contracts为0
+            inst_type: 产品类型
+        """
+        if self.private is None:
+            raise ValueError("订阅持仓频道需要API密钥")
+
+        def handler(arg, data):
+            positions = []
+            with self._lock:
+                if self._positions_stale:
+                    # 断线期间平掉的持仓不会再推送，用重连后的全量快照替换缓存
+                    self._positions.clear()
+                    self._positions_stale = False
+                for raw in data:
+                    position = parse_position(raw)
+                    key = (position['symbol'], position['side'])
+                    if position['contracts'] > 0:
+                        self._positions[key] = position
+                    else:
+                        self._positions.pop(key, None)
+                    positions.append(position)
+                self.positions_ready.set()
+            return positions
+        if not self._positions_subscribed:
+            self._positions_subscribed = True
+            self.private.on_connect(self._on_private_connect)
+        self._subscribe(self.private, {'channel': 'positions', 'instType': inst_type}, handler, callback)
+
+    def _on_private_connect(self):
+        """私有连接（重新）登录后：持仓缓存作废，等待新的全量快照"""
+        with self._lock:
+            self._positions_stale = True
+            self.positions_ready.clear()
+
+    def subscribe_orders(self, callback=None, inst_type='SWAP'):
+        """
+        订阅订单频道
+
+        Args:
+            callback: 可选，callback(原始订单dict)
+            inst_type: 产品类型
+        """
+        if self.private is None:
+            raise ValueError("订阅订单频道需要API密钥")
+
+        def handler(arg, data):
+            with self._lock:
+                for order in data:
+                    ord_id = order['ordId']
+                    if order.get('state') in FINAL_ORDER_STATES:
+                        # 已结束的订单不会再有推送，移出未结束订单，只保留最近的若干条供等待成交的一方读取
+                        self._orders.pop(ord_id, None)
+                        self._finished[ord_id] = order
+                        self._finished.move_to_end(ord_id)
+                        while len(self._finished) > FINISHED_ORDERS_KEPT:
+                            self._finished.popitem(last=False)
+                    else:
+                        self._orders[ord_id] = order
+            return data
+        self._subscribe(self.private, {'channel': 'orders', 'instType': inst_type}, handler, callback)
+
+    def wait_for_confirmed_candle(self, inst_id, timeframe, timeout, after=None):
+        """
+        等待一根新的已确认K线
+
+        Args:
+            inst_id: 产品ID
+            timeframe: ccxt周期格式
+            timeout: 超时秒数
+            after: 只接受开盘时间晚于该毫秒时间戳的K线，默认取当前最新已确认K线的时间
+
+        Returns:
+            list: [ts, o, h, l, c, vol, True]，超时或连接断开时返回None
+        """
+        key = (inst_id, timeframe)
+        deadline = time.time() + timeout
+        with self._lock:
+            if after is None:
+                latest = self._confirmed.get(key)
+                after = latest[0] if latest else 0
+            while True:
+                row = self._confirmed.get(key)
+                if row and row[0] > after:
+                    return row
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._lock.wait(remaining)
+
+    def get_latest_candle(self, inst_id, timeframe):
+        """获取最新一根K线（可能未确认），没有推送时返回None"""
+        with self._lock:
+            return self._candles.get((inst_id, timeframe))
+
+    def get_mark_price(self, inst_id):
+        """获取最新标记价格，没有推送时返回None"""
+        with self._lock:
+            tick = self._mark_prices.get(inst_id)
+        return tick[0] if tick else None
+
+    def get_ticker(self, inst_id):
+        """获取最新行情，没有推送时返回None"""
+        with self._lock:
+            return self._tickers.get(inst_id)
+
+    def get_positions(self):
+        """
+        获取当前持仓，标记价格以标记价格频道的最新推送为准
+
+        Returns:
+            list: ccxt格式持仓列表
+        """
+        with self._lock:
+            positions = []
+            for position in self._positions.values():
+                position = dict(position)
+                tick = self._mark_prices.get(position['symbol'])
+                if tick and tick[1] >= position['timestamp']:
+                    position['markPrice'] = tick[0]
+                positions.append(position)
+            return positions
+
+    def get_order(self, ord_id):
+        """获取订单最新状态，没有推送时返回None"""
+        with self._lock:
+            return self._orders.get(ord_id) or self._finished.get(ord_id)
+
+
+def create_market_stream(api_key='', secret_key='', passphrase='', shared=None):
+    """
+    按websocket_config创建推送缓存
+
+    Args:
+        api_key: API密钥，需要持仓/订单频道时传入
+        secret_key: API密钥
+        passphrase: API密码
+        shared: 复用其公共连接的MarketDataStream
+
+    Returns:
+        MarketDataStream: 未启用、未安装websocket-client或使用模拟交易所时返回None，调用方回退到REST轮询
+    """
+    from config.config import websocket_config, exchange_config
+    if not websocket_config.get('enabled', False):
+        return None
+    if exchange_config.get('backend', 'okx') != 'okx':
+        logger.info("当前使用模拟交易所，不连接OKX WebSocket，使用REST轮询")
+        return None
+    if websocket is None:
+        logger.warning("未安装websocket-client，回退到REST轮询（pip install websocket-client）")
+        return None
+    return MarketDataStream(api_key, secret_key, passphrase, websocket_config, shared)
@@ -0,0 +1,302 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+本地OKX WebSocket服务
+
+只用标准库实现的WebSocket服务端，支持OKX v5的login/subscribe/unsubscribe和文本ping，
+由调用方通过publish或push_*方法主动推送K线、标记价格、持仓等数据，
+用于在不连接交易所的情况下联调okx_websocket和依赖推送的策略、止盈止损监控器。
+
+使用方法:
+    server = LocalOkxWsServer()
+    server.start()
+    config = {**websocket_config, 'public_url': server.url, 'business_url': server.url, 'private_url': server.url}
+    stream = MarketDataStream('key', 'secret', 'pass', config)
+    server.push_candle('BTC-USDT-SWAP', '1h', [ts, o, h, l, c, vol], confirm=True)
+"""
+
+import json
+import socket
+import base64
+import struct
+import hashlib
+import threading
+import socketserver
+from core.okx_websocket import to_candle_channel
+
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class _Connection(socketserver.BaseRequestHandler):
+    """单个客户端连接，完成握手后循环读取帧"""
+
+    def setup(self):
+        self.send_lock = threading.Lock()
+        self.subscriptions = set()
+        self.closed = False
+
+    def handle(self):
+        if not self._handshake():
+            return
+        self.server.owner._register(self)
+        try:
+            while True:
+                opcode, payload = self._read_frame()
+                if opcode is None or opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    self.send_frame(payload, 0xA)
+                elif opcode == 0x1:
+                    self.server.owner._handle_message(self, payload.decode('utf-8'))
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            self.closed = True
+            self.server.owner._unregister(self)
+
+    def _recv_exact(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self.request.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("连接已关闭")
+            data += chunk
+        return data
+
+    def _handshake(self):
+        data = b''
+        while b'\r\n\r\n' not in data:
+            chunk = self.request.recv(4096)
+            if not chunk:
+                return False
+            data += chunk
+        headers = {}
+        for line in data.decode('latin-1').split('\r\n')[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        self.request.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+        ).encode())
+        return True
+
+    def _read_frame(self):
+        header = self._recv_exact(2)
+        opcode = header[0] & 0x0F
+        masked = header[1] & 0x80
+        length = header[1] & 0x7F
+        if length == 126:
+            length = struct.unpack('>H', self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('>Q', self._recv_exact(8))[0]
+        mask = self._recv_exact(4) if masked else None
+        payload = self._recv_exact(length)
+        if mask:
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+        return opcode, payload
+
+    def send_frame(self, payload, opcode=0x1):
+        """发送一帧（服务端帧不加掩码）"""
+        if isinstance(payload, str):
+            payload = payload.encode('utf-8')
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('>BB', 0x80 | opcode, length)
+        elif length < 65536:
+            header = struct.pack('>BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('>BBQ', 0x80 | opcode, 127, length)
+        with self.send_lock:
+            self.request.sendall(header + payload)
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class LocalOkxWsServer:
+    """
+    本地OKX WebSocket服务
+
+    所有订阅了某个频道的连接都会收到该频道的推送，不校验登录签名，
+    login_ok为False时所有登录请求返回失败，用于验证客户端的错误处理。
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, login_ok=True):
+        """
+        初始化服务
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            login_ok: 登录请求是否成功
+        """
+        self.login_ok = login_ok
+        self._server = _Server((host, port), _Connection)
+        self._server.owner = self
+        self._connections = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self.messages = []  # 收到的客户端消息（已解析的JSON），便于检查客户端行为
+
+    @property
+    def url(self):
+        """客户端连接地址"""
+        host, port = self._server.server_address[:2]
+        return f"ws://{host}:{port}/ws/v5"
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="okx-ws-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """关闭服务和所有连接"""
+        self._server.shutdown()
+        self.disconnect_all()
+        self._server.server_close()
+
+    def disconnect_all(self):
+        """断开所有客户端连接，用于验证客户端的断线重连"""
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            try:
+                conn.request.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def connection_count(self):
+        """当前连接数"""
+        with self._lock:
+            return len(self._connections)
+
+    def subscriber_count(self, arg):
+        """
+        订阅了指定频道的连接数
+
+        Args:
+            arg: 频道参数，如{'channel': 'mark-price', 'instId': 'BTC-USDT-SWAP'}
+        """
+        key = self._key(arg)
+        with self._lock:
+            return sum(1 for conn in self._connections if key in conn.subscriptions)
+
+    @staticmethod
+    def _key(arg):
+        return arg.get('channel'), arg.get('instId') or arg.get('instType') or ''
+
+    def _register(self, conn):
+        with self._lock:
+            self._connections.append(conn)
+
+    def _unregister(self, conn):
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+
+    def _handle_message(self, conn, text):
+        if text == 'ping':
+            conn.send_frame('pong')
+            return
+        msg = json.loads(text)
+        self.messages.append(msg)
+        op = msg.get('op')
+        if op == 'login':
+            code = '0' if self.login_ok else '60009'
+            conn.send_frame(json.dumps({'event': 'login' if self.login_ok else 'error', 'code': code,
+                                        'msg': '' if self.login_ok else 'Login failed.'}))
+        elif op in ('subscribe', 'unsubscribe'):
+            for arg in msg.get('args', []):
+                if op == 'subscribe':
+                    conn.subscriptions.add(self._key(arg))
+                else:
+                    conn.subscriptions.discard(self._key(arg))
+                conn.send_frame(json.dumps({'event': op, 'arg': arg}))
+
+    def publish(self, arg, data):
+        """
+        向订阅了该频道的连接推送数据
+
+        Args:
+            arg: 频道参数，持仓/订单频道用instType匹配
+            data: 推送的data列表
+
+        Returns:
+            int: 收到推送的连接数
+        """
+        key = self._key(arg)
+        message = json.dumps({'arg': arg, 'data': data})
+        with self._lock:
+            targets = [conn for conn in self._connections if key in conn.subscriptions and not conn.closed]
+        for conn in targets:
+            try:
+                conn.send_frame(message)
+            except OSError:
+                pass
+        return len(targets)
+
+    def push_candle(self, inst_id, timeframe, row, confirm=False):
+        """
+        推送一根K线
+
+        Args:
+            inst_id: 产品ID
+            timeframe: ccxt周期格式
+            row: [ts, open, high, low, close, volume]
+            confirm: 是否为已确认K线
+        """
+        item = [str(int(row[0]))] + [str(v) for v in row[1:6]] + [str(row[5]), '0', '1' if confirm else '0']
+        return self.publish({'channel': to_candle_channel(timeframe), 'instId': inst_id}, [item])
+
+    def push_mark_price(self, inst_id, price, ts):
+        """
+        推送标记价格
+
+        Args:
+            inst_id: 产品ID
+            price: 标记价格
+            ts: 毫秒时间戳
+        """
+        return self.publish({'channel': 'mark-price', 'instId': inst_id},
+                            [{'instType': 'SWAP', 'instId': inst_id, 'markPx': str(price), 'ts': str(int(ts))}])
+
+    def push_positions(self, positions, inst_type='SWAP'):
+        """
+        推送持仓
+
+        Args:
+            positions: OKX原始格式持仓列表（instId、posSide、pos、avgPx、markPx、lever、upl、notionalUsd、uTime）
+            inst_type: 产品类型
+        """
+        return self.publish({'channel': 'positions', 'instType': inst_type}, list(positions))
+
+    def push_orders(self, orders, inst_type='SWAP'):
+        """
+        推送订单状态
+
+        Args:
+            orders: OKX原始格式订单列表（ordId、instId、state、accFillSz、avgPx等）
+            inst_type: 产品类型
+        """
+        return self.publish({'channel': 'orders', 'instType': inst_type}, list(orders))
@@ -0,0 +1,319 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+策略参数并行寻优
+
+在多进程中用离线回测引擎(Backtester)评估一个策略的多组参数：
+- K线历史只在主进程中写入一块共享内存，工作进程直接映射为numpy数组，不复制数据
+- 支持网格搜索(grid)、随机搜索(random)和贝叶斯优化(bayes，高斯过程 + 期望提升，只依赖numpy)
+- 结果按目标指标排序后写入CSV表格
+
+参数空间格式：
+    {'sar_acceleration': (0.01, 0.05, 0.01),   # (最小值, 最大值, 步长)
+     'trade_direction': ['both', 'only_long']}  # 候选值列表
+"""
+
+import os
+import csv
+import math
+import time
+import itertools
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from core.logger_manager import logger_manager
+
+# 工作进程内的全局状态，由_init_worker设置
+_worker_state = {}
+
+
+def _init_worker(shm_name, shape, strategy_class, base_config, backtest_kwargs):
+    """工作进程初始化：映射共享内存中的K线数组"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state['shm'] = shm  # 保持引用，避免共享内存被提前关闭
+    _worker_state['ohlcv'] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _worker_state['strategy_class'] = strategy_class
+    _worker_state['base_config'] = base_config
+    _worker_state['backtest_kwargs'] = backtest_kwargs
+
+
+def _evaluate(params):
+    """在工作进程中回测一组参数，返回(参数, 统计指标)；回测出错时统计指标包含error"""
+    from core.backtester import Backtester
+
+    config = {**_worker_state['base_config'], **params}
+    try:
+        backtester = Backtester(_worker_state['strategy_class'], config, _worker_state['ohlcv'],
+                                **_worker_state['backtest_kwargs'])
+        metrics = backtester.run()['metrics']
+    except Exception as e:
+        return params, {'error': str(e)}
+    return params, metrics
+
+
+class ParameterSpace:
+    """
+    参数空间，负责网格展开、随机采样以及参数与[0, 1]区间编码之间的转换
+    """
+
+    def __init__(self, space):
+        """
+        Args:
+            space: 参数名 -> (最小值, 最大值, 步长) 或 候选值列表
+        """
+        if not space:
+            raise ValueError("参数空间为空")
+        self.names = list(space)
+        self.choices = {}
+        for name, spec in space.items():
+            if isinstance(spec, tuple):
+                low, high, step = spec
+                count = int(round((high - low) / step)) + 1
+                values = [low + i * step for i in range(count)]
+                if all(isinstance(v, int) for v in spec):
+                    values = [int(v) for v in values]
+                else:
+                    # 消除浮点步长累加误差，例如0.30000000000000004
+                    values = [round(v, 10) for v in values]
+                self.choices[name] = values
+            else:
+                self.choices[name] = list(spec)
+            if not self.choices[name]:
+                raise ValueError(f"参数{name}没有可选值")
+
+    @property
+    def size(self):
+        """网格中的参数组合总数"""
+        return math.prod(len(values) for values in self.choices.values())
+
+    def grid(self):
+        """展开所有参数组合"""
+        for combo in itertools.product(*(self.choices[name] for name in self.names)):
+            yield dict(zip(self.names, combo))
+
+    def sample(self, rng):
+        """随机采样一组参数"""
+        return {name: self.choices[name][rng.integers(len(self.choices[name]))] for name in self.names}
+
+    def encode(self, params):
+        """把参数映射为[0, 1]区间的向量，每个维度取候选值序号的归一化位置"""
+        vector = []
+        for name in self.names:
+            values = self.choices[name]
+            index = values.index(params[name])
+            vector.append(index / (len(values) - 1) if len(values) > 1 else 0.0)
+        return np.array(vector)
+
+    @staticmethod
+    def key(params):
+        """参数组合的可哈希标识，用于去重"""
+        return tuple(sorted(params.items()))
+
+
+def _expected_improvement(x_train, y_train, x_candidates, length_scale=0.25, noise=1e-4):
+    """
+    高斯过程（RBF核）在候选点上的期望提升，用于贝叶斯优化选点
+
+    Args:
+        x_train: 已评估参数的编码(n, d)
+        y_train: 已评估参数的目标值(n,)，越大越好
+        x_candidates: 候选参数的编码(m, d)
+
+    Returns:
+        numpy.ndarray: 每个候选点的期望提升(m,)
+    """
+    mean, std = y_train.mean(), y_train.std() or 1.0
+    y = (y_train - mean) / std
+
+    def kernel(a, b):
+        dist = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * dist / length_scale ** 2)
+
+    k_train = kernel(x_train, x_train) + noise * np.eye(len(x_train))
+    k_cross = kernel(x_candidates, x_train)
+    solve = np.linalg.solve(k_train, np.column_stack([y, k_cross.T]))
+    mu = k_cross @ solve[:, 0]
+    var = np.clip(1.0 - (k_cross * solve[:, 1:].T).sum(axis=1), 1e-12, None)
+    sigma = np.sqrt(var)
+
+    improvement = mu - y.max()
+    z = improvement / sigma
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return improvement * cdf + sigma * pdf
+
+
+class ParameterOptimizer:
+    """
+    策略参数并行寻优器
+    """
+
+    def __init__(self, strategy_class, base_config, ohlcv, param_space, objective='return_drawdown',
+                 min_trades=1, max_workers=None, backtest_kwargs=None, seed=None):
+        """
+        初始化寻优器
+
+        Args:
+            strategy_class: StrategyTemplate子类
+            base_config: 基础策略配置（与实盘相同的合并配置），每组参数覆盖其中的同名项
+            ohlcv: 按时间升序排列的K线数组(n, 6)
+            param_space: 参数空间，格式见模块说明
+            objective: 排序目标，可选Backtester统计指标中的total_return，或return_drawdown（收益回撤比）
+            min_trades: 交易次数少于该值的参数组合排在最后
+            max_workers: 进程数，默认等于CPU核数
+            backtest_kwargs: 传给Backtester的其他参数（手续费、滑点、资金费率等）
+            seed: 随机种子
+        """
+        self.strategy_class = strategy_class
+        self.base_config = dict(base_config)
+        self.ohlcv = np.ascontiguousarray(ohlcv, dtype=np.float64)
+        self.space = ParameterSpace(param_space)
+        self.objective = objective
+        self.min_trades = min_trades
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backtest_kwargs = backtest_kwargs or {}
+        self.rng = np.random.default_rng(seed)
+        self.logger = logger_manager.get_strategy_logger()
+        self.results = []
+
+    def score(self, metrics):
+        """
+        计算目标值，越大越好
+
+        Args:
+            metrics: Backtester统计指标
+
+        Returns:
+            float: 目标值，回测出错或交易次数不足时为-inf
+        """
+        if 'error' in metrics or metrics.get('trades', 0) < self.min_trades:
+            return float('-inf')
+        if self.objective == 'return_drawdown':
+            return metrics['total_return'] / max(metrics['max_drawdown'], 0.01)
+        return float(metrics[self.objective])
+
+    def run(self, method='grid', n_trials=100, n_initial=None):
+        """
+        执行参数寻优
+
+        Args:
+            method: grid(网格搜索), random(随机搜索), bayes(贝叶斯优化)
+            n_trials: random/bayes模式下评估的参数组合数量，grid模式下忽略
+            n_initial: bayes模式下先随机评估的组合数量，默认为max(进程数, 10)
+
+        Returns:
+            list: 按目标值从高到低排序的结果，每项为{'score', 'params', 'metrics'}
+        """
+        if method not in ('grid', 'random', 'bayes'):
+            raise ValueError(f"不支持的寻优方式: {method}")
+
+        n_trials = min(n_trials, self.space.size)
+        total = self.space.size if method == 'grid' else n_trials
+        self.logger.info(f"开始参数寻优 - {self.strategy_class.__name__} - 方式: {method} - "
+                         f"组合数: {total} - 进程数: {self.max_workers} - K线数: {len(self.ohlcv)}")
+        start = time.time()
+        self.results = []
+
+        shm = shared_memory.SharedMemory(create=True, size=max(self.ohlcv.nbytes, 1))
+        try:
+            np.ndarray(self.ohlcv.shape, dtype=np.float64, buffer=shm.buf)[:] = self.ohlcv
+            with ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(shm.name, self.ohlcv.shape, self.strategy_class,
+                              self.base_config, self.backtest_kwargs)) as executor:
+                if method == 'grid':
+                    self._evaluate_batch(executor, list(self.space.grid()))
+                elif method == 'random':
+                    self._evaluate_batch(executor, self._unique_samples(n_trials, set()))
+                else:
+                    self._run_bayes(executor, n_trials, n_initial)
+        finally:
+            shm.close()
+            shm.unlink()
+
+        self.results.sort(key=lambda item: item['score'], reverse=True)
+        self.logger.info(f"参数寻优完成 - 评估 {len(self.results)} 组参数, 耗时 {time.time() - start:.1f}秒")
+        return self.results
+
+    def _evaluate_batch(self, executor, params_list):
+        """并行评估一批参数组合"""
+        futures = [executor.submit(_evaluate, params) for params in params_list]
+        for future in as_completed(futures):
+            params, metrics = future.result()
+            if 'error' in metrics:
+                self.logger.warning(f"参数回测失败 {params}: {metrics['error']}")
+            self.results.append({'score': self.score(metrics), 'params': params, 'metrics': metrics})
+
+    def _unique_samples(self, count, seen):
+        """随机采样count组未评估过的参数"""
+        samples = []
+        attempts = 0
+        while len(samples) < count and attempts < count * 50:
+            attempts += 1
+            params = self.space.sample(self.rng)
+            key = self.space.key(params)
+            if key not in seen:
+                seen.add(key)
+                samples.append(params)
+        return samples
+
+    def _run_bayes(self, executor, n_trials, n_initial=None):
+        """贝叶斯优化：先随机评估一批，之后每轮按期望提升选出一批（每个进程一组）并行评估"""
+        seen = set()
+        n_initial = min(n_trials, n_initial or max(self.max_workers, 10))
+        self._evaluate_batch(executor, self._unique_samples(n_initial, seen))
+
+        while len(self.results) < n_trials:
+            batch_size = min(self.max_workers, n_trials - len(self.results))
+            scored = [item for item in self.results if math.isfinite(item['score'])]
+            candidates = self._unique_samples(max(200, batch_size * 20), set(seen))
+            if not candidates:
+                break
+
+            if len(scored) < 2:
+                batch = candidates[:batch_size]
+            else:
+                x_train = np.array([self.space.encode(item['params']) for item in scored])
+                y_train = np.array([item['score'] for item in scored])
+                x_candidates = np.array([self.space.encode(params) for params in candidates])
+                ei = _expected_improvement(x_train, y_train, x_candidates)
+                batch = [candidates[i] for i in np.argsort(-ei)[:batch_size]]
+
+            for params in batch:
+                seen.add(self.space.key(params))
+            self._evaluate_batch(executor, batch)
+
+    def save(self, path):
+        """
+        把排序后的结果写入CSV
+
+        Args:
+            path: 输出文件路径
+        """
+        metric_names = ['total_return', 'max_drawdown', 'trades', 'win_rate', 'total_fees', 'total_funding',
+                        'final_balance']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['rank', 'score'] + self.space.names + metric_names + ['error'])
+            for rank, item in enumerate(self.results, 1):
+                metrics = item['metrics']
+                writer.writerow([rank, item['score']] +
+                                [item['params'][name] for name in self.space.names] +
+                                [metrics.get(name, '') for name in metric_names] +
+                                [metrics.get('error', '')])
+        self.logger.info(f"寻优结果已写入 {path}")
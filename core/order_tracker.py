@@ -0,0 +1,125 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+订单成交跟踪
+
+下单后按订单ID等待订单结束（成交或撤销），代替固定的time.sleep再查询持仓：
+- 接入了带私有连接的MarketDataStream时，订阅订单频道，收到成交推送立即返回
+- 否则按指数退避轮询订单状态（初始间隔很短，成交快时几乎没有等待）
+- 推送连接正常但超过stream_grace秒仍未收到结束推送时（推送丢失、订阅未生效），同时轮询订单状态
+"""
+
+import time
+import threading
+from core.logger_manager import logger_manager
+
+# ccxt订单状态和OKX订单频道state中表示订单已结束的取值
+FINAL_STATUSES = {'closed', 'canceled', 'expired', 'rejected', 'filled', 'mmp_canceled'}
+
+
+class OrderTracker:
+    """订单成交跟踪器"""
+
+    def __init__(self, trader, stream=None, config=None):
+        """
+        初始化订单跟踪器
+
+        Args:
+            trader: OkxTrader实例
+            stream: 可选，带私有连接的MarketDataStream
+            config: 跟踪配置，默认使用order_tracker_config
+        """
+        if config is None:
+            from config.config import order_tracker_config
+            config = order_tracker_config
+        self.trader = trader
+        self.timeout = config.get('timeout', 10)
+        self.poll_interval = config.get('poll_interval', 0.1)
+        self.max_poll_interval = config.get('max_poll_interval', 1.0)
+        self.stream_grace = config.get('stream_grace', 1.0)
+        self.logger = logger_manager.get_system_logger()
+        self.stream = None
+        self._cond = threading.Condition()
+        self.attach_stream(stream)
+
+    def attach_stream(self, stream):
+        """
+        接入推送缓存并订阅订单频道，没有私有连接的推送缓存会被忽略
+
+        Args:
+            stream: MarketDataStream
+        """
+        if stream is None or stream.private is None:
+            return
+        stream.subscribe_orders(self._on_order)
+        self.stream = stream
+
+    def _on_order(self, order):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _stream_status(self, order_id):
+        """订单频道中缓存的订单状态，没有推送时返回None"""
+        order = self.stream.get_order(order_id)
+        return order.get('state') if order else None
+
+    def wait_for_fill(self, symbol, order, timeout=None):
+        """
+        等待订单结束
+
+        Args:
+            symbol: 交易对
+            order: create_order返回的订单
+            timeout: 最长等待秒数，默认取配置
+
+        Returns:
+            str: 订单最终状态，超时或订单没有ID时返回None
+        """
+        if not order:
+            return None
+        if order.get('status') in FINAL_STATUSES:
+            return order['status']
+        order_id = order.get('id') or order.get('info', {}).get('ordId')
+        if not order_id:
+            return None
+
+        timeout = self.timeout if timeout is None else timeout
+        start = time.time()
+        deadline = start + timeout
+        interval = self.poll_interval
+        while True:
+            status = None
+            streaming = self.stream is not None and self.stream.is_connected
+            if streaming:
+                status = self._stream_status(order_id)
+            if status not in FINAL_STATUSES and (not streaming or time.time() - start >= self.stream_grace):
+                try:
+                    status = self.trader.fetch_order(symbol, order_id).get('status')
+                except Exception as e:
+                    self.logger.warning(f"查询订单 {order_id} 状态失败: {str(e)}")
+            if status in FINAL_STATUSES:
+                # 成交后余额和持仓已变化
+                if hasattr(self.trader, 'invalidate_account'):
+                    self.trader.invalidate_account()
+                self.logger.info(f"订单 {order_id} 已结束: {status}，用时 {timeout - (deadline - time.time()):.2f}秒")
+                return status
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.logger.warning(f"订单 {order_id} 在 {timeout} 秒内未确认成交")
+                return None
+            with self._cond:
+                # 有订单推送时被提前唤醒
+                self._cond.wait(min(interval, remaining))
+            interval = min(interval * 2, self.max_poll_interval)
@@ -15,6 +15,7 @@ okx u本位择时策略实盘框架
 
 import math
 from core.logger_manager import logger_manager
+from core.instrument_registry import InstrumentRegistry
 
 class PositionManager:
     def __init__(self, trader, config):
@@ -83,6 +84,15 @@ class PositionManager:
         # 如果已缓存，则直接返回
         if symbol in self.contract_info_cache:
             return self.contract_info_cache[symbol]
+        
+        # 实盘交易接口优先从合约规格索引中查询，索引中没有时再单独请求；
+        # 回测等没有fetch_all_instruments的交易接口直接使用自己提供的合约规格
+        if hasattr(self.trader, 'fetch_all_instruments'):
+            registry = InstrumentRegistry.get_instance(self.trader)
+            contract_info = registry.contract_info(symbol) if registry else None
+            if contract_info:
+                self.contract_info_cache[symbol] = contract_info
+                return contract_info
             
         try:
             # 获取合约信息
@@ -182,7 +192,7 @@ class PositionManager:
         self.logger.info(f'最终使用的杠杆倍数: {leverage}倍')
         return leverage
         
-    def calculate_position_size(self, symbol, price, risk_percentage=None):
+    def calculate_position_size(self, symbol, price, risk_percentage=None, released_margin=0):
         """
         计算推荐的仓位大小，考虑杠杆因素
         
@@ -190,6 +200,7 @@ class PositionManager:
             symbol: 交易对符号
             price: 当前价格
             risk_percentage: 风险百分比，若为None则使用配置值
+            released_margin: 下单前将被平掉的持仓释放的保证金，反手时在平仓前预先计算仓位使用
             
         Returns:
             float: 计算后的仓位大小（合约数量）
@@ -205,7 +216,7 @@ class PositionManager:
                 
             # 以下为动态仓位计算逻辑
             # 获取账户余额
-            balance = self.get_account_balance()
+            balance = self.get_account_balance() + released_margin
             if balance <= 0:
                 self.logger.warning("账户余额为0或获取失败，无法计算仓位大小")
                 return self.config.get('amount', 1)  # 使用固定仓位作为后备
@@ -367,7 +378,7 @@ class PositionManager:
             self.logger.error(f"验证仓位大小时发生错误: {str(e)}")
             return False, f"验证过程中发生错误: {str(e)}"
         
-    def get_optimal_position_size(self, symbol, price, side):
+    def get_optimal_position_size(self, symbol, price, side, released_margin=0):
         """
         获取综合考虑各种因素后的最优仓位大小
         
@@ -375,13 +386,14 @@ class PositionManager:
             symbol: 交易对符号
             price: 当前价格
             side: 交易方向，'buy'或'sell'
+            released_margin: 下单前将被平掉的持仓释放的保证金
             
         Returns:
             float: 最优仓位大小
         """
         try:
             # 获取基本仓位大小
-            position_size = self.calculate_position_size(symbol, price)
+            position_size = self.calculate_position_size(symbol, price, released_margin=released_margin)
             
             # 获取当前持仓信息
             current_position = self.trader.fetch_position(symbol)
@@ -21,10 +21,10 @@ okx u本位择时策略实盘框架
 """
 
 import datetime
-import json
-import os
+from collections import deque
 from typing import Dict, Optional, List, Tuple
 from core.logger_manager import logger_manager
+from core.trade_ledger import TradeLedger
 
 class PositionTracker:
     """
@@ -46,12 +46,19 @@ class PositionTracker:
             cls._instance = PositionTracker()
         return cls._instance
         
-    def __init__(self):
-        """初始化持仓跟踪器"""
+    def __init__(self, ledger_path: Optional[str] = None):
+        """
+        初始化持仓跟踪器
+        
+        Args:
+            ledger_path: 交易账本文件路径，默认取trade_ledger_config['path']；多账户同进程运行时每个账户使用自己的账本
+        """
+        from config.config import trade_ledger_config
         self.positions = {}  # 记录所有持仓信息
-        self.history = []    # 历史交易记录
+        self.history = deque(maxlen=trade_ledger_config.get('memory_window', 200))  # 最近的历史交易记录
         self.logger = logger_manager.get_position_logger()
         self.trader = None   # 添加trader引用，初始为None
+        self.ledger = TradeLedger(ledger_path or trade_ledger_config.get('path', 'data/trade_ledger.db'))  # 完整的历史交易记录
         
         # 加载历史记录
         self._load_history()
@@ -98,7 +105,7 @@ class PositionTracker:
                     'leverage': float(position_data.get('leverage', 1))
                 }
 
-                self.logger.info(f'self.positions:{self.positions}')
+                self.logger.debug('self.positions:%s', self.positions)
                 self.logger.info(f"新建{symbol}持仓记录 - 方向: {position_data.get('side')}, "
                                f"数量: {position_data.get('contracts')}, 价格: {position_data.get('entryPrice')}")
             else:
@@ -136,7 +143,7 @@ class PositionTracker:
                     'last_price': current_price or float(position_data.get('entryPrice', 0)),
                     'leverage': float(position_data.get('leverage', 1))
                 }
-                self.logger.info(f'self.positions:{self.positions}')
+                self.logger.debug('self.positions:%s', self.positions)
                 self.logger.info(f"换向 {symbol} - 新方向: {position_data.get('side')}, "
                                f"数量: {position_data.get('contracts')}, 价格: {position_data.get('entryPrice')}")
             else:
@@ -330,54 +337,34 @@ class PositionTracker:
                        f"入场价: {record['entryPrice']}, 平仓价: {record.get('exit_price', 'None')}, "
                        f"盈亏: {profit_str}")
         
-        # 保存历史记录
-        self._save_history()
+        # 追加到交易账本
+        try:
+            self.ledger.append(record)
+        except Exception as e:
+            self.logger.error(f"保存交易历史时发生错误: {str(e)}")
         
         # 删除当前记录
         del self.positions[symbol]
     
-    def _save_history(self) -> None:
-        """保存交易历史到文件"""
-        try:
-            # 确保目录存在
-            os.makedirs('data', exist_ok=True)
-            
-            # 转换datetime对象为字符串以便JSON序列化
-            history_copy = []
-            for record in self.history:
-                record_copy = record.copy()
-                if 'entry_time' in record_copy and isinstance(record_copy['entry_time'], datetime.datetime):
-                    record_copy['entry_time'] = record_copy['entry_time'].isoformat()
-                if 'exit_time' in record_copy and isinstance(record_copy['exit_time'], datetime.datetime):
-                    record_copy['exit_time'] = record_copy['exit_time'].isoformat()
-                if 'last_update_time' in record_copy and isinstance(record_copy['last_update_time'], datetime.datetime):
-                    record_copy['last_update_time'] = record_copy['last_update_time'].isoformat()
-                history_copy.append(record_copy)
+    def get_trade_stats(self, symbol: Optional[str] = None,
+                        since: Optional[datetime.datetime] = None) -> Dict:
+        """
+        历史交易统计
+        
+        Args:
+            symbol: 交易对符号，None表示全部
+            since: 只统计该时间之后平仓的交易
             
-            with open('data/trade_history.json', 'w') as f:
-                json.dump(history_copy, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"保存交易历史时发生错误: {str(e)}")
+        Returns:
+            Dict: 交易笔数、胜率、盈亏百分比等，见TradeLedger.stats
+        """
+        return self.ledger.stats(symbol=symbol, since=since)
     
     def _load_history(self) -> None:
-        """从文件加载交易历史"""
+        """从交易账本加载最近的交易历史"""
         try:
-            if os.path.exists('data/trade_history.json'):
-                with open('data/trade_history.json', 'r') as f:
-                    history_data = json.load(f)
-                
-                # 转换字符串为datetime对象
-                for record in history_data:
-                    if 'entry_time' in record and isinstance(record['entry_time'], str):
-                        record['entry_time'] = datetime.datetime.fromisoformat(record['entry_time'])
-                    if 'exit_time' in record and isinstance(record['exit_time'], str):
-                        record['exit_time'] = datetime.datetime.fromisoformat(record['exit_time'])
-                    if 'last_update_time' in record and isinstance(record['last_update_time'], str):
-                        record['last_update_time'] = datetime.datetime.fromisoformat(record['last_update_time'])
-                
-                self.history = history_data
-                self.logger.info(f"加载了{len(self.history)}条交易历史记录")
+            self.history.extend(self.ledger.recent(self.history.maxlen))
+            self.logger.info(f"加载了{len(self.history)}条交易历史记录，账本共{self.ledger.count()}条")
         except Exception as e:
             self.logger.error(f"加载交易历史时发生错误: {str(e)}")
-            # 发生错误时，创建空的历史记录
-            self.history = [] 
\ No newline at end of file
+            self.history.clear()
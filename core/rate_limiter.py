@@ -0,0 +1,271 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+跨进程自适应限流
+
+按OKX接口分组（行情market、公共数据public、交易trade、账户account）发放令牌，OKX的行情和公共接口按IP限频，
+交易和账户接口按账户限频，所以前两组同一台机器上所有进程共用一个令牌桶，后两组每个账户一个令牌桶。
+令牌桶状态保存在共用目录下的小文件中，用文件锁(fcntl.flock)在进程间同步，同一进程的线程之间再加一把线程锁；
+不支持fcntl的系统（Windows）只在进程内限流。
+
+自适应：请求触发限频(ccxt.DDoSProtection，包括429)时整组暂停（响应头有Retry-After时以其为准）并把速率乘以penalty，
+之后每次成功请求把速率系数加回recovery，直到恢复配置的速率（加性增、乘性减）。
+install_rate_limiter把限流接入ccxt实例的fetch2，所有REST请求（包括ccxt统一接口和OKX原始接口）都经过限流。
+"""
+
+import os
+import time
+import struct
+import hashlib
+import inspect
+import threading
+import ccxt
+from core.logger_manager import logger_manager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 令牌桶状态: 令牌数, 上次补充时间, 暂停截止时间, 速率系数
+_STATE = struct.Struct('dddd')
+
+
+class RateLimiter:
+    """按接口分组的跨进程令牌桶"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取单例实例
+
+        Returns:
+            RateLimiter: 限流器，配置中未启用时返回None
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                from config.config import rate_limit_config
+                if not rate_limit_config.get('enabled', True):
+                    return None
+                cls._instance = cls(rate_limit_config)
+            return cls._instance
+
+    def __init__(self, config):
+        """
+        初始化限流器
+
+        Args:
+            config: 限流配置（path、groups、penalty、recovery、min_factor、pause_seconds）
+        """
+        self.groups = config.get('groups', {})
+        self.penalty = config.get('penalty', 0.5)
+        self.recovery = config.get('recovery', 0.05)
+        self.min_factor = config.get('min_factor', 0.1)
+        self.pause_seconds = config.get('pause_seconds', 2.0)
+        self.path = os.path.expanduser(config.get('path', '~/.lhcxy/rate_limit'))
+        if fcntl is not None:
+            os.makedirs(self.path, exist_ok=True)
+        self.logger = logger_manager.get_system_logger()
+        self._locks = {}      # 令牌桶名 -> 线程锁
+        self._files = {}      # 令牌桶名 -> 文件描述符
+        self._memory = {}     # 令牌桶名 -> 状态（不支持文件锁时使用）
+        self._factors = {}    # 令牌桶名 -> 最近一次读写时的速率系数
+        self._locks_guard = threading.Lock()
+
+    def _spec(self, group):
+        return self.groups.get(group) or self.groups.get('default', {'rate': 5, 'burst': 10, 'scope': 'account'})
+
+    def bucket_name(self, group, namespace=''):
+        """
+        令牌桶名，按账户限频的分组带上账户标识（API密钥的哈希，不把密钥写进文件名）
+
+        Args:
+            group: 接口分组
+            namespace: 账户标识，通常为API密钥
+        """
+        if group not in self.groups:
+            group = 'default'
+        if self._spec(group).get('scope', 'account') == 'ip' or not namespace:
+            return group
+        return f"{group}-{hashlib.sha1(str(namespace).encode()).hexdigest()[:12]}"
+
+    def _update(self, name, spec, func):
+        """在线程锁和文件锁内读取、修改、写回令牌桶状态，返回func的结果"""
+        with self._locks_guard:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            if fcntl is None:
+                state = self._memory.get(name) or (float(spec['burst']), time.time(), 0.0, 1.0)
+                state, result = func(*state)
+                self._memory[name] = state
+                self._factors[name] = state[3]
+                return result
+            fd = self._files.get(name)
+            if fd is None:
+                fd = os.open(os.path.join(self.path, f"{name}.bucket"), os.O_RDWR | os.O_CREAT, 0o644)
+                self._files[name] = fd
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                raw = os.pread(fd, _STATE.size, 0)
+                state = _STATE.unpack(raw) if len(raw) == _STATE.size else (float(spec['burst']), time.time(), 0.0, 1.0)
+                state, result = func(*state)
+                os.pwrite(fd, _STATE.pack(*state), 0)
+                self._factors[name] = state[3]
+                return result
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def try_acquire(self, group, namespace=''):
+        """
+        尝试取得一个令牌，不阻塞
+
+        Returns:
+            float: 0表示已取得令牌，否则为需要等待的秒数
+        """
+        spec = self._spec(group)
+        rate, burst = float(spec['rate']), float(spec['burst'])
+
+        def take(tokens, last, paused_until, factor):
+            now = time.time()
+            if now < paused_until:
+                return (tokens, last, paused_until, factor), paused_until - now
+            effective = rate * factor
+            tokens = min(burst, tokens + max(0.0, now - last) * effective)
+            if tokens >= 1:
+                return (tokens - 1, now, paused_until, factor), 0.0
+            return (tokens, now, paused_until, factor), (1 - tokens) / effective
+
+        return self._update(self.bucket_name(group, namespace), spec, take)
+
+    def acquire(self, group, namespace=''):
+        """取得一个令牌，令牌不足时阻塞等待"""
+        while True:
+            wait = self.try_acquire(group, namespace)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, group, namespace=''):
+        """协程版本的acquire，等待时不阻塞事件循环"""
+        import asyncio  # 只有协程版本用到，导入本模块时不加载asyncio
+        while True:
+            wait = self.try_acquire(group, namespace)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def penalize(self, group, namespace='', retry_after=None):
+        """
+        触发限频：整组暂停并降低速率
+
+        Args:
+            group: 接口分组
+            namespace: 账户标识
+            retry_after: 交易所要求等待的秒数，None时使用pause_seconds
+        """
+        spec = self._spec(group)
+        pause = float(retry_after) if retry_after else self.pause_seconds
+
+        def punish(tokens, last, paused_until, factor):
+            now = time.time()
+            factor = max(self.min_factor, factor * self.penalty)
+            return (0.0, now + pause, max(paused_until, now + pause), factor), factor
+
+        factor = self._update(self.bucket_name(group, namespace), spec, punish)
+        self.logger.warning(f"{group}接口触发限频，暂停 {pause:.1f}秒，速率降为配置的 {factor:.0%}")
+
+    def reward(self, group, namespace=''):
+        """请求成功：速率系数逐步恢复，系数已是1时（绝大多数请求）不读写令牌桶文件"""
+        name = self.bucket_name(group, namespace)
+        # 每次请求前的acquire刚读过令牌桶，用当时的系数判断即可
+        if self._factors.get(name, 1.0) >= 1.0:
+            return
+        spec = self._spec(group)
+
+        def recover(tokens, last, paused_until, factor):
+            return (tokens, last, paused_until, min(1.0, factor + self.recovery)), None
+
+        self._update(name, spec, recover)
+
+
+def installed_limiter(exchange):
+    """
+    exchange已接入的跨进程限流器
+
+    Returns:
+        RateLimiter: 未通过install_rate_limiter接入时返回None
+    """
+    return getattr(getattr(exchange, 'fetch2', None), 'rate_limiter', None)
+
+
+def endpoint_group(path):
+    """OKX接口路径的分组，如market/candles -> market"""
+    return str(path).split('/', 1)[0]
+
+
+def _retry_after(exchange):
+    headers = getattr(exchange, 'last_response_headers', None) or {}
+    value = headers.get('Retry-After') or headers.get('retry-after')
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def install_rate_limiter(exchange, namespace=''):
+    """
+    把限流接入ccxt实例，替代ccxt自带的单实例限流
+
+    Args:
+        exchange: ccxt.okx或ccxt.async_support.okx实例（其他后端原样返回）
+        namespace: 账户标识，通常为API密钥
+
+    Returns:
+        传入的exchange
+    """
+    limiter = RateLimiter.get_instance()
+    if limiter is None or not hasattr(exchange, 'fetch2'):
+        return exchange
+    original = exchange.fetch2
+    exchange.enableRateLimit = False
+
+    if inspect.iscoroutinefunction(original):
+        async def fetch2(path, *args, **kwargs):
+            group = endpoint_group(path)
+            await limiter.acquire_async(group, namespace)
+            try:
+                result = await original(path, *args, **kwargs)
+            except ccxt.DDoSProtection:
+                limiter.penalize(group, namespace, _retry_after(exchange))
+                raise
+            limiter.reward(group, namespace)
+            return result
+    else:
+        def fetch2(path, *args, **kwargs):
+            group = endpoint_group(path)
+            limiter.acquire(group, namespace)
+            try:
+                result = original(path, *args, **kwargs)
+            except ccxt.DDoSProtection:
+                limiter.penalize(group, namespace, _retry_after(exchange))
+                raise
+            limiter.reward(group, namespace)
+            return result
+
+    fetch2.rate_limiter = limiter
+    exchange.fetch2 = fetch2
+    return exchange
@@ -69,4 +69,38 @@ def retry(max_retries=3, base_delay=1.0, backoff=True):
             raise last_exception
         
         return wrapper
-    return decorator 
\ No newline at end of file
+    return decorator 
+
+def async_retry(max_retries=3, base_delay=1.0, backoff=True):
+    """
+    协程版本的重试装饰器，重试等待使用asyncio.sleep，不阻塞事件循环
+    
+    参数:
+        max_retries (int): 最大重试次数
+        base_delay (float): 初始重试延迟(秒)
+        backoff (bool): 是否使用指数退避
+    """
+    # 只有协程版本用到asyncio，导入本模块时不加载
+    import asyncio
+    
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            func_name = func.__name__
+            logger = args[0].logger if args and hasattr(args[0], 'logger') else logging.getLogger('retry')
+            
+            for attempt in range(1, max_retries + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if attempt >= max_retries:
+                        logger.error(f"{func_name} 在 {max_retries} 次尝试后失败: {str(e)}")
+                        raise
+                    
+                    delay = base_delay * (2 ** (attempt - 1)) if backoff else base_delay
+                    logger.warning(f"{func_name} 尝试 {attempt}/{max_retries} 失败: {str(e)}. "
+                                  f"等待 {delay:.2f}秒后重试...")
+                    await asyncio.sleep(delay)
+        
+        return wrapper
+    return decorator
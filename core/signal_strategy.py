@@ -55,6 +55,8 @@ class SignalStrategy(StrategyTemplate):
         
         # 获取技术指标配置
         self.indicators_config = config.get('indicators', [])
+        # 指标计算图，第一次计算指标时建立
+        self.indicator_graph = None
         
         # 记录初始化信息
         self.logger.info(f"初始化信号驱动策略，共配置了{len(self.signal_generators)}个信号生成器")
@@ -71,7 +73,7 @@ class SignalStrategy(StrategyTemplate):
         """
         计算技术指标
         
-        根据配置的指标列表计算所有必要的技术指标
+        根据配置的指标列表计算所有必要的技术指标，通过指标计算图共用相同的中间结果
         
         Args:
             df: K线数据DataFrame
@@ -79,17 +81,17 @@ class SignalStrategy(StrategyTemplate):
         Returns:
             添加了技术指标的DataFrame
         """
-        # 导入计算指标的函数
-        from indicators import calculate_indicators
-        
         # 确保数据足够
         if df is None or df.empty:
             self.logger.warning("数据不足，无法计算技术指标")
             return df
         
         try:
-            # 使用indicators模块计算所有配置的指标
-            indicators_df = calculate_indicators(df, self.indicators_config)
+            # 使用指标计算图计算所有配置的指标，相同的中间结果只计算一次
+            if self.indicator_graph is None:
+                from indicators import IndicatorGraph
+                self.indicator_graph = IndicatorGraph(self.indicators_config)
+            indicators_df = self.indicator_graph.evaluate(df)
             
             indicator_columns = [col for col in indicators_df.columns 
                                 if col not in df.columns]
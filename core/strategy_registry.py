@@ -0,0 +1,150 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+策略注册表
+
+按main.py中的STRATEGY_MAPPING（策略名称 -> 模块路径、类名、配置变量名）管理策略：
+- load只导入选中的那一个策略模块
+- describe直接解析策略源文件读取类的文档字符串，列出策略时不导入任何策略模块（也就不会导入pandas、ccxt等）
+- import_profile用python -X importtime统计启动时各模块的导入耗时
+"""
+
+import os
+import re
+import ast
+import sys
+import importlib
+import subprocess
+
+# 项目根目录
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# python -X importtime的输出行: import time:  self [us] | cumulative | imported package
+_IMPORT_TIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class StrategyRegistry:
+    """策略注册表，按需导入策略模块"""
+
+    def __init__(self, mapping):
+        """
+        初始化策略注册表
+
+        Args:
+            mapping: 策略名称 -> (模块路径, 类名, 配置变量名)
+        """
+        self.mapping = mapping
+        self._descriptions = {}  # 策略名称 -> (源文件修改时间, 描述)
+
+    def names(self):
+        """所有已注册的策略名称"""
+        return list(self.mapping)
+
+    def source_path(self, name):
+        """策略模块的源文件路径"""
+        module_path = self.mapping[name][0]
+        return os.path.join(PROJECT_ROOT, *module_path.split('.')) + '.py'
+
+    def describe(self, name):
+        """
+        读取策略类文档字符串的第一行，不导入策略模块
+
+        Args:
+            name: 策略名称
+
+        Returns:
+            str: 策略描述，源文件或类不存在时返回None
+        """
+        _, class_name, _ = self.mapping[name]
+        path = self.source_path(name)
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        cached = self._descriptions.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(path, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), filename=path)
+        description = None
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and node.name == class_name:
+                docstring = ast.get_docstring(node) or '无描述'
+                description = docstring.strip().split('\n')[0].strip()
+                break
+        self._descriptions[name] = (mtime, description)
+        return description
+
+    def load(self, name):
+        """
+        导入策略模块，返回策略类和配置
+
+        Args:
+            name: 策略名称
+
+        Returns:
+            tuple: (策略类, 策略配置)
+        """
+        if name not in self.mapping:
+            raise ValueError(f"未找到名为 '{name}' 的策略。可用的策略有: {', '.join(self.mapping.keys())}")
+
+        module_path, class_name, config_name = self.mapping[name]
+
+        try:
+            # 动态导入策略模块
+            strategy_module = importlib.import_module(module_path)
+            # 获取策略类
+            strategy_class = getattr(strategy_module, class_name)
+            # 导入策略配置
+            config_module = importlib.import_module('config.config')
+            strategy_config = getattr(config_module, config_name)
+
+            return strategy_class, strategy_config
+        except ImportError as e:
+            raise ImportError(f"导入策略 '{name}' 失败: {str(e)}。请确认策略文件位于 {module_path}.py")
+        except AttributeError as e:
+            raise AttributeError(f"加载策略 '{name}' 失败: {str(e)}。请确认策略类名为 {class_name}")
+
+
+def import_profile(modules, top=20):
+    """
+    在子进程中用python -X importtime导入指定模块，统计导入耗时
+
+    Args:
+        modules: 要导入的模块列表，按实盘启动时的顺序
+        top: 返回累计耗时最多的前top个模块
+
+    Returns:
+        dict: total_ms总导入耗时, modules为[(模块名, 累计耗时ms, 自身耗时ms)]，按累计耗时从大到小排序
+    """
+    code = '; '.join(f"import {module}" for module in modules)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else '导入失败')
+
+    entries = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        entries.append((module, cumulative_us / 1000, self_us / 1000))
+        # 缩进为1个空格的是顶层导入，累计耗时相加即总耗时
+        if len(indent) == 1:
+            total_us += cumulative_us
+    entries.sort(key=lambda entry: entry[1], reverse=True)
+    return {'total_ms': total_us / 1000, 'modules': entries[:top]}
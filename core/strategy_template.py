@@ -13,15 +13,17 @@ okx u本位择时策略实盘框架
 若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
 """
 
+import logging
 import pandas as pd
 import datetime
 from core.data_feed import DataFeed
+from core.kline_store import KlineStore
 from core.position_manager import PositionManager
 from core.logger_manager import logger_manager
 from typing import Dict, Any, Optional, Tuple, List, Union
-import time
 from core.signal_types import *  # 导入信号类型常量
 from core.position_tracker import PositionTracker  # 导入持仓跟踪器
+from core.order_tracker import OrderTracker  # 导入订单成交跟踪器
 
 # 导入通知管理器
 from core.notification_manager import NotificationManager
@@ -49,8 +51,10 @@ class StrategyTemplate:
         self.symbol = config['symbol']
         self.timeframe = config.get('timeframe', '1h')
         
-        # 初始化数据源
-        self.data_feed = DataFeed(trader, self.symbol, self.timeframe)
+        # 初始化数据源，incremental_kline开启时每根K线只增量获取新数据，启用本地K线存储时优先读取本地数据
+        self.data_feed = DataFeed(trader, self.symbol, self.timeframe,
+                                  incremental=config.get('incremental_kline', False),
+                                  store=KlineStore.get_instance())
         self.df = None
         
         # 获取日志记录器
@@ -64,8 +68,13 @@ class StrategyTemplate:
         # 设置trader引用，用于获取实时价格
         self.position_tracker.set_trader(trader)
         
+        # 订单成交跟踪器，下单后等待订单成交再查询持仓；main.py/运行器接入推送后改为等待订单频道推送
+        self.order_tracker = OrderTracker(trader)
+        
         # 日志打印配置
         self.print_rows_limit = config.get('print_rows_limit', 15)  # 默认打印15条记录
+        from config.config import logging_config
+        self.indicator_rows_level = logging.getLevelName(logging_config.get('indicator_rows_level', 'DEBUG'))  # 指标数据行的日志级别
         
         # 获取通知管理器
         try:
@@ -185,7 +194,11 @@ class StrategyTemplate:
             self.logger.warning("指标数据为空，无法打印")
             return
             
-        self.logger.info(f"计算后的指标数据(最近{self.print_rows_limit}条):")
+        # 数据行的日志级别未启用时不做任何格式化
+        if not self.logger.isEnabledFor(self.indicator_rows_level):
+            return
+            
+        self.logger.log(self.indicator_rows_level, "计算后的指标数据(最近%s条):", self.print_rows_limit)
         indicator_tail = indicators_df.tail(self.print_rows_limit)
         
         # 获取所有列名
@@ -200,12 +213,12 @@ class StrategyTemplate:
         
         # 打印表头和数据
         header_line = " | ".join([f"{col[:10]}" for col in display_columns])
-        self.logger.info(f"指标列:{header_line}")
+        self.logger.log(self.indicator_rows_level, "指标列:%s", header_line)
         
         # 打印具体数据行
-        for _, row in indicator_tail.iterrows():
-            data_line = " | ".join([f"{row[col]:.6f}" if isinstance(row[col], float) else f"{row[col]}" for col in display_columns])
-            self.logger.info(f"数据行:{data_line}")
+        for row in indicator_tail[display_columns].itertuples(index=False):
+            data_line = " | ".join([f"{value:.6f}" if isinstance(value, float) else f"{value}" for value in row])
+            self.logger.log(self.indicator_rows_level, "数据行:%s", data_line)
 
     
     def run(self) -> Tuple[Optional[str], Optional[pd.DataFrame]]:
@@ -286,6 +299,111 @@ class StrategyTemplate:
             
             return None, None
     
+    def _confirm_order(self, order) -> Optional[Dict[str, Any]]:
+        """
+        等待订单成交后获取最新持仓
+        
+        Args:
+            order: 下单返回的订单
+            
+        Returns:
+            最新持仓，没有持仓时为None
+        """
+        self.order_tracker.wait_for_fill(self.symbol, order)
+        return self.trader.fetch_position(self.symbol)
+    
+    def _calculate_open_amount(self, side: str, latest_price: float, released_margin: float = 0) -> float:
+        """
+        计算开仓数量
+        
+        Args:
+            side: 开仓方向，'buy'或'sell'
+            latest_price: 最新价格
+            released_margin: 开仓前将被平掉的持仓释放的保证金
+            
+        Returns:
+            float: 开仓数量
+        """
+        # 检查是否使用动态仓位
+        if self.config.get('use_dynamic_position', True):
+            amount = self.position_manager.get_optimal_position_size(self.symbol, latest_price, side, released_margin)
+            self.logger.info(f"使用动态仓位: {amount}")
+        else:
+            amount = self.config.get('amount', 1)
+            self.logger.info(f"使用固定仓位: {amount}")
+        
+        # 确保仓位有效
+        if amount <= 0:
+            amount = self.config.get('amount', 1)
+            self.logger.warning(f"仓位大小无效，使用默认值: {amount}")
+        return amount
+    
+    def _reverse_position(self, position: Dict[str, Any], side: str, latest_price: float) -> bool:
+        """
+        反手：平仓前先计算开仓数量，平仓和反向开仓在一个批量下单请求中提交
+        
+        Args:
+            position: 当前持仓，方向与side相反
+            side: 开仓方向，'buy'或'sell'
+            latest_price: 最新价格
+            
+        Returns:
+            bool: 是否完成反手，批量请求失败时返回False，由调用方按最新持仓逐笔处理
+        """
+        from config.config import notification_config
+        
+        pos_side = position['side']
+        close_amount = float(position['contracts'])
+        # 平仓释放的保证金计入可用余额；浮亏在平仓时实现要扣除，浮盈不计入，仓位只会偏小不会超出可用余额
+        released_margin = float(position.get('initialMargin') or 0) + min(float(position.get('unrealizedPnl') or 0), 0)
+        amount = self._calculate_open_amount(side, latest_price, released_margin)
+        
+        try:
+            close_order, order = self.trader.reverse_position(self.symbol, pos_side, close_amount, amount, latest_price)
+        except Exception as e:
+            self.logger.error(f"反手批量下单失败: {str(e)}")
+            return False
+        
+        # 批量请求中失败的一笔逐笔补单
+        if close_order is None:
+            close_method = self.trader.close_short_position if pos_side == 'short' else self.trader.close_long_position
+            close_order = close_method(self.symbol, close_amount)
+        if order is None:
+            order = self.trader.create_order(self.symbol, side, amount)
+        
+        # 等待两笔订单成交后获取最新持仓
+        self.order_tracker.wait_for_fill(self.symbol, close_order)
+        new_position = self._confirm_order(order)
+        self.position_tracker.update_position(self.symbol, new_position)
+        
+        close_action, open_action = ("平空仓", "开多仓") if side == 'buy' else ("平多仓", "开空仓")
+        signal_name = "开多" if side == 'buy' else "开空"
+        self.logger.info(f"反手完成: {close_action} {close_amount}, {open_action} {amount} @ {latest_price}")
+        
+        if self.notification_manager:
+            if notification_config.get('notify_on_trade', True):
+                self.notification_manager.send_trade_notification(
+                    strategy_name=self.__class__.__name__,
+                    symbol=self.symbol,
+                    action=close_action,
+                    amount=close_amount,
+                    price=latest_price,
+                    position_info=new_position,
+                    additional_info=f"策略产生{signal_name}信号，已执行{close_action}操作"
+                )
+                order_id = order.get('id', '') if order else ''
+                self.notification_manager.send_trade_notification(
+                    strategy_name=self.__class__.__name__,
+                    symbol=self.symbol,
+                    action=open_action,
+                    amount=amount,
+                    price=latest_price,
+                    position_info=new_position,
+                    order_id=order_id,
+                    additional_info=f"策略产生{signal_name}信号，已执行{open_action}操作"
+                )
+        return True
+    
     def _execute_trade(self, signal: Optional[str], df: pd.DataFrame) -> bool:
         """
         执行交易逻辑，处理各类交易信号并管理持仓
@@ -319,9 +437,6 @@ class StrategyTemplate:
         current_time = datetime.datetime.now()
         latest_price = df.iloc[-1]['close']
         
-        # 检查是否使用动态仓位
-        use_dynamic_position = self.config.get('use_dynamic_position', True)
-        
         # 记录信号生成日志
         additional_info = {
             "price": latest_price,
@@ -341,16 +456,21 @@ class StrategyTemplate:
         
         # 处理开多仓信号
         if action == OPEN_LONG:
+            # 有空仓时反手：平仓前先算好开仓数量，平空和开多在一个批量请求中提交
+            if position and position['side'] == 'short' and self.config.get('batch_reverse', True):
+                if self._reverse_position(position, 'buy', latest_price):
+                    return True
+                # 批量请求失败，两笔订单是否成交未知，按最新持仓逐笔平仓、开仓
+                position = self.trader.fetch_position(self.symbol)
+            
             # 如果有空仓先平仓
             if position and position['side'] == 'short':
-                self.trader.close_short_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_short_position(self.symbol, float(position['contracts']))
                 close_price = latest_price  # 使用当前价格作为平仓价格
                 self.logger.info(f"平空仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                # 稍微延迟以确保交易所数据已更新
-                time.sleep(2)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
@@ -374,17 +494,7 @@ class StrategyTemplate:
                 return False
             
             # 确定仓位大小
-            if use_dynamic_position:
-                amount = self.position_manager.get_optimal_position_size(self.symbol, latest_price, 'buy')
-                self.logger.info(f"使用动态仓位: {amount}")
-            else:
-                amount = self.config.get('amount', 1)
-                self.logger.info(f"使用固定仓位: {amount}")
-            
-            # 确保仓位有效
-            if amount <= 0:
-                amount = self.config.get('amount', 1)
-                self.logger.warning(f"仓位大小无效，使用默认值: {amount}")
+            amount = self._calculate_open_amount('buy', latest_price)
             
             # 如果当前没有持仓，强制设置杠杆
             if position is None or position.get('contracts', 0) == 0:
@@ -406,10 +516,8 @@ class StrategyTemplate:
             order = self.trader.create_order(self.symbol, 'buy', amount)
             self.logger.info(f"执行买入: {amount} @ {latest_price}")
             
-            # 获取开仓后的最新持仓状态
-            # 稍微延迟以确保交易所数据已更新
-            time.sleep(2)
-            new_position = self.trader.fetch_position(self.symbol)
+            # 获取开仓后的最新持仓状态，等待开仓订单成交后再查询
+            new_position = self._confirm_order(order)
             
             # 更新持仓跟踪器
             self.position_tracker.update_position(self.symbol, new_position)
@@ -433,16 +541,21 @@ class StrategyTemplate:
             
         # 处理开空仓信号
         elif action == OPEN_SHORT:
+            # 有多仓时反手：平仓前先算好开仓数量，平多和开空在一个批量请求中提交
+            if position and position['side'] == 'long' and self.config.get('batch_reverse', True):
+                if self._reverse_position(position, 'sell', latest_price):
+                    return True
+                # 批量请求失败，两笔订单是否成交未知，按最新持仓逐笔平仓、开仓
+                position = self.trader.fetch_position(self.symbol)
+            
             # 如果有多仓先平仓
             if position and position['side'] == 'long':
-                self.trader.close_long_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_long_position(self.symbol, float(position['contracts']))
                 close_price = latest_price  # 使用当前价格作为平仓价格
                 self.logger.info(f"平多仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                # 稍微延迟以确保交易所数据已更新
-                time.sleep(0.5)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
@@ -466,17 +579,7 @@ class StrategyTemplate:
                 return False
             
             # 确定仓位大小
-            if use_dynamic_position:
-                amount = self.position_manager.get_optimal_position_size(self.symbol, latest_price, 'sell')
-                self.logger.info(f"使用动态仓位: {amount}")
-            else:
-                amount = self.config.get('amount', 1)
-                self.logger.info(f"使用固定仓位: {amount}")
-            
-            # 确保仓位有效
-            if amount <= 0:
-                amount = self.config.get('amount', 1)
-                self.logger.warning(f"仓位大小无效，使用默认值: {amount}")
+            amount = self._calculate_open_amount('sell', latest_price)
             
             # 如果当前没有持仓，强制设置杠杆
             if position is None or position.get('contracts', 0) == 0:
@@ -498,10 +601,8 @@ class StrategyTemplate:
             order = self.trader.create_order(self.symbol, 'sell', amount)
             self.logger.info(f"执行卖出: {amount} @ {latest_price}")
             
-            # 获取开仓后的最新持仓状态
-            # 稍微延迟以确保交易所数据已更新
-            time.sleep(0.5)
-            new_position = self.trader.fetch_position(self.symbol)
+            # 获取开仓后的最新持仓状态，等待开仓订单成交后再查询
+            new_position = self._confirm_order(order)
             
             # 更新持仓跟踪器
             self.position_tracker.update_position(self.symbol, new_position)
@@ -528,13 +629,12 @@ class StrategyTemplate:
             # 检查是否有多仓
             if position and position['side'] == 'long':
                 # 执行平多仓操作
-                self.trader.close_long_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_long_position(self.symbol, float(position['contracts']))
                 close_price = latest_price
                 self.logger.info(f"平多仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                time.sleep(0.5)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
@@ -561,13 +661,12 @@ class StrategyTemplate:
             # 检查是否有空仓
             if position and position['side'] == 'short':
                 # 执行平空仓操作
-                self.trader.close_short_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_short_position(self.symbol, float(position['contracts']))
                 close_price = latest_price
                 self.logger.info(f"平空仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                time.sleep(0.5)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
@@ -597,13 +696,12 @@ class StrategyTemplate:
                 
             if position['side'] == 'long':
                 # 平多仓
-                self.trader.close_long_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_long_position(self.symbol, float(position['contracts']))
                 close_price = latest_price
                 self.logger.info(f"平多仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                time.sleep(0.5)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
@@ -624,13 +722,12 @@ class StrategyTemplate:
                 
             elif position['side'] == 'short':
                 # 平空仓
-                self.trader.close_short_position(self.symbol, float(position['contracts']))
+                close_order = self.trader.close_short_position(self.symbol, float(position['contracts']))
                 close_price = latest_price
                 self.logger.info(f"平空仓完成，时间: {current_time}, 价格: {close_price}")
                 
-                # 获取平仓后的最新持仓状态
-                time.sleep(0.5)
-                new_position = self.trader.fetch_position(self.symbol)
+                # 获取平仓后的最新持仓状态，等待平仓订单成交后再查询
+                new_position = self._confirm_order(close_order)
                 
                 # 更新持仓跟踪器
                 self.position_tracker.update_position(self.symbol, new_position)
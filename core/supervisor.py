@@ -0,0 +1,271 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+多账户多交易对运行器
+
+在一个进程中运行多个(账户, 交易对, 策略)实例，代替每个账户目录各起一组main.py和tp_sl_monitor.py：
+- 每个账户只创建一个OkxTrader、一个PositionTracker和一条私有推送连接，账户下的所有策略实例和止盈止损监控器共用
+- 同一交易对和周期的K线只向交易所请求一次，所有实例共用（SharedDataFeed）
+- 所有实例共用一个调度循环和一条公共推送连接，K线确认后同一周期的实例并行运行
+- 开启async_trader时，所有账户的REST请求在同一个事件循环和aiohttp连接池中并发等待
+
+仓位、止盈止损规则仍取config.py和tp_sl_config.py中的全局配置和symbol_position_config，所有实例共用
+"""
+
+import os
+import time
+import datetime
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from core.trader import OkxTrader
+from core.async_trader import SyncOkxTrader
+from core.data_feed import SharedDataFeed
+from core.position_tracker import PositionTracker
+from core.okx_websocket import create_market_stream
+from core.logger_manager import logger_manager
+from core.time_utils import calculate_next_candle_time, get_seconds_from_timeframe
+
+logger = logger_manager.get_logger("supervisor")
+
+
+def load_api_keys(path):
+    """
+    从API密钥文件中读取api_config，文件格式与config/api_keys.py相同
+
+    Args:
+        path: 文件路径，相对路径相对于当前工作目录
+
+    Returns:
+        dict: 包含api_key、secret_key、passphrase
+    """
+    path = os.path.abspath(os.path.expanduser(path))
+    spec = importlib.util.spec_from_file_location(f"api_keys_{abs(hash(path))}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.api_config
+
+
+def _next_boundary(timeframe):
+    """下一根K线开始的时间戳(秒)"""
+    next_candle_time, _ = calculate_next_candle_time(timeframe)
+    return next_candle_time.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+def _account_ledger_path(name):
+    """账户的交易账本路径：在trade_ledger_config['path']的文件名后加账户名"""
+    from config.config import trade_ledger_config
+    root, ext = os.path.splitext(trade_ledger_config.get('path', 'data/trade_ledger.db'))
+    return f"{root}_{name}{ext}"
+
+
+class Account:
+    """一个交易账户，账户下的策略实例和止盈止损监控器共用同一个OkxTrader和PositionTracker"""
+
+    def __init__(self, name, api_keys, alias, use_async=False):
+        """
+        初始化账户
+
+        Args:
+            name: 账户名
+            api_keys: API密钥
+            alias: 通知和持仓报告中显示的账户名
+            use_async: 是否使用异步交易接口的同步外观SyncOkxTrader
+        """
+        self.name = name
+        self.api_keys = api_keys
+        self.alias = alias
+        trader_class = SyncOkxTrader if use_async else OkxTrader
+        self.trader = trader_class(api_keys['api_key'], api_keys['secret_key'], api_keys['passphrase'])
+        # 持仓记录按交易对保存，不同账户交易同一币种时不能共用单例，每个账户使用自己的跟踪器和账本
+        self.position_tracker = PositionTracker(_account_ledger_path(name))
+        self.position_tracker.set_trader(self.trader)
+        self.stream = None
+        self.monitor = None
+
+
+class StrategyInstance:
+    """一个(账户, 交易对, 策略)实例"""
+
+    def __init__(self, account, strategy_name, symbol, timeframe, strategy):
+        self.account = account
+        self.strategy_name = strategy_name
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.strategy = strategy
+        self.name = f"{account.name}/{symbol}/{timeframe}/{strategy_name}"
+
+
+class Supervisor:
+    """
+    多账户多交易对运行器
+
+    同一交易对和周期的实例组成一组，每组在K线确认（或收盘后buffer_seconds秒）时运行一次，
+    组内各实例在线程池中并行执行，通过SharedDataFeed共用K线数据
+    """
+
+    def __init__(self, supervisor_config, trading_config, position_config):
+        """
+        初始化运行器
+
+        Args:
+            supervisor_config: 运行器配置（accounts、instances、tp_sl_monitor、max_workers、buffer_seconds）
+            trading_config: 通用交易配置，实例未指定交易对、周期、策略时使用其中的设置
+            position_config: 仓位管理配置
+        """
+        self.config = supervisor_config
+        self.trading_config = trading_config
+        self.position_config = position_config
+        self.buffer_seconds = supervisor_config.get('buffer_seconds', 30)
+        self.executor = ThreadPoolExecutor(max_workers=supervisor_config.get('max_workers', 8),
+                                           thread_name_prefix='strategy')
+        self.accounts = {}
+        self.instances = []
+        self.feeds = {}    # (交易对, 周期, K线数量, 是否增量) -> SharedDataFeed
+        self.groups = {}   # (交易对, 周期) -> [StrategyInstance]
+        self._stopped = threading.Event()
+
+        # 所有实例共用一条公共推送连接接收K线确认，账户的私有连接复用它的公共连接
+        self.stream = create_market_stream()
+
+        for name, account_config in supervisor_config.get('accounts', {}).items():
+            api_keys = load_api_keys(account_config.get('api_keys', 'config/api_keys.py'))
+            alias = account_config.get('alias') or trading_config.get('account_alias', name)
+            account = Account(name, api_keys, alias, supervisor_config.get('async_trader', False))
+            # 判断仓位是否是双向持仓,如果不是会退出程序
+            account.trader.check_position_is_dual_side()
+            if self.stream:
+                # 账户的私有连接，策略实例下单后等待订单频道的成交推送
+                account.stream = create_market_stream(api_keys['api_key'], api_keys['secret_key'],
+                                                      api_keys['passphrase'], shared=self.stream)
+            self.accounts[name] = account
+            logger.info(f"账户 {name}({alias}) 初始化完成")
+
+        for instance_config in supervisor_config.get('instances', []):
+            self._add_instance(instance_config)
+
+    def _add_instance(self, instance_config):
+        """按实例配置创建策略，并把策略的数据源替换为共用的SharedDataFeed"""
+        from main import get_strategy_class
+
+        account = self.accounts[instance_config['account']]
+        strategy_name = instance_config.get('strategy') or self.trading_config['strategy']
+        symbol = instance_config.get('inst_id') or self.trading_config['symbol']
+        timeframe = instance_config.get('timeframe') or self.trading_config['timeframe']
+
+        strategy_class, strategy_config = get_strategy_class(strategy_name)
+        # 与main.py相同的配置合并方式
+        config = {**self.trading_config, **strategy_config, **self.position_config,
+                  'symbol': symbol, 'timeframe': timeframe}
+        strategy = strategy_class(account.trader, config)
+
+        feed = strategy.data_feed
+        key = (symbol, timeframe, feed.limit, feed.incremental)
+        if key not in self.feeds:
+            # K线是公共数据，用第一个实例所属账户的trader获取即可
+            self.feeds[key] = SharedDataFeed(account.trader, symbol, timeframe, feed.limit,
+                                             incremental=feed.incremental, store=feed.store)
+        strategy.data_feed = self.feeds[key]
+        strategy.position_tracker = account.position_tracker
+        strategy.order_tracker.attach_stream(account.stream)
+        strategy.initialize()
+
+        instance = StrategyInstance(account, strategy_name, symbol, timeframe, strategy)
+        self.instances.append(instance)
+        if (symbol, timeframe) not in self.groups:
+            self.groups[(symbol, timeframe)] = []
+            if self.stream:
+                self.stream.subscribe_candles(symbol, timeframe)
+        self.groups[(symbol, timeframe)].append(instance)
+        logger.info(f"策略实例 {instance.name} 初始化完成")
+
+    def start_monitors(self):
+        """为每个账户在后台线程中运行止盈止损监控器"""
+        from tp_sl_monitor import TpSlMonitor
+
+        for account in self.accounts.values():
+            # 监控器在账户已有的私有连接上订阅持仓，每个账户只保持一条私有连接
+            account.monitor = TpSlMonitor(account.api_keys, account.trader, account.alias, shared_stream=self.stream,
+                                          position_tracker=account.position_tracker, stream=account.stream)
+            threading.Thread(target=account.monitor.run, name=f"tp-sl-{account.name}", daemon=True).start()
+            logger.info(f"账户 {account.name} 的止盈止损监控器已启动")
+
+    def stop(self):
+        """停止调度循环"""
+        self._stopped.set()
+
+    def run(self):
+        """调度循环：等到最近一组的K线收盘，启动该组的运行线程，再计算该组下一次的时间"""
+        if self.config.get('tp_sl_monitor', True):
+            self.start_monitors()
+
+        next_runs = {key: _next_boundary(key[1]) for key in self.groups}
+        logger.info(f"运行器已启动: {len(self.accounts)} 个账户, {len(self.instances)} 个策略实例, "
+                    f"{len(self.groups)} 组交易对/周期, 共用 {len(self.feeds)} 个数据源")
+
+        while not self._stopped.is_set():
+            if not next_runs:
+                self._stopped.wait(60)
+                continue
+            now = time.time()
+            for key, boundary in list(next_runs.items()):
+                if boundary <= now:
+                    threading.Thread(target=self._run_group, args=(key, boundary),
+                                     name=f"group-{key[0]}-{key[1]}", daemon=True).start()
+                    next_runs[key] = _next_boundary(key[1])
+            self._stopped.wait(max(0.0, min(next_runs.values()) - time.time()))
+
+        self.executor.shutdown(wait=True)
+        if self.stream:
+            self.stream.stop()
+
+    def _run_group(self, key, boundary):
+        """
+        等待一组的K线确认后并行运行组内实例
+
+        Args:
+            key: (交易对, 周期)
+            boundary: 刚收盘的K线的结束时间(秒)
+        """
+        symbol, timeframe = key
+        if self.stream:
+            from config.config import websocket_config
+            closing_ts = int(boundary * 1000) - get_seconds_from_timeframe(timeframe) * 1000
+            candle = self.stream.wait_for_confirmed_candle(symbol, timeframe, websocket_config.get('candle_timeout', 60),
+                                                           after=closing_ts - 1)
+            if candle is None:
+                logger.warning(f"{symbol} {timeframe} 未收到K线确认推送，使用REST数据运行策略")
+        else:
+            # 等30秒让交易所的k线数据产生
+            self._stopped.wait(max(0.0, boundary + self.buffer_seconds - time.time()))
+        if self._stopped.is_set():
+            return
+
+        for instance, result in zip(self.groups[key], self.executor.map(self._run_instance, self.groups[key])):
+            if result:
+                logger.info(f"{instance.name} 信号: {result}")
+
+    def _run_instance(self, instance):
+        """
+        运行一个策略实例一次
+
+        Returns:
+            交易信号，出错或无信号时为None
+        """
+        try:
+            signal, _ = instance.strategy.run()
+            return signal
+        except Exception as e:
+            logger.error(f"{instance.name} 策略运行出错: {str(e)}")
+            return None
@@ -16,7 +16,6 @@ okx u本位择时策略实盘框架
 import datetime
 import time
 import re
-import pytz
 
 def get_seconds_from_timeframe(timeframe):
     """
@@ -69,7 +68,7 @@ def utc_to_local(utc_dt):
     """
     local_tz = get_local_timezone()
     if utc_dt.tzinfo is None:
-        utc_dt = utc_dt.replace(tzinfo=pytz.UTC)
+        utc_dt = utc_dt.replace(tzinfo=datetime.timezone.utc)
     return utc_dt.astimezone(local_tz)
 
 def calculate_next_candle_time(timeframe):
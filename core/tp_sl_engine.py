@@ -0,0 +1,273 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+止盈止损触发引擎
+
+持仓登记时按 开仓价 × (1 ± 止盈止损百分比 / 杠杆) 预先算好触发价，
+每个交易对维护两张按触发价排序的表：价格上穿触发（多头止盈、空头止损）和价格下穿触发（多头止损、空头止盈）。
+收到价格时二分定位被穿越的区间，只处理真正触发的持仓，不再逐个计算盈亏。
+"""
+
+import bisect
+import threading
+
+# 触发方向
+UP = 'up'      # 价格 >= 触发价
+DOWN = 'down'  # 价格 <= 触发价
+
+
+def calculate_trigger_prices(side, entry_price, leverage, tp_percentage, sl_percentage):
+    """
+    计算止盈止损触发价
+
+    Args:
+        side: 持仓方向 long/short
+        entry_price: 开仓均价
+        leverage: 杠杆倍数
+        tp_percentage: 止盈百分比（按保证金计算），0表示不设止盈
+        sl_percentage: 止损百分比（按保证金计算），0表示不设止损
+
+    Returns:
+        tuple: (止盈触发价, 止损触发价)，未设置的为None
+    """
+    tp_price = sl_price = None
+    if side == 'long':
+        if tp_percentage > 0:
+            tp_price = entry_price * (1 + tp_percentage / 100 / leverage)
+        if sl_percentage > 0:
+            sl_price = entry_price * (1 - sl_percentage / 100 / leverage)
+    else:
+        if tp_percentage > 0:
+            tp_price = entry_price * (1 - tp_percentage / 100 / leverage)
+        if sl_percentage > 0:
+            sl_price = entry_price * (1 + sl_percentage / 100 / leverage)
+    return tp_price, sl_price
+
+
+def calculate_profit_percentage(side, entry_price, price, leverage):
+    """
+    计算按保证金计的盈亏百分比
+
+    Args:
+        side: 持仓方向 long/short
+        entry_price: 开仓均价
+        price: 当前价格
+        leverage: 杠杆倍数
+
+    Returns:
+        float: 盈亏百分比
+    """
+    if entry_price <= 0 or price <= 0:
+        return 0
+    if side == 'long':
+        return (price - entry_price) / entry_price * 100 * leverage
+    return (entry_price - price) / entry_price * 100 * leverage
+
+
+class _TriggerList:
+    """按触发价排序的触发列表，价格和持仓键分两个列表保存以便直接二分"""
+
+    def __init__(self):
+        self.prices = []
+        self.keys = []
+
+    def add(self, price, key):
+        index = bisect.bisect_right(self.prices, price)
+        self.prices.insert(index, price)
+        self.keys.insert(index, key)
+
+    def remove(self, price, key):
+        index = bisect.bisect_left(self.prices, price)
+        while index < len(self.prices) and self.prices[index] == price:
+            if self.keys[index] == key:
+                del self.prices[index]
+                del self.keys[index]
+                return
+            index += 1
+
+    def crossed(self, price, direction):
+        """返回被价格穿越的持仓键"""
+        if direction == UP:
+            return self.keys[:bisect.bisect_right(self.prices, price)]
+        return self.keys[bisect.bisect_left(self.prices, price):]
+
+
+class TpSlEngine:
+    """
+    止盈止损触发引擎
+
+    持仓以 (交易对, 方向) 为键保存在内存中，触发后自动撤防，
+    由调用方在平仓失败且冷却结束后重新upsert。所有方法线程安全。
+    """
+
+    def __init__(self):
+        self._positions = {}  # (symbol, side) -> 登记信息
+        self._books = {}      # symbol -> {UP: _TriggerList, DOWN: _TriggerList}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._positions)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._positions
+
+    def symbols(self):
+        """已登记持仓的交易对"""
+        with self._lock:
+            return list(self._books)
+
+    def get(self, symbol, side):
+        """
+        获取已登记持仓
+
+        Returns:
+            dict: 包含position、config、tp_price、sl_price，未登记时返回None
+        """
+        with self._lock:
+            return self._positions.get((symbol, side))
+
+    def upsert(self, position, config):
+        """
+        登记或更新持仓，开仓价、杠杆和止盈止损设置都没变时不做任何操作
+
+        Args:
+            position: ccxt格式持仓（symbol、side、contracts、entryPrice、leverage）
+            config: 交易对的止盈止损配置（enable_take_profit、take_profit_percentage、enable_stop_loss、stop_loss_percentage）
+
+        Returns:
+            bool: 是否至少设置了一个触发价
+        """
+        symbol = position['symbol']
+        side = position['side']
+        entry_price = float(position.get('entryPrice') or 0)
+        leverage = float(position.get('leverage') or 1)
+        tp_percentage = config.get('take_profit_percentage', 0) if config.get('enable_take_profit', False) else 0
+        sl_percentage = config.get('stop_loss_percentage', 0) if config.get('enable_stop_loss', False) else 0
+
+        key = (symbol, side)
+        with self._lock:
+            current = self._positions.get(key)
+            if current and current['entry_price'] == entry_price and current['leverage'] == leverage \
+                    and current['tp_percentage'] == tp_percentage and current['sl_percentage'] == sl_percentage:
+                current['position'] = position
+                current['config'] = config
+                return current['tp_price'] is not None or current['sl_price'] is not None
+
+            self._remove(key)
+            if entry_price <= 0 or float(position.get('contracts') or 0) <= 0:
+                return False
+
+            tp_price, sl_price = calculate_trigger_prices(side, entry_price, leverage, tp_percentage, sl_percentage)
+            if tp_price is None and sl_price is None:
+                return False
+
+            entry = {
+                'position': position,
+                'config': config,
+                'entry_price': entry_price,
+                'leverage': leverage,
+                'tp_percentage': tp_percentage,
+                'sl_percentage': sl_percentage,
+                'tp_price': tp_price,
+                'sl_price': sl_price,
+            }
+            self._positions[key] = entry
+            book = self._books.setdefault(symbol, {UP: _TriggerList(), DOWN: _TriggerList()})
+            for price, direction in self._triggers(entry, side):
+                book[direction].add(price, key)
+            return True
+
+    def remove(self, symbol, side):
+        """
+        撤销持仓的触发
+
+        Args:
+            symbol: 交易对
+            side: 持仓方向
+        """
+        with self._lock:
+            self._remove((symbol, side))
+
+    def retain(self, keys):
+        """
+        只保留指定的持仓，用于与全量持仓快照对账
+
+        Args:
+            keys: 仍然存在的 (交易对, 方向) 集合
+        """
+        with self._lock:
+            for key in [key for key in self._positions if key not in keys]:
+                self._remove(key)
+
+    def on_tick(self, symbol, price):
+        """
+        处理一次价格更新
+
+        Args:
+            symbol: 交易对
+            price: 最新价格（标记价格）
+
+        Returns:
+            list: 被触发的持仓，每项包含symbol、side、trigger_type(止盈/止损)、trigger_price、price、
+                  profit_percentage、position、config；触发的持仓已撤防
+        """
+        with self._lock:
+            book = self._books.get(symbol)
+            if not book:
+                return []
+            keys = book[UP].crossed(price, UP) + book[DOWN].crossed(price, DOWN)
+            if not keys:
+                return []
+
+            fired = []
+            for key in keys:
+                entry = self._positions.get(key)
+                if entry is None:
+                    continue
+                side = key[1]
+                is_take_profit = (price >= entry['entry_price']) == (side == 'long')
+                fired.append({
+                    'symbol': symbol,
+                    'side': side,
+                    'trigger_type': "止盈" if is_take_profit else "止损",
+                    'trigger_price': entry['tp_price'] if is_take_profit else entry['sl_price'],
+                    'price': price,
+                    'profit_percentage': calculate_profit_percentage(side, entry['entry_price'], price, entry['leverage']),
+                    'position': entry['position'],
+                    'config': entry['config'],
+                })
+                self._remove(key)
+            return fired
+
+    @staticmethod
+    def _triggers(entry, side):
+        """持仓的 (触发价, 方向) 列表"""
+        triggers = []
+        if entry['tp_price'] is not None:
+            triggers.append((entry['tp_price'], UP if side == 'long' else DOWN))
+        if entry['sl_price'] is not None:
+            triggers.append((entry['sl_price'], DOWN if side == 'long' else UP))
+        return triggers
+
+    def _remove(self, key):
+        entry = self._positions.pop(key, None)
+        if entry is None:
+            return
+        book = self._books[key[0]]
+        for price, direction in self._triggers(entry, key[1]):
+            book[direction].remove(price, key)
+        if not book[UP].prices and not book[DOWN].prices:
+            del self._books[key[0]]
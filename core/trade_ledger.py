@@ -0,0 +1,234 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+交易账本
+
+已平仓交易追加写入SQLite（WAL模式），按交易对和平仓时间建索引。每次平仓只插入一行，
+启动时只读取最近的若干条，统计查询由SQLite完成，耗时不随历史记录的增长而增长。
+第一次使用时自动导入旧的data/trade_history.json
+"""
+
+import os
+import json
+import sqlite3
+import datetime
+import threading
+from core.logger_manager import logger_manager
+
+LEGACY_HISTORY_PATH = 'data/trade_history.json'
+
+_INSERT_SQL = ("INSERT INTO trades (symbol, side, entry_time, exit_time, entry_price, exit_price, size, leverage, "
+               "profit_percentage, duration_hours, record) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+# 记录中的时间字段，写入时转为ISO字符串，读取时还原为datetime
+_TIME_FIELDS = ('entry_time', 'exit_time', 'last_update_time')
+
+
+def _encode(record):
+    """把交易记录转为可JSON序列化的dict"""
+    encoded = dict(record)
+    for field in _TIME_FIELDS:
+        if isinstance(encoded.get(field), datetime.datetime):
+            encoded[field] = encoded[field].isoformat()
+    return encoded
+
+
+def _decode(encoded):
+    """把JSON中的交易记录还原，时间字段转为datetime"""
+    record = dict(encoded)
+    for field in _TIME_FIELDS:
+        if isinstance(record.get(field), str):
+            try:
+                record[field] = datetime.datetime.fromisoformat(record[field])
+            except ValueError:
+                pass
+    return record
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+
+class TradeLedger:
+    """已平仓交易的追加式账本"""
+
+    def __init__(self, path='data/trade_ledger.db'):
+        """
+        初始化交易账本，数据库不存在时创建
+
+        Args:
+            path: SQLite文件路径
+        """
+        self.path = path
+        self.logger = logger_manager.get_position_logger()
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS trades (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                symbol TEXT NOT NULL,
+                side TEXT,
+                entry_time TEXT,
+                exit_time TEXT,
+                entry_price REAL,
+                exit_price REAL,
+                size REAL,
+                leverage REAL,
+                profit_percentage REAL,
+                duration_hours REAL,
+                record TEXT NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_symbol_exit ON trades (symbol, exit_time)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_exit ON trades (exit_time)")
+        self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """
+        账本为空且存在旧的JSON历史文件时在一个事务中导入，提交后才把旧文件改名
+
+        主策略和止盈止损监控器可能同时启动，事务用BEGIN IMMEDIATE取得写锁后再确认账本仍为空，
+        只有一个进程会导入；改名时旧文件已不存在说明另一个进程已完成导入
+        """
+        if not os.path.exists(LEGACY_HISTORY_PATH) or self.count() > 0:
+            return
+        try:
+            with open(LEGACY_HISTORY_PATH, 'r') as f:
+                history = json.load(f)
+            rows = [self._row(_decode(record)) for record in history]
+            with self._lock:
+                # 导入中途出错时整体回滚，下次启动重新导入，不会留下导入了一半的账本
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if self._conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0] > 0:
+                        self._conn.execute("ROLLBACK")
+                        return
+                    self._conn.executemany(_INSERT_SQL, rows)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+            try:
+                os.replace(LEGACY_HISTORY_PATH, LEGACY_HISTORY_PATH + '.migrated')
+            except FileNotFoundError:
+                pass
+            self.logger.info(f"已从{LEGACY_HISTORY_PATH}导入{len(history)}条交易历史")
+        except Exception as e:
+            self.logger.error(f"导入旧交易历史时发生错误: {str(e)}")
+
+    @staticmethod
+    def _row(record):
+        """交易记录对应的trades表一行"""
+        encoded = _encode(record)
+        return (record.get('symbol'), record.get('side'), encoded.get('entry_time'), encoded.get('exit_time'),
+                record.get('entryPrice'), record.get('exit_price'), record.get('size'), record.get('leverage'),
+                record.get('profit_percentage'), record.get('duration_hours'),
+                json.dumps(encoded, ensure_ascii=False, default=str))
+
+    def append(self, record):
+        """
+        追加一条已平仓交易
+
+        Args:
+            record: PositionTracker的平仓记录
+        """
+        row = self._row(record)
+        with self._lock:
+            self._conn.execute(_INSERT_SQL, row)
+
+    def _where(self, symbol, since, until):
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if since is not None:
+            clauses.append("exit_time >= ?")
+            params.append(_iso(since))
+        if until is not None:
+            clauses.append("exit_time < ?")
+            params.append(_iso(until))
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def count(self, symbol=None, since=None, until=None):
+        """符合条件的交易笔数"""
+        where, params = self._where(symbol, since, until)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM trades{where}", params).fetchone()[0]
+
+    def query(self, symbol=None, since=None, until=None, limit=None):
+        """
+        查询交易记录
+
+        Args:
+            symbol: 交易对，None表示全部
+            since: 平仓时间下限（含）
+            until: 平仓时间上限（不含）
+            limit: 最多返回的条数，取最近的
+
+        Returns:
+            list: 交易记录，按平仓顺序从早到晚
+        """
+        where, params = self._where(symbol, since, until)
+        sql = f"SELECT record FROM trades{where} ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_decode(json.loads(row[0])) for row in reversed(rows)]
+
+    def recent(self, limit):
+        """最近的limit条交易记录"""
+        return self.query(limit=limit)
+
+    def stats(self, symbol=None, since=None, until=None):
+        """
+        交易统计
+
+        Args:
+            symbol: 交易对，None表示全部
+            since: 平仓时间下限（含）
+            until: 平仓时间上限（不含）
+
+        Returns:
+            dict: 交易笔数、盈利笔数、亏损笔数、胜率(%)、总盈亏百分比、平均盈亏百分比、最大盈利、最大亏损、平均持仓小时数
+        """
+        where, params = self._where(symbol, since, until)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), SUM(profit_percentage > 0), SUM(profit_percentage <= 0), SUM(profit_percentage), "
+                f"AVG(profit_percentage), MAX(profit_percentage), MIN(profit_percentage), AVG(duration_hours) FROM trades{where}",
+                params).fetchone()
+        total, wins, losses, total_profit, avg_profit, best, worst, avg_hours = row
+        wins, losses = wins or 0, losses or 0
+        return {
+            'trades': total,
+            'wins': wins,
+            'losses': losses,
+            'win_rate': wins / (wins + losses) * 100 if wins + losses else 0.0,
+            'total_profit_percentage': total_profit or 0.0,
+            'avg_profit_percentage': avg_profit or 0.0,
+            'best_profit_percentage': best,
+            'worst_profit_percentage': worst,
+            'avg_duration_hours': avg_hours,
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
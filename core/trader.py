@@ -17,13 +17,50 @@ import ccxt
 from pprint import pprint
 import pandas as pd
 from core.logger_manager import logger_manager
-import time
 from datetime import datetime
 from core.retry_utils import retry
+from core.ttl_cache import TTLCache, cached, ACCOUNT_CACHE_NAMES
+from core.rate_limiter import install_rate_limiter
+
+
+def create_exchange(api_key, secret_key, passphrase, backend=None):
+    """
+    按exchange_config创建交易所后端
+    
+    Args:
+        api_key: OKX API密钥
+        secret_key: OKX API密钥
+        passphrase: OKX API密码
+        backend: 后端类型，okx(实盘)或simulator(本地模拟器)，默认取exchange_config['backend']
+        
+    Returns:
+        ccxt.okx实例或OkxSimulator实例
+    """
+    from config.config import exchange_config
+    backend = backend or exchange_config.get('backend', 'okx')
+    
+    if backend == 'simulator':
+        from core.okx_simulator import OkxSimulator
+        return OkxSimulator(**exchange_config.get('simulator', {}))
+    
+    if backend != 'okx':
+        raise ValueError(f"未知的交易所后端: {backend}")
+    
+    exchange = ccxt.okx({
+        'apiKey': api_key,
+        'secret': secret_key,
+        'password': passphrase,
+        'enableRateLimit': True,
+        'options': {
+            'defaultType': 'swap',  # 默认使用永续合约
+        }
+    })
+    # 按接口分组跨进程限流，启用后代替ccxt自带的单实例限流
+    return install_rate_limiter(exchange, api_key)
 
 
 class OkxTrader:
-    def __init__(self, api_key, secret_key, passphrase):
+    def __init__(self, api_key, secret_key, passphrase, exchange=None):
         """
         初始化OKX交易类
         
@@ -31,24 +68,22 @@ class OkxTrader:
             api_key: OKX API密钥
             secret_key: OKX API密钥
             passphrase: OKX API密码
+            exchange: 交易所后端，默认按exchange_config创建（实盘ccxt.okx或本地模拟器）
         """
-        self.exchange = ccxt.okx({
-            'apiKey': api_key,
-            'secret': secret_key,
-            'password': passphrase,
-            'enableRateLimit': True,
-            'options': {
-                'defaultType': 'swap',  # 默认使用永续合约
-            }
-        })
+        self.exchange = exchange if exchange is not None else create_exchange(api_key, secret_key, passphrase)
         
         # 获取系统日志记录器
         self.logger = logger_manager.get_system_logger()
         # 获取交易日志记录器
         self.trade_logger = logger_manager.get_trade_logger()
         
+        # 只读接口缓存，进程内所有OkxTrader共用，按账户区分
+        self.cache = TTLCache.get_instance()
+        self.cache_namespace = api_key or id(self.exchange)
+        
         # 记录初始化日志
-        self.logger.info("OkxTrader初始化完成，运行环境: 实盘环境")
+        env = "实盘环境" if isinstance(self.exchange, ccxt.okx) else f"模拟环境({self.exchange.__class__.__name__})"
+        self.logger.info(f"OkxTrader初始化完成，运行环境: {env}")
     
     @retry(max_retries=3, base_delay=3.0)
     def close_position(self, symbol):
@@ -80,6 +115,7 @@ class OkxTrader:
                         order.get('id', 'unknown'),
                         {"side": side, "position_value": float(position['notional'])}
                     )
+                    self.invalidate_account()
                     self.logger.info(f"平仓成功: {order}")
                     return order
                 except Exception as e:
@@ -135,6 +171,7 @@ class OkxTrader:
                 {"pos_side": pos_side, "order_type": type}
             )
             
+            self.invalidate_account()
             self.logger.info(f"{side}订单已提交: id:{order.get('id', 'unknown')}")
             return order
         except Exception as e:
@@ -181,6 +218,7 @@ class OkxTrader:
                     {"pos_side": "long", "entryPrice": position.get('entryPrice', 0)}
                 )
                 
+                self.invalidate_account()
                 self.logger.info(f"平多仓订单已提交: {close_long.get('id', 'unknown')}")
                 return close_long
             except Exception as e:
@@ -229,6 +267,7 @@ class OkxTrader:
                     {"pos_side": "short", "entryPrice": position.get('entryPrice', 0)}
                 )
                 
+                self.invalidate_account()
                 self.logger.info(f"平空仓订单已提交: {close_short.get('id', 'unknown')}")
                 return close_short
             except Exception as e:
@@ -248,6 +287,60 @@ class OkxTrader:
             self.logger.warning(f'当前{symbol}没有仓位，无法执行平仓')
             return None
 
+    def reverse_position(self, symbol, pos_side, close_amount, open_amount, price=0):
+        """
+        反手：在一个批量下单请求中市价平掉pos_side方向的持仓并开反方向仓位
+        
+        OKX批量下单不是原子操作，每笔订单单独返回结果，失败的一笔返回None，由调用方补单；
+        整个请求失败时抛出异常，此时两笔订单是否成交未知，调用方需要重新查询持仓。不自动重试，避免重复下单
+        
+        Args:
+            symbol: 交易对
+            pos_side: 当前持仓方向，'long'或'short'
+            close_amount: 平仓数量
+            open_amount: 反向开仓数量
+            price: 当前价格，仅用于交易日志
+        
+        Returns:
+            tuple: (平仓订单, 开仓订单)，订单只包含id和info
+        """
+        side = 'buy' if pos_side == 'short' else 'sell'
+        new_pos_side = 'long' if pos_side == 'short' else 'short'
+        params = [
+            {'instId': symbol, 'tdMode': 'cross', 'side': side, 'posSide': pos_side, 'ordType': 'market',
+             'sz': f"{float(close_amount):.8f}".rstrip('0').rstrip('.'), 'reduceOnly': True},
+            {'instId': symbol, 'tdMode': 'cross', 'side': side, 'posSide': new_pos_side, 'ordType': 'market',
+             'sz': f"{float(open_amount):.8f}".rstrip('0').rstrip('.')},
+        ]
+        self.logger.info(f"开始反手 {symbol} - 平{pos_side} {close_amount} 并开{new_pos_side} {open_amount}")
+        try:
+            response = self.exchange.private_post_trade_batch_orders(params)
+        except Exception as e:
+            self.logger.error(f"反手批量下单失败 - {symbol}: {str(e)}")
+            raise
+
+        self.invalidate_account()
+        orders = []
+        results = response.get('data', [])
+        for i, (action, amount) in enumerate((("close", close_amount), ("open", open_amount))):
+            result = results[i] if i < len(results) else {}
+            if result.get('sCode') != '0':
+                self.logger.error(f"反手{action}订单失败 - {symbol}: {result.get('sCode')} {result.get('sMsg')}")
+                orders.append(None)
+                continue
+            logger_manager.log_trade(
+                action,
+                symbol,
+                side,
+                amount,
+                price,
+                result.get('ordId', 'unknown'),
+                {"pos_side": pos_side if action == "close" else new_pos_side, "batch": "reverse"}
+            )
+            orders.append({'id': result.get('ordId'), 'info': result})
+        self.logger.info(f"反手订单已提交: {[order['id'] if order else None for order in orders]}")
+        return orders[0], orders[1]
+
 
     @retry(max_retries=3, base_delay=3.0)
     def fetch_position(self, symbol):
@@ -343,14 +436,35 @@ class OkxTrader:
             self.logger.error(f"获取所有持仓信息时发生错误: {str(e)}")
             return []
 
+    def fetch_order(self, symbol, order_id):
+        """
+        查询订单状态，不重试，由调用方（OrderTracker）决定轮询节奏
+        
+        Args:
+            symbol: 交易对
+            order_id: 订单ID
+            
+        Returns:
+            dict: ccxt格式订单，status为open、closed或canceled
+        """
+        return self.exchange.fetch_order(order_id, symbol)
+
     @retry(max_retries=3, base_delay=3.0)
     def set_leverage(self, symbol, leverage=1):
         """设置杠杆倍数"""
         self.logger.info(f"设置杠杆倍数 - {symbol} - {leverage}倍")
+        # 缓存有效期内已设置为相同杠杆时不再请求交易所
+        leverage_key = (self.cache_namespace, 'leverage', symbol)
+        if self.cache is not None and self.cache.get(leverage_key) == leverage:
+            self.logger.info(f"{symbol} 杠杆已设置为 {leverage}倍，跳过设置")
+            return True
         try:
             # 设置杠杆
             self.exchange.set_leverage(leverage, symbol, params={'mgnMode': 'cross'})  # 全仓模式
             self.logger.info(f"已发送杠杆设置请求: {leverage}倍")
+            # 账户持仓中的杠杆已变化，验证前清除缓存
+            if self.cache is not None:
+                self.cache.invalidate(self.cache_namespace, ('fetch_account_position',))
             
             # 验证杠杆是否设置成功
             try:
@@ -387,11 +501,15 @@ class OkxTrader:
                 0,
                 additional_info={"leverage": leverage}
             )
+            if self.cache is not None:
+                from config.config import cache_config
+                self.cache.set(leverage_key, leverage, cache_config.get('ttl', {}).get('leverage', 0))
             return True
         except Exception as e:
             self.logger.error(f"设置杠杆失败: {str(e)}")
             return False
 
+    @cached('account')
     @retry(max_retries=3, base_delay=3.0)
     def get_account(self):
         """获取账户余额"""
@@ -432,6 +550,7 @@ class OkxTrader:
             self.logger.error(f"获取账户余额失败: {str(e)}")
             raise
 
+    @cached('account_position')
     @retry(max_retries=3, base_delay=3.0)
     def fetch_account_position(self, symbol):
         """获取账户持仓详情"""
@@ -448,6 +567,11 @@ class OkxTrader:
         except Exception as e:
             self.logger.error(f"获取账户持仓详情失败: {str(e)}")
             raise
+
+    def invalidate_account(self):
+        """清除本账户的余额和持仓缓存，下单或订单成交后调用"""
+        if self.cache is not None:
+            self.cache.invalidate(self.cache_namespace, ACCOUNT_CACHE_NAMES)
     
     @retry(max_retries=3, base_delay=3.0)
     def fetch_ticker(self, symbol):
@@ -567,9 +691,6 @@ class OkxTrader:
                 
                 self.logger.info(f"获取更早的数据，起始时间: {datetime.fromtimestamp(since/1000).strftime('%Y-%m-%d %H:%M:%S')}")
                 
-                # 延迟以避免API限流
-                time.sleep(2)
-                
                 # 获取历史数据
                 latest_candles = self.exchange.fetch_ohlcv(
                     symbol,
@@ -695,6 +816,7 @@ class OkxTrader:
             self.logger.error(f"获取订单簿失败 - {symbol}: {str(e)}")
             raise
 
+    @cached('instrument')
     @retry(max_retries=3, base_delay=3.0)
     def fetch_instrument(self, symbol):
         """
@@ -727,6 +849,25 @@ class OkxTrader:
             self.logger.error(f"获取合约规格时发生错误: {str(e)}")
             return None
 
+    @retry(max_retries=3, base_delay=3.0)
+    def fetch_all_instruments(self, instType='SWAP'):
+        """
+        一次获取某类产品的所有合约规格（公共接口，不需要API密钥）
+        
+        Args:
+            instType: 产品类型
+            
+        Returns:
+            list: OKX原始格式的合约规格列表
+        """
+        self.logger.info(f"获取所有合约规格 - {instType}")
+        try:
+            response = self.exchange.publicGetPublicInstruments({'instType': instType})
+            return response.get('data', [])
+        except Exception as e:
+            self.logger.error(f"获取所有合约规格失败: {str(e)}")
+            raise
+
     @retry(max_retries=3, base_delay=3.0)
     def check_position_is_dual_side(self):
         '''
@@ -750,6 +891,7 @@ class OkxTrader:
             self.logger.error(f"获取所有行情数据失败: {str(e)}")
             raise
 
+    @cached('instruments')
     @retry(max_retries=3, base_delay=3.0)
     def get_instruments(self, instType='SWAP'):
         """
@@ -763,3 +905,125 @@ class OkxTrader:
         }
         instruments = self.exchange.private_get_account_instruments(params)
         return instruments['data']
+
+
+    @retry(max_retries=3, base_delay=3.0)
+    def place_tp_sl_algo(self, symbol, pos_side, tp_trigger_price=None, sl_trigger_price=None, algo_cl_ord_id=None):
+        """
+        下交易所端止盈止损条件单，触发后按市价全部平掉该方向持仓
+        
+        同时设置止盈和止损时使用oco订单，只设置其中一个时使用conditional订单，
+        触发价类型为标记价格，与止盈止损监控器的判断口径一致
+        
+        Args:
+            symbol: 交易对
+            pos_side: 持仓方向，'long'或'short'
+            tp_trigger_price: 止盈触发价，None表示不设止盈
+            sl_trigger_price: 止损触发价，None表示不设止损
+            algo_cl_ord_id: 客户自定义策略订单ID
+            
+        Returns:
+            dict: 订单结果，包含algoId
+        """
+        params = {
+            'instId': symbol,
+            'tdMode': 'cross',
+            'side': 'sell' if pos_side == 'long' else 'buy',
+            'posSide': pos_side,
+            'ordType': 'oco' if tp_trigger_price and sl_trigger_price else 'conditional',
+            'closeFraction': '1',
+            'reduceOnly': True,
+        }
+        if tp_trigger_price:
+            params.update({'tpTriggerPx': str(tp_trigger_price), 'tpOrdPx': '-1', 'tpTriggerPxType': 'mark'})
+        if sl_trigger_price:
+            params.update({'slTriggerPx': str(sl_trigger_price), 'slOrdPx': '-1', 'slTriggerPxType': 'mark'})
+        if algo_cl_ord_id:
+            params['algoClOrdId'] = algo_cl_ord_id
+        
+        self.logger.info(f"下止盈止损条件单 - {symbol} {pos_side} - 止盈触发价: {tp_trigger_price}, 止损触发价: {sl_trigger_price}")
+        try:
+            response = self.exchange.private_post_trade_order_algo(params)
+            result = response['data'][0]
+            if result.get('sCode') not in (None, '0'):
+                raise Exception(f"{result.get('sCode')}: {result.get('sMsg')}")
+            logger_manager.log_trade(
+                "tp_sl_algo",
+                symbol,
+                params['ordType'],
+                0,
+                0,
+                result.get('algoId', 'unknown'),
+                {"posSide": pos_side, "tpTriggerPx": tp_trigger_price, "slTriggerPx": sl_trigger_price}
+            )
+            return result
+        except Exception as e:
+            self.logger.error(f"下止盈止损条件单失败 - {symbol}: {str(e)}")
+            raise
+
+    @retry(max_retries=3, base_delay=3.0)
+    def fetch_pending_algo_orders(self, symbol=None):
+        """
+        获取未触发的止盈止损条件单（conditional和oco）
+        
+        Args:
+            symbol: 交易对，None表示所有永续合约
+            
+        Returns:
+            list: OKX原始格式的条件单列表
+        """
+        params = {'ordType': 'conditional,oco', 'instType': 'SWAP'}
+        if symbol:
+            params['instId'] = symbol
+        try:
+            response = self.exchange.private_get_trade_orders_algo_pending(params)
+            return response.get('data', [])
+        except Exception as e:
+            self.logger.error(f"获取止盈止损条件单失败: {str(e)}")
+            raise
+
+    @retry(max_retries=3, base_delay=3.0)
+    def fetch_algo_order_history(self, algo_id=None, state='effective'):
+        """
+        获取已结束的止盈止损条件单（conditional和oco）
+        
+        Args:
+            algo_id: 条件单ID，None表示按state查询最近的条件单
+            state: 条件单状态，effective为已触发，canceled为已撤销；指定algo_id时忽略
+            
+        Returns:
+            list: OKX原始格式的条件单列表，触发的条件单带actualSide（tp/sl）和actualPx
+        """
+        params = {'ordType': 'conditional,oco', 'instType': 'SWAP'}
+        if algo_id:
+            params['algoId'] = algo_id
+        else:
+            params['state'] = state
+        try:
+            response = self.exchange.private_get_trade_orders_algo_history(params)
+            return response.get('data', [])
+        except Exception as e:
+            self.logger.error(f"获取止盈止损条件单历史失败: {str(e)}")
+            raise
+
+    @retry(max_retries=3, base_delay=3.0)
+    def cancel_algo_orders(self, orders):
+        """
+        撤销条件单
+        
+        Args:
+            orders: 条件单列表，每项至少包含instId和algoId
+            
+        Returns:
+            list: 撤单结果
+        """
+        if not orders:
+            return []
+        params = [{'instId': order['instId'], 'algoId': order['algoId']} for order in orders]
+        self.logger.info(f"撤销条件单: {params}")
+        try:
+            response = self.exchange.private_post_trade_cancel_algos(params)
+            return response.get('data', [])
+        except Exception as e:
+            self.logger.error(f"撤销条件单失败: {str(e)}")
+            raise
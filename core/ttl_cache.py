@@ -0,0 +1,156 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+交易所只读接口缓存
+
+进程内共用一个线程安全的TTL+LRU缓存，OkxTrader的账户余额、账户持仓、合约规格、合约列表等只读接口
+通过@cached装饰器在有效期内直接返回上次的结果；下单后由交易类调用invalidate_account清除该账户的余额和持仓缓存。
+缓存的返回值是共用对象，调用方不要修改
+"""
+
+import time
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+# 成交后会变化、需要清除的账户类接口
+ACCOUNT_CACHE_NAMES = ('get_account', 'fetch_account_position')
+
+
+class TTLCache:
+    """线程安全的TTL+LRU缓存，键为元组，第一项为命名空间（账户）"""
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls):
+        """
+        获取单例实例
+
+        Returns:
+            TTLCache: 缓存实例，配置中未启用时返回None
+        """
+        with cls._instance_lock:
+            if cls._instance is None:
+                from config.config import cache_config
+                if not cache_config.get('enabled', True):
+                    return None
+                cls._instance = cls(cache_config.get('maxsize', 1024))
+            return cls._instance
+
+    def __init__(self, maxsize=1024):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最多保留的条目数，超出时淘汰最久未使用的条目
+        """
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # 键 -> (过期时间, 值)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """获取未过期的缓存值"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl):
+        """
+        写入缓存
+
+        Args:
+            key: 键
+            value: 值
+            ttl: 有效期(秒)
+        """
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, namespace, names=None):
+        """
+        清除一个命名空间下的缓存
+
+        Args:
+            namespace: 命名空间
+            names: 只清除这些接口名的缓存，None表示全部
+        """
+        with self._lock:
+            for key in [k for k in self._data if k[0] == namespace and (names is None or k[1] in names)]:
+                del self._data[key]
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+
+def cached(ttl_name):
+    """
+    缓存交易类只读接口的装饰器，同时支持普通方法和协程方法
+
+    有效期取cache_config['ttl'][ttl_name]，为0或缓存未启用时不缓存；返回None的结果（请求失败）不缓存。
+    被装饰的方法所属对象需要有cache（TTLCache或None）和cache_namespace属性
+
+    Args:
+        ttl_name: cache_config['ttl']中的名称
+    """
+    def decorator(func):
+        def lookup(self, args, kwargs):
+            from config.config import cache_config
+            ttl = cache_config.get('ttl', {}).get(ttl_name, 0)
+            if self.cache is None or not ttl:
+                return None, 0, _MISSING
+            key = (self.cache_namespace, func.__name__, args, tuple(sorted(kwargs.items())))
+            return key, ttl, self.cache.get(key, _MISSING)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                key, ttl, value = lookup(self, args, kwargs)
+                if value is not _MISSING:
+                    return value
+                value = await func(self, *args, **kwargs)
+                if key is not None and value is not None:
+                    self.cache.set(key, value, ttl)
+                return value
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            key, ttl, value = lookup(self, args, kwargs)
+            if value is not _MISSING:
+                return value
+            value = func(self, *args, **kwargs)
+            if key is not None and value is not None:
+                self.cache.set(key, value, ttl)
+            return value
+        return wrapper
+    return decorator
@@ -2,6 +2,9 @@
 from indicators.base_indicator import BaseIndicator
 from indicators.moving_average import SimpleMovingAverage, ExponentialMovingAverage, WeightedMovingAverage, HullMovingAverage, MAFactory
 from indicators.oscillators import RSI, MACD, Stochastic, BollingerBands, ATR
+from indicators.trend import ADX, ParabolicSAR
+from indicators.sar_kernel import parabolic_sar, classic_parabolic_sar, IncrementalSar
+from indicators.graph import IndicatorGraph
 
 # 创建工厂函数，根据名称创建指标
 def create_indicator(name, **kwargs):
@@ -104,16 +107,9 @@ def calculate_indicators(df, indicators_config):
     Returns:
         pd.DataFrame: 添加了所有指标列的DataFrame
     """
-    result_df = df.copy()
-    
-    for config in indicators_config:
-        name = config['name']
-        params = config.get('params', {})
-        
-        indicator = create_indicator(name, **params)
-        result_df = indicator.calculate(result_df)
-    
-    return result_df
+    # 通过计算图计算，相同的中间结果（如MACD和EMA指标共用的EMA）只算一次
+    # 需要反复计算同一组指标时，直接持有IndicatorGraph可以省去每次建图
+    return IndicatorGraph(indicators_config).evaluate(df)
 
 # 导出所有可用的指标名称
 AVAILABLE_INDICATORS = [
@@ -15,7 +15,9 @@ okx u本位择时策略实盘框架
 
 import pandas as pd
 import numpy as np
+import math
 from abc import ABC, abstractmethod
+from collections import deque
 from typing import Union, Dict, List, Optional, Any
 
 class BaseIndicator(ABC):
@@ -93,4 +95,150 @@ class BaseIndicator(ABC):
         Returns:
             str: 指标描述
         """
-        return "基础技术指标" 
\ No newline at end of file
+        return "基础技术指标"
+    
+    def get_input_columns(self) -> List[str]:
+        """
+        获取流式计算需要的输入列
+        
+        Returns:
+            List[str]: 输入列名列表
+        """
+        return ['open', 'high', 'low', 'close', 'volume']
+    
+    def reset_state(self):
+        """清空流式计算状态，子类实现流式计算时应覆盖此方法"""
+        pass
+    
+    def warmup(self, arrays) -> Dict[str, float]:
+        """
+        用历史数据初始化流式计算状态
+        
+        默认逐根调用update()，只在启动时执行一次；之后每根新K线调用update()即可，
+        计算量与历史长度无关
+        
+        Args:
+            arrays: 列名到数据序列的映射，如{'high': [...], 'low': [...], 'close': [...]}，也可以直接传入DataFrame
+        
+        Returns:
+            Dict[str, float]: 最后一根K线的指标值，键为输出列名
+        """
+        self.reset_state()
+        columns = {name: np.asarray(arrays[name], dtype=np.float64).tolist()
+                   for name in self.get_input_columns() if name in arrays}
+        length = min((len(values) for values in columns.values()), default=0)
+        
+        result = {name: np.nan for name in self.get_output_column_names()}
+        for i in range(length):
+            result = self.update({name: values[i] for name, values in columns.items()})
+        return result
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新的已完成K线，返回该K线的指标值
+        
+        结果与对完整数据调用calculate()得到的最后一行一致，数据不足时为NaN
+        
+        Args:
+            bar: 单根K线，列名到数值的映射，如{'high': 1.0, 'low': 0.9, 'close': 0.95}
+        
+        Returns:
+            Dict[str, float]: 指标值，键为输出列名
+        """
+        raise NotImplementedError(f"{self.name} 不支持流式计算")
+
+
+class RollingWindow:
+    """
+    固定长度的滑动窗口，流式计算rolling类指标时使用
+    
+    窗口未填满或窗口内有NaN时sum()/mean()返回NaN，与pandas rolling(window).sum()/mean()一致；
+    窗口内数值之和随append增量维护（与pandas相同的补偿求和），每次更新和查询都是O(1)
+    """
+    
+    def __init__(self, size: int):
+        """
+        初始化滑动窗口
+        
+        Args:
+            size: 窗口长度
+        """
+        self.size = size
+        self.values = deque(maxlen=size)
+        self._sum = 0.0           # 窗口内非NaN数值之和
+        self._compensation = 0.0  # 补偿求和的误差项
+        self._nan_count = 0       # 窗口内NaN的个数
+    
+    def _add(self, value: float):
+        if math.isnan(value):
+            self._nan_count += 1
+            return
+        y = value - self._compensation
+        t = self._sum + y
+        self._compensation = t - self._sum - y
+        self._sum = t
+    
+    def append(self, value: float):
+        """追加一个新值，窗口已满时最旧的值被移出"""
+        value = float(value)
+        if self.full:
+            oldest = self.values[0]
+            if math.isnan(oldest):
+                self._nan_count -= 1
+            else:
+                self._add(-oldest)
+        self.values.append(value)
+        self._add(value)
+    
+    @property
+    def full(self) -> bool:
+        """窗口是否已填满"""
+        return len(self.values) == self.size
+    
+    def sum(self) -> float:
+        """窗口内数值之和"""
+        return self._sum if self.full and self._nan_count == 0 else np.nan
+    
+    def mean(self) -> float:
+        """窗口内数值的均值"""
+        return self._sum / self.size if self.full and self._nan_count == 0 else np.nan
+    
+    def weighted_mean(self, weights: List[float]) -> float:
+        """窗口内数值的加权均值，weights与窗口内数值按从旧到新的顺序对应"""
+        if not self.full:
+            return np.nan
+        return sum(w * v for w, v in zip(weights, self.values)) / sum(weights)
+
+
+class StreamingEMA:
+    """
+    流式EMA，与pandas的ewm(span=span, adjust=False).mean()一致
+    """
+    
+    def __init__(self, span: int):
+        """
+        初始化流式EMA
+        
+        Args:
+            span: EMA周期
+        """
+        self.alpha = 2.0 / (span + 1)
+        self.value = np.nan
+    
+    def update(self, value: float) -> float:
+        """推进一个新值并返回最新的EMA"""
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value = self.alpha * value + (1 - self.alpha) * self.value
+        return self.value
+
+
+def safe_divide(a: float, b: float) -> float:
+    """按numpy的规则做除法：除数为0时返回inf或NaN而不是抛出异常"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return np.nan
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+    return a / b
+
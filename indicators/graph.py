@@ -0,0 +1,313 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+指标计算图
+
+把指标配置列表拆成计算节点（如EMA(close,12)、SMA(close,20)、滚动标准差），相同的节点只计算一次：
+MACD直接使用EMA指标已经算出的EMA，布林带中轨直接使用相同周期的SMA。
+节点按依赖顺序计算，结果保存在同一个列字典中，最后只复制一次DataFrame写入所有指标列，
+不再像逐个调用calculate()那样每个指标复制一次。
+
+节点结果按(节点参数, 数据版本)缓存，数据版本由所用K线列内容的哈希得到，同一份K线数据重复计算（参数优化、回测、同一根K线多次运行）时直接复用。
+没有拆分成节点的指标（WMA、HMA、KDJ、ADX、PSAR）整体作为一个节点调用原来的calculate()。
+计算结果与依次调用各指标的calculate()完全一致。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple, Any
+import pandas as pd
+from indicators.moving_average import SimpleMovingAverage, ExponentialMovingAverage
+from indicators.oscillators import RSI, MACD, BollingerBands, ATR
+
+# 计算指标必需的K线列
+REQUIRED_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+# 节点结果缓存的最大条目数（所有计算图共用）
+MEMO_SIZE = 64
+
+_memo = OrderedDict()   # (节点, 数据版本) -> 计算结果
+_memo_lock = threading.Lock()
+
+
+def _ema(series, span):
+    return series.ewm(span=span, adjust=False).mean()
+
+
+def _sma(series, period):
+    return series.rolling(window=period).mean()
+
+
+def _rolling_std(series, period):
+    return series.rolling(window=period).std(ddof=0)
+
+
+def _sub(a, b):
+    return a - b
+
+
+def _diff(series):
+    return series.diff()
+
+
+def _gain(delta):
+    return delta.where(delta > 0, 0)
+
+
+def _loss(delta):
+    return -delta.where(delta < 0, 0)
+
+
+def _rsi(avg_gain, avg_loss):
+    return 100 - (100 / (1 + avg_gain / avg_loss))
+
+
+def _true_range(high, low, close):
+    high_low = high - low
+    high_close_prev = abs(high - close.shift(1))
+    low_close_prev = abs(low - close.shift(1))
+    return pd.concat([high_low, high_close_prev, low_close_prev], axis=1).max(axis=1)
+
+
+def _bb_band(middle, std, multiplier):
+    return middle + (multiplier * std)
+
+
+def _bb_width(upper, lower, middle):
+    return (upper - lower) / middle
+
+
+def _pick(frame, column):
+    return frame[column]
+
+
+class IndicatorGraph:
+    """
+    指标计算图
+
+    根据指标配置列表建立计算节点，相同节点只保留一个，evaluate()按依赖顺序计算所需节点
+    """
+
+    def __init__(self, indicators_config: List[Dict[str, Any]]):
+        """
+        根据指标配置建立计算图
+
+        Args:
+            indicators_config: 指标配置列表，格式与calculate_indicators相同
+                例如：[{'name': 'EMA', 'params': {'period': 12}}, {'name': 'MACD', 'params': {}}]
+        """
+        from indicators import create_indicator
+
+        # 节点 -> (计算函数, 输入节点, 计算参数)，插入顺序即依赖顺序（节点的输入总是先于节点创建）
+        self._nodes = OrderedDict()
+        # 每个指标的输出: (最少K线数, [(列名, 节点)])；列名为None表示节点结果是一组列
+        self._plans = []
+        # 已配置指标输出的列名 -> 节点，后面的指标以这些列为数据源时直接引用节点
+        self._columns = {}
+
+        for config in indicators_config:
+            indicator = create_indicator(config['name'], **config.get('params', {}))
+            self._plans.append(self._add_indicator(indicator))
+
+    def _node(self, op: str, func, inputs: Tuple = (), params: Tuple = (), call_params: Tuple = None) -> Tuple:
+        """
+        添加计算节点，相同的(op, 输入, 参数)只添加一次
+
+        Args:
+            op: 节点类型
+            func: 计算函数，调用方式为func(*输入节点的结果, *call_params)
+            inputs: 输入节点
+            params: 节点参数，用于判断节点是否相同
+            call_params: 传给计算函数的参数，默认与params相同
+        """
+        key = (op, inputs, params)
+        if key not in self._nodes:
+            self._nodes[key] = (func, inputs, params if call_params is None else call_params)
+        return key
+
+    def _column(self, name: str) -> Tuple:
+        """数据列节点：前面的指标输出的列引用其节点，否则为K线原始列"""
+        if name in self._columns:
+            return self._columns[name]
+        return self._node('column', None, (), (name,))
+
+    def _add_indicator(self, indicator) -> Tuple[int, List]:
+        """
+        把一个指标拆成计算节点
+
+        Returns:
+            tuple: (最少K线数, [(列名, 节点)])，K线数少于最少K线数时该指标不输出任何列
+        """
+        if isinstance(indicator, SimpleMovingAverage):
+            source = self._column(indicator.source_column)
+            outputs = [(indicator.name, self._node('sma', _sma, (source,), (indicator.period,)))]
+            min_length = indicator.period
+
+        elif isinstance(indicator, ExponentialMovingAverage):
+            source = self._column(indicator.source_column)
+            outputs = [(indicator.name, self._node('ema', _ema, (source,), (indicator.period,)))]
+            min_length = indicator.period
+
+        elif isinstance(indicator, MACD):
+            source = self._column(indicator.source_column)
+            fast = self._node('ema', _ema, (source,), (indicator.fast_period,))
+            slow = self._node('ema', _ema, (source,), (indicator.slow_period,))
+            line = self._node('sub', _sub, (fast, slow))
+            signal = self._node('ema', _ema, (line,), (indicator.signal_period,))
+            histogram = self._node('sub', _sub, (line, signal))
+            outputs = [('MACD_Line', line), ('MACD_Signal', signal), ('MACD_Histogram', histogram)]
+            min_length = max(indicator.fast_period, indicator.slow_period) + indicator.signal_period
+
+        elif isinstance(indicator, BollingerBands):
+            source = self._column(indicator.source_column)
+            middle = self._node('sma', _sma, (source,), (indicator.period,))
+            std = self._node('rolling_std', _rolling_std, (source,), (indicator.period,))
+            upper = self._node('bb_band', _bb_band, (middle, std), (indicator.std_dev,))
+            lower = self._node('bb_band', _bb_band, (middle, std), (-indicator.std_dev,))
+            width = self._node('bb_width', _bb_width, (upper, lower, middle))
+            outputs = [('BB_Middle', middle), ('BB_StdDev', std), ('BB_Upper', upper),
+                       ('BB_Lower', lower), ('BB_Width', width)]
+            min_length = indicator.period
+
+        elif isinstance(indicator, RSI):
+            source = self._column(indicator.source_column)
+            delta = self._node('diff', _diff, (source,))
+            avg_gain = self._node('sma', _sma, (self._node('gain', _gain, (delta,)),), (indicator.period,))
+            avg_loss = self._node('sma', _sma, (self._node('loss', _loss, (delta,)),), (indicator.period,))
+            outputs = [(indicator.name, self._node('rsi', _rsi, (avg_gain, avg_loss)))]
+            min_length = indicator.period
+
+        elif isinstance(indicator, ATR):
+            tr = self._node('true_range', _true_range,
+                            (self._column('high'), self._column('low'), self._column('close')))
+            outputs = [(indicator.name, self._node('sma', _sma, (tr,), (indicator.period,)))]
+            min_length = indicator.period
+
+        else:
+            # 整体调用calculate()，输入为K线原始列及指标的数据源列
+            columns = list(REQUIRED_COLUMNS)
+            source_column = getattr(indicator, 'source_column', None)
+            if source_column and source_column not in columns:
+                columns.append(source_column)
+            params = (type(indicator).__name__, tuple(sorted(
+                (name, value) for name, value in vars(indicator).items()
+                if isinstance(value, (int, float, str, bool)))))
+            frame = self._node('indicator', self._run_indicator(indicator, columns),
+                               tuple(self._column(column) for column in columns), params, ())
+            # 引用这些列的后续指标从结果中取列
+            for column in indicator.get_output_column_names():
+                self._columns[column] = self._node('pick', _pick, (frame,), (column,))
+            return 0, [(None, frame)]
+
+        for column, key in outputs:
+            self._columns[column] = key
+        return min_length, outputs
+
+    @staticmethod
+    def _run_indicator(indicator, columns):
+        """整体计算的指标节点，返回calculate()新增的列（数据不足时为空）"""
+        def run(*series):
+            frame = pd.DataFrame(dict(zip(columns, series)))
+            result = indicator.calculate(frame)
+            return result[[column for column in result.columns if column not in frame.columns]]
+        return run
+
+    @staticmethod
+    def data_version(df: pd.DataFrame, columns: List[str]) -> Tuple:
+        """
+        数据版本：行数以及索引和各数据列内容的哈希
+
+        Args:
+            df: K线数据DataFrame
+            columns: 计算用到的原始列
+
+        Returns:
+            tuple: 索引和这些列的内容相同时相同
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(pd.util.hash_array(df.index.to_numpy()).tobytes())
+        for column in columns:
+            digest.update(column.encode('utf-8'))
+            digest.update(pd.util.hash_array(df[column].to_numpy()).tobytes())
+        return len(df), digest.hexdigest()
+
+    def evaluate(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        计算所有配置的指标
+
+        Args:
+            df: 包含OHLCV数据的DataFrame
+
+        Returns:
+            pd.DataFrame: 添加了所有指标列的DataFrame（df的副本）
+        """
+        result_df = df.copy()
+        if not self._plans:
+            return result_df
+        if any(column not in df.columns for column in REQUIRED_COLUMNS):
+            raise ValueError("输入DataFrame缺少必要的OHLCV列")
+
+        # 本次K线数量下需要输出的列
+        outputs = [(column, key) for min_length, plan in self._plans if len(df) >= min_length
+                   for column, key in plan]
+
+        # 找出需要计算的节点
+        needed = set()
+        stack = [key for _, key in outputs]
+        while stack:
+            key = stack.pop()
+            if key not in needed:
+                needed.add(key)
+                stack.extend(self._nodes[key][1])
+
+        source_columns = sorted(key[2][0] for key in needed if key[0] == 'column')
+        version = self.data_version(df, source_columns)
+
+        # 按依赖顺序计算
+        values = {}
+        for key, (func, inputs, params) in self._nodes.items():
+            if key not in needed:
+                continue
+            if key[0] == 'column':
+                values[key] = df[key[2][0]]
+                continue
+            memo_key = (key, version)
+            with _memo_lock:
+                value = _memo.get(memo_key)
+                if value is not None:
+                    _memo.move_to_end(memo_key)
+            if value is None:
+                value = func(*[values[input_key] for input_key in inputs], *params)
+                with _memo_lock:
+                    _memo[memo_key] = value
+                    while len(_memo) > MEMO_SIZE:
+                        _memo.popitem(last=False)
+            values[key] = value
+
+        # 写入结果，同名列以后配置的指标为准
+        columns = {}
+        for column, key in outputs:
+            if column is None:
+                columns.update(values[key].items())
+            else:
+                columns[column] = values[key]
+        for column, series in columns.items():
+            result_df[column] = series.copy()
+
+        return result_df
+
+    def node_count(self) -> int:
+        """去重后的计算节点数"""
+        return len(self._nodes)
@@ -15,8 +15,26 @@ okx u本位择时策略实盘框架
 
 import pandas as pd
 import numpy as np
-from typing import List, Union, Optional
-from indicators.base_indicator import BaseIndicator
+from typing import List, Union, Optional, Dict
+from indicators.base_indicator import BaseIndicator, RollingWindow, StreamingEMA
+
+def triangular_weights(size: int) -> List[float]:
+    """
+    三角窗口权重，与pandas rolling(win_type='triangular')使用的scipy.signal.windows.triang一致
+    
+    Args:
+        size: 窗口长度
+    
+    Returns:
+        List[float]: 权重列表
+    """
+    half = [n for n in range(1, (size + 1) // 2 + 1)]
+    if size % 2 == 0:
+        weights = [(2 * n - 1.0) / size for n in half]
+        return weights + weights[::-1]
+    weights = [2.0 * n / (size + 1.0) for n in half]
+    return weights + weights[-2::-1]
+
 
 class SimpleMovingAverage(BaseIndicator):
     """
@@ -36,6 +54,7 @@ class SimpleMovingAverage(BaseIndicator):
         super().__init__(f"SMA_{period}")
         self.period = period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -61,6 +80,27 @@ class SimpleMovingAverage(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._window = RollingWindow(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的SMA值
+        """
+        self._window.append(float(bar[self.source_column]))
+        return {self.name: self._window.mean()}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period
@@ -88,6 +128,7 @@ class ExponentialMovingAverage(BaseIndicator):
         super().__init__(f"EMA_{period}")
         self.period = period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -113,6 +154,26 @@ class ExponentialMovingAverage(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._ema = StreamingEMA(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的EMA值
+        """
+        return {self.name: self._ema.update(float(bar[self.source_column]))}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period
@@ -140,6 +201,7 @@ class WeightedMovingAverage(BaseIndicator):
         super().__init__(f"WMA_{period}")
         self.period = period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -180,6 +242,28 @@ class WeightedMovingAverage(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._window = RollingWindow(self.period)
+        self._weights = list(range(1, self.period + 1))
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的WMA值
+        """
+        self._window.append(float(bar[self.source_column]))
+        return {self.name: self._window.weighted_mean(self._weights)}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period
@@ -207,6 +291,7 @@ class HullMovingAverage(BaseIndicator):
         super().__init__(f"HMA_{period}")
         self.period = period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -263,6 +348,40 @@ class HullMovingAverage(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        half_period = int(self.period / 2)
+        sqrt_period = int(np.sqrt(self.period))
+        self._window_n = RollingWindow(self.period)
+        self._window_half = RollingWindow(half_period)
+        self._window_raw = RollingWindow(sqrt_period)
+        self._weights_n = triangular_weights(self.period)
+        self._weights_half = triangular_weights(half_period)
+        self._weights_raw = triangular_weights(sqrt_period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的HMA值
+        """
+        value = float(bar[self.source_column])
+        self._window_n.append(value)
+        self._window_half.append(value)
+        
+        # 2*WMA(n/2) - WMA(n)，与batch计算一样使用三角窗口加权
+        raw_hma = 2 * self._window_half.weighted_mean(self._weights_half) - self._window_n.weighted_mean(self._weights_n)
+        self._window_raw.append(raw_hma)
+        return {self.name: self._window_raw.weighted_mean(self._weights_raw)}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period
@@ -15,8 +15,26 @@ okx u本位择时策略实盘框架
 
 import pandas as pd
 import numpy as np
-from typing import List, Union, Optional
-from indicators.base_indicator import BaseIndicator
+import math
+from typing import List, Union, Optional, Dict
+from indicators.base_indicator import BaseIndicator, RollingWindow, StreamingEMA, safe_divide
+
+def true_range(high: float, low: float, prev_close: float) -> float:
+    """
+    单根K线的真实范围，没有前收盘价时等于最高价减最低价（与pandas的max(axis=1)跳过NaN一致）
+    
+    Args:
+        high: 最高价
+        low: 最低价
+        prev_close: 前一根K线的收盘价，第一根K线为NaN
+    
+    Returns:
+        float: 真实范围
+    """
+    if math.isnan(prev_close):
+        return high - low
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
 
 class RSI(BaseIndicator):
     """
@@ -36,6 +54,7 @@ class RSI(BaseIndicator):
         super().__init__(f"RSI_{period}")
         self.period = period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -75,6 +94,37 @@ class RSI(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._prev = np.nan
+        self._gains = RollingWindow(self.period)
+        self._losses = RollingWindow(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的RSI值
+        """
+        value = float(bar[self.source_column])
+        delta = value - self._prev
+        self._prev = value
+        
+        # 与batch计算一致，第一根K线的涨跌幅按0计入窗口
+        self._gains.append(delta if delta > 0 else 0.0)
+        self._losses.append(-delta if delta < 0 else 0.0)
+        
+        rs = safe_divide(self._gains.mean(), self._losses.mean())
+        return {self.name: 100 - (100 / (1 + rs))}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period + 1  # 需要额外一个周期用于计算差值
@@ -106,6 +156,7 @@ class MACD(BaseIndicator):
         self.slow_period = slow_period
         self.signal_period = signal_period
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -146,6 +197,31 @@ class MACD(BaseIndicator):
         """获取该指标输出的列名列表"""
         return ['MACD_Line', 'MACD_Signal', 'MACD_Histogram']
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._fast_ema = StreamingEMA(self.fast_period)
+        self._slow_ema = StreamingEMA(self.slow_period)
+        self._signal_ema = StreamingEMA(self.signal_period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的MACD_Line、MACD_Signal和MACD_Histogram
+        """
+        value = float(bar[self.source_column])
+        line = self._fast_ema.update(value) - self._slow_ema.update(value)
+        signal = self._signal_ema.update(line)
+        return {'MACD_Line': line, 'MACD_Signal': signal, 'MACD_Histogram': line - signal}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return max(self.fast_period, self.slow_period) + self.signal_period
@@ -177,6 +253,7 @@ class Stochastic(BaseIndicator):
         self.k_period = k_period
         self.d_period = d_period
         self.j_period = j_period
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -221,6 +298,39 @@ class Stochastic(BaseIndicator):
         """获取该指标输出的列名列表"""
         return ['KDJ_K', 'KDJ_D', 'KDJ_J']
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return ['high', 'low', 'close']
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._highs = RollingWindow(self.k_period)
+        self._lows = RollingWindow(self.k_period)
+        self._k_values = RollingWindow(self.d_period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的KDJ_K、KDJ_D和KDJ_J
+        """
+        self._highs.append(float(bar['high']))
+        self._lows.append(float(bar['low']))
+        
+        k = np.nan
+        if self._highs.full:
+            highest_high = max(self._highs.values)
+            lowest_low = min(self._lows.values)
+            k = 100 * safe_divide(float(bar['close']) - lowest_low, highest_high - lowest_low)
+        
+        self._k_values.append(k)
+        d = self._k_values.mean()
+        return {'KDJ_K': k, 'KDJ_D': d, 'KDJ_J': 3 * d - 2 * k}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.k_period + max(self.d_period, self.j_period)
@@ -250,6 +360,7 @@ class BollingerBands(BaseIndicator):
         self.period = period
         self.std_dev = std_dev
         self.source_column = source_column
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -289,6 +400,40 @@ class BollingerBands(BaseIndicator):
         """获取该指标输出的列名列表"""
         return ['BB_Middle', 'BB_Upper', 'BB_Lower', 'BB_Width', 'BB_StdDev']
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return [self.source_column]
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._window = RollingWindow(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的BB_Middle、BB_Upper、BB_Lower、BB_Width和BB_StdDev
+        """
+        self._window.append(float(bar[self.source_column]))
+        middle = self._window.mean()
+        std = np.nan
+        if self._window.full:
+            std = math.sqrt(sum((v - middle) ** 2 for v in self._window.values) / self.period)
+        
+        upper = middle + self.std_dev * std
+        lower = middle - self.std_dev * std
+        return {
+            'BB_Middle': middle,
+            'BB_Upper': upper,
+            'BB_Lower': lower,
+            'BB_Width': safe_divide(upper - lower, middle),
+            'BB_StdDev': std
+        }
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period
@@ -314,6 +459,7 @@ class ATR(BaseIndicator):
         """
         super().__init__(f"ATR_{period}")
         self.period = period
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -347,6 +493,29 @@ class ATR(BaseIndicator):
         
         return result_df
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return ['high', 'low', 'close']
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._prev_close = np.nan
+        self._tr = RollingWindow(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的ATR值
+        """
+        self._tr.append(true_range(float(bar['high']), float(bar['low']), self._prev_close))
+        self._prev_close = float(bar['close'])
+        return {self.name: self._tr.mean()}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return self.period + 1  # 需要前一个周期的收盘价
@@ -0,0 +1,301 @@
+"""
+Python量化实战框架-okx版
+这个框架是我们python量化行动家的内容，欢迎大家加入我们的量化行动家，一起玩量化，一起进步
+所有将加入行动家社群的同学，框架会定期更新，并且后面会有更多框架上架
+微信: coder_v5 （微信联系务必备注来意)
+本程序作者: 菜哥
+
+# 框架内容
+okx u本位择时策略实盘框架
+
+本框架程序是菜哥原创，并且仅供量化行动家社群的同学使用和阅读，
+发现侵权行为，作者将依法追究相关责任，并委托维权骑士进行维权处理，以维护自身合法权益。
+若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
+
+抛物线SAR计算内核
+
+所有SAR策略和ParabolicSAR指标共用的递推计算，直接在float64数组上运行：
+- 安装了numba时使用JIT编译，未安装时退回纯Python循环（先转为Python列表，避免逐个访问pandas元素）
+- 每根K线的递推逻辑只写一次（_strategy_step/_classic_step），批量计算和增量更新共用
+
+提供两种口径：
+- parabolic_sar: SAR策略使用的口径，初始为下降趋势，先限制SAR范围再判断反转
+- classic_parabolic_sar: ParabolicSAR指标使用的口径，初始为上升趋势，先判断反转再限制SAR范围
+"""
+
+import math
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _strategy_step(prev_sar, prev_up, ep, af, high, low, high1, low1, high2, low2, has_two,
+                   acceleration, maximum):
+    """
+    SAR策略口径的单根K线递推
+
+    Args:
+        prev_sar: 上一根K线的SAR值
+        prev_up: 上一根K线是否为上升趋势
+        ep: 当前极值点
+        af: 当前加速因子
+        high, low: 当前K线的最高价和最低价
+        high1, low1: 前一根K线的最高价和最低价
+        high2, low2: 前两根K线的最高价和最低价
+        has_two: 是否已有前两根K线
+        acceleration: 加速因子步长
+        maximum: 最大加速因子
+
+    Returns:
+        tuple: (sar, is_uptrend, ep, af)
+    """
+    sar = prev_sar + af * (ep - prev_sar)
+    if prev_up:
+        # 确保SAR不高于前两个周期的最低价
+        if has_two:
+            sar = min(sar, low1, low2)
+        if low < sar:
+            # 趋势转为下降，SAR设为之前的极值点
+            return ep, False, high, acceleration
+        if high > ep:
+            ep = high
+            af = min(af + acceleration, maximum)
+        return sar, True, ep, af
+
+    # 确保SAR不低于前两个周期的最高价
+    if has_two:
+        sar = max(sar, high1, high2)
+    if high > sar:
+        # 趋势转为上升，SAR设为之前的极值点
+        return ep, True, low, acceleration
+    if low < ep:
+        ep = low
+        af = min(af + acceleration, maximum)
+    return sar, False, ep, af
+
+
+def _classic_step(prev_sar, prev_up, ep, af, high, low, high1, low1, high2, low2, has_two,
+                  acceleration, maximum):
+    """
+    经典口径的单根K线递推，参数和返回值同_strategy_step
+    """
+    if prev_up:
+        # 第一次计算时SAR取第一根K线的最低价
+        sar = low1 if math.isnan(prev_sar) else prev_sar + af * (ep - prev_sar)
+        if low < sar:
+            return ep, False, low, acceleration
+        if high > ep:
+            ep = high
+            af = min(af + acceleration, maximum)
+        # 确保SAR不高于前两个周期的低点
+        if has_two:
+            sar = min(sar, low1, low2)
+        return sar, True, ep, af
+
+    sar = prev_sar + af * (ep - prev_sar)
+    if high > sar:
+        return ep, True, high, acceleration
+    if low < ep:
+        ep = low
+        af = min(af + acceleration, maximum)
+    # 确保SAR不低于前两个周期的高点
+    if has_two:
+        sar = max(sar, high1, high2)
+    return sar, False, ep, af
+
+
+def _strategy_loop(high, low, sar, is_uptrend, acceleration, maximum):
+    """SAR策略口径的批量计算，结果写入sar和is_uptrend，返回最终的(ep, af)"""
+    # 假设开始是下降趋势，SAR在第一根K线的最高价
+    sar[0] = high[0]
+    is_uptrend[0] = False
+    ep = low[0]
+    af = acceleration
+    for i in range(1, len(high)):
+        has_two = i > 1
+        high2 = high[i - 2] if has_two else high[0]
+        low2 = low[i - 2] if has_two else low[0]
+        s, u, ep, af = _strategy_step(
+            sar[i - 1], is_uptrend[i - 1], ep, af, high[i], low[i],
+            high[i - 1], low[i - 1], high2, low2, has_two, acceleration, maximum)
+        sar[i] = s
+        is_uptrend[i] = u
+    return ep, af
+
+
+def _classic_loop(high, low, sar, is_uptrend, acceleration, maximum):
+    """经典口径的批量计算，结果写入sar和is_uptrend，返回最终的(ep, af)"""
+    # 假设第一个趋势是上涨，第一根K线没有SAR值
+    sar[0] = np.nan
+    is_uptrend[0] = True
+    ep = high[0]
+    af = acceleration
+    for i in range(1, len(high)):
+        has_two = i > 1
+        high2 = high[i - 2] if has_two else high[0]
+        low2 = low[i - 2] if has_two else low[0]
+        s, u, ep, af = _classic_step(
+            sar[i - 1], is_uptrend[i - 1], ep, af, high[i], low[i],
+            high[i - 1], low[i - 1], high2, low2, has_two, acceleration, maximum)
+        sar[i] = s
+        is_uptrend[i] = u
+    return ep, af
+
+
+if njit is not None:
+    _strategy_step = njit(cache=True)(_strategy_step)
+    _classic_step = njit(cache=True)(_classic_step)
+    _strategy_loop = njit(cache=True)(_strategy_loop)
+    _classic_loop = njit(cache=True)(_classic_loop)
+
+
+def _run(loop, high, low, acceleration, maximum):
+    """执行批量计算，返回(sar数组, 趋势数组, (ep, af))"""
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    n = len(high)
+    if n == 0:
+        return np.empty(0, dtype=np.float64), np.empty(0, dtype=bool), (np.nan, acceleration)
+
+    if njit is not None:
+        sar = np.empty(n, dtype=np.float64)
+        is_uptrend = np.empty(n, dtype=bool)
+        state = loop(high, low, sar, is_uptrend, float(acceleration), float(maximum))
+        return sar, is_uptrend, state
+
+    # 纯Python循环在列表上运行，比逐个访问numpy/pandas元素快得多
+    sar = [0.0] * n
+    is_uptrend = [False] * n
+    state = loop(high.tolist(), low.tolist(), sar, is_uptrend, float(acceleration), float(maximum))
+    return np.array(sar, dtype=np.float64), np.array(is_uptrend, dtype=bool), state
+
+
+def parabolic_sar(high, low, acceleration: float = 0.02, maximum: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算SAR策略口径的抛物线SAR
+
+    Args:
+        high: 最高价序列
+        low: 最低价序列
+        acceleration: 加速因子，默认0.02
+        maximum: 最大加速因子，默认0.2
+
+    Returns:
+        tuple: (SAR数组, 是否上升趋势数组)
+    """
+    sar, is_uptrend, _ = _run(_strategy_loop, high, low, acceleration, maximum)
+    return sar, is_uptrend
+
+
+def classic_parabolic_sar(high, low, acceleration: float = 0.02, maximum: float = 0.2) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    计算经典口径的抛物线SAR（ParabolicSAR指标使用）
+
+    Args:
+        high: 最高价序列
+        low: 最低价序列
+        acceleration: 加速因子，默认0.02
+        maximum: 最大加速因子，默认0.2
+
+    Returns:
+        tuple: (SAR数组, 是否上升趋势数组)，第一根K线的SAR为NaN
+    """
+    sar, is_uptrend, _ = _run(_classic_loop, high, low, acceleration, maximum)
+    return sar, is_uptrend
+
+
+class IncrementalSar:
+    """
+    增量SAR计算器
+
+    先用warmup()批量计算历史数据，之后每根新K线调用update()以O(1)的代价推进一步，
+    结果与对完整序列批量计算完全一致
+    """
+
+    def __init__(self, acceleration: float = 0.02, maximum: float = 0.2, classic: bool = False):
+        """
+        初始化增量SAR计算器
+
+        Args:
+            acceleration: 加速因子，默认0.02
+            maximum: 最大加速因子，默认0.2
+            classic: 是否使用经典口径，默认使用SAR策略口径
+        """
+        self.acceleration = float(acceleration)
+        self.maximum = float(maximum)
+        self.classic = classic
+        self._loop = _classic_loop if classic else _strategy_loop
+        self._step = _classic_step if classic else _strategy_step
+        self.reset()
+
+    def reset(self):
+        """清空状态"""
+        self.count = 0
+        self.sar = np.nan
+        self.is_uptrend = self.classic
+        self.ep = np.nan
+        self.af = self.acceleration
+        self._highs = [np.nan, np.nan]  # 前两根、前一根K线的最高价
+        self._lows = [np.nan, np.nan]
+
+    def warmup(self, high, low) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        用历史K线初始化状态
+
+        Args:
+            high: 最高价序列
+            low: 最低价序列
+
+        Returns:
+            tuple: (SAR数组, 是否上升趋势数组)
+        """
+        self.reset()
+        sar, is_uptrend, (ep, af) = _run(self._loop, high, low, self.acceleration, self.maximum)
+        n = len(sar)
+        if n == 0:
+            return sar, is_uptrend
+
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        self.count = n
+        self.sar = float(sar[-1])
+        self.is_uptrend = bool(is_uptrend[-1])
+        self.ep = float(ep)
+        self.af = float(af)
+        self._highs = [float(high[-2]) if n > 1 else np.nan, float(high[-1])]
+        self._lows = [float(low[-2]) if n > 1 else np.nan, float(low[-1])]
+        return sar, is_uptrend
+
+    def update(self, high: float, low: float) -> Tuple[float, bool]:
+        """
+        推进一根新的已完成K线
+
+        Args:
+            high: 新K线的最高价
+            low: 新K线的最低价
+
+        Returns:
+            tuple: (SAR值, 是否上升趋势)
+        """
+        high = float(high)
+        low = float(low)
+        if self.count == 0:
+            self.warmup([high], [low])
+            return self.sar, self.is_uptrend
+
+        has_two = self.count > 1
+        high2 = self._highs[0] if has_two else self._highs[1]
+        low2 = self._lows[0] if has_two else self._lows[1]
+        sar, is_uptrend, ep, af = self._step(
+            self.sar, self.is_uptrend, self.ep, self.af, high, low,
+            self._highs[1], self._lows[1], high2, low2, has_two, self.acceleration, self.maximum)
+
+        self.sar, self.is_uptrend, self.ep, self.af = float(sar), bool(is_uptrend), float(ep), float(af)
+        self._highs = [self._highs[1], high]
+        self._lows = [self._lows[1], low]
+        self.count += 1
+        return self.sar, self.is_uptrend
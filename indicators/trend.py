@@ -15,8 +15,10 @@ okx u本位择时策略实盘框架
 
 import pandas as pd
 import numpy as np
-from typing import List, Union, Optional
-from indicators.base_indicator import BaseIndicator
+from typing import List, Union, Optional, Dict
+from indicators.base_indicator import BaseIndicator, RollingWindow, safe_divide
+from indicators.oscillators import true_range
+from indicators.sar_kernel import classic_parabolic_sar, IncrementalSar
 
 class ADX(BaseIndicator):
     """
@@ -34,6 +36,7 @@ class ADX(BaseIndicator):
         """
         super().__init__(f"ADX_{period}")
         self.period = period
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -113,6 +116,54 @@ class ADX(BaseIndicator):
         """获取该指标输出的列名列表"""
         return ['ADX', '+DI_' + str(self.period), '-DI_' + str(self.period)]
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return ['high', 'low', 'close']
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._prev_high = np.nan
+        self._prev_low = np.nan
+        self._prev_close = np.nan
+        self._tr = RollingWindow(self.period)
+        self._plus_dm = RollingWindow(self.period)
+        self._minus_dm = RollingWindow(self.period)
+        self._dx = RollingWindow(self.period)
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的ADX、+DI和-DI
+        """
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        high_diff = high - self._prev_high
+        low_diff = low - self._prev_low
+        
+        # 方向变动，第一根K线没有前值时为0
+        plus_dm = high_diff if (high_diff > 0 and high_diff > abs(low_diff)) else 0.0
+        minus_dm = abs(low_diff) if (low_diff < 0 and abs(low_diff) > high_diff) else 0.0
+        
+        self._tr.append(true_range(high, low, self._prev_close))
+        self._plus_dm.append(plus_dm)
+        self._minus_dm.append(minus_dm)
+        self._prev_high, self._prev_low, self._prev_close = high, low, close
+        
+        tr_sum = self._tr.sum()
+        plus_di = 100 * safe_divide(self._plus_dm.sum(), tr_sum)
+        minus_di = 100 * safe_divide(self._minus_dm.sum(), tr_sum)
+        self._dx.append(100 * safe_divide(abs(plus_di - minus_di), plus_di + minus_di))
+        
+        return {
+            'ADX': self._dx.mean(),
+            '+DI_' + str(self.period): plus_di,
+            '-DI_' + str(self.period): minus_di
+        }
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return 2 * self.period + 1
@@ -141,6 +192,7 @@ class ParabolicSAR(BaseIndicator):
         super().__init__("ParabolicSAR")
         self.acceleration = acceleration
         self.maximum = maximum
+        self.reset_state()
     
     def calculate(self, df: pd.DataFrame, **kwargs) -> pd.DataFrame:
         """
@@ -161,58 +213,9 @@ class ParabolicSAR(BaseIndicator):
         # 复制DataFrame避免修改原始数据
         result_df = df.copy()
         
-        # 初始化SAR数组
-        sar = np.zeros(len(result_df))
-        sar[0] = np.nan
-        
-        # 初始化加速因子和极值
-        af = self.acceleration
-        ep = result_df['high'].iloc[0]  # 假设第一个趋势是上涨
-        is_uptrend = True
-        
         # 计算SAR
-        for i in range(1, len(result_df)):
-            if is_uptrend:
-                # 上涨趋势
-                if i == 1:
-                    sar[i] = result_df['low'].iloc[0]
-                else:
-                    sar[i] = sar[i-1] + af * (ep - sar[i-1])
-                
-                # 检查是否需要反转
-                if result_df['low'].iloc[i] < sar[i]:
-                    is_uptrend = False
-                    sar[i] = ep
-                    ep = result_df['low'].iloc[i]
-                    af = self.acceleration
-                else:
-                    # 更新极值和加速因子
-                    if result_df['high'].iloc[i] > ep:
-                        ep = result_df['high'].iloc[i]
-                        af = min(af + self.acceleration, self.maximum)
-                    
-                    # 确保SAR不高于前两个周期的低点
-                    if i >= 2:
-                        sar[i] = min(sar[i], result_df['low'].iloc[i-1], result_df['low'].iloc[i-2])
-            else:
-                # 下跌趋势
-                sar[i] = sar[i-1] + af * (ep - sar[i-1])
-                
-                # 检查是否需要反转
-                if result_df['high'].iloc[i] > sar[i]:
-                    is_uptrend = True
-                    sar[i] = ep
-                    ep = result_df['high'].iloc[i]
-                    af = self.acceleration
-                else:
-                    # 更新极值和加速因子
-                    if result_df['low'].iloc[i] < ep:
-                        ep = result_df['low'].iloc[i]
-                        af = min(af + self.acceleration, self.maximum)
-                    
-                    # 确保SAR不低于前两个周期的高点
-                    if i >= 2:
-                        sar[i] = max(sar[i], result_df['high'].iloc[i-1], result_df['high'].iloc[i-2])
+        sar, _ = classic_parabolic_sar(result_df['high'].to_numpy(), result_df['low'].to_numpy(),
+                                       self.acceleration, self.maximum)
         
         # 添加到结果DataFrame
         result_df['PSAR'] = sar
@@ -223,6 +226,41 @@ class ParabolicSAR(BaseIndicator):
         """获取该指标输出的列名列表"""
         return ['PSAR']
     
+    def get_input_columns(self) -> List[str]:
+        """获取流式计算需要的输入列"""
+        return ['high', 'low']
+    
+    def reset_state(self):
+        """清空流式计算状态"""
+        self._sar = IncrementalSar(self.acceleration, self.maximum, classic=True)
+    
+    def warmup(self, arrays) -> Dict[str, float]:
+        """
+        用历史数据初始化流式计算状态，直接使用SAR内核批量计算
+        
+        Args:
+            arrays: 包含high和low序列的映射或DataFrame
+        
+        Returns:
+            Dict[str, float]: 最后一根K线的PSAR值
+        """
+        self.reset_state()
+        sar, _ = self._sar.warmup(arrays['high'], arrays['low'])
+        return {'PSAR': float(sar[-1]) if len(sar) else np.nan}
+    
+    def update(self, bar) -> Dict[str, float]:
+        """
+        推进一根新K线
+        
+        Args:
+            bar: 单根K线数据
+        
+        Returns:
+            Dict[str, float]: 最新的PSAR值
+        """
+        sar, _ = self._sar.update(bar['high'], bar['low'])
+        return {'PSAR': sar}
+    
     def get_min_length(self) -> int:
         """获取计算此指标需要的最小数据长度"""
         return 3  # 需要前两个周期的数据
@@ -13,17 +13,13 @@ okx u本位择时策略实盘框架
 若发现有抄袭、篡改、未经授权传播等侵权情况，作者将采取法律手段进行维权
 """
 
-from core.trader import OkxTrader
 from config.config import trading_config, position_config
-from config.api_keys import api_config
 import time
 import datetime
-import pytz
-import importlib
 import sys
-import os
-from core.time_utils import wait_for_next_candle, utc_to_local, calculate_next_candle_time
+from core.time_utils import wait_for_next_candle, utc_to_local, calculate_next_candle_time, get_seconds_from_timeframe
 from core.logger_manager import logger_manager
+from core.strategy_registry import StrategyRegistry, import_profile
 
 # 策略配置字典，用于映射策略名称到配置和类
 # -----------------------------------------------------------------------------------
@@ -49,29 +45,14 @@ STRATEGY_MAPPING = {
 
 }
 
+# 策略注册表，只在运行时导入选中的策略模块
+strategy_registry = StrategyRegistry(STRATEGY_MAPPING)
+
 def get_strategy_class(strategy_name):
     """
     根据策略名称动态导入并返回策略类和配置
     """
-    if strategy_name not in STRATEGY_MAPPING:
-        raise ValueError(f"未找到名为 '{strategy_name}' 的策略。可用的策略有: {', '.join(STRATEGY_MAPPING.keys())}")
-    
-    module_path, class_name, config_name = STRATEGY_MAPPING[strategy_name]
-    
-    try:
-        # 动态导入策略模块
-        strategy_module = importlib.import_module(module_path)
-        # 获取策略类
-        strategy_class = getattr(strategy_module, class_name)
-        # 导入策略配置
-        config_module = importlib.import_module('config.config')
-        strategy_config = getattr(config_module, config_name)
-        
-        return strategy_class, strategy_config
-    except ImportError as e:
-        raise ImportError(f"导入策略 '{strategy_name}' 失败: {str(e)}。请确认策略文件位于 {module_path}.py")
-    except AttributeError as e:
-        raise AttributeError(f"加载策略 '{strategy_name}' 失败: {str(e)}。请确认策略类名为 {class_name}")
+    return strategy_registry.load(strategy_name)
 
 def run_strategy():
     """
@@ -109,7 +90,9 @@ def run_strategy():
         for key, value in strategy_config.items():
             logger.info(f"  {key}: {value}")
         
-        # 初始化交易者
+        # 初始化交易者（API密钥和ccxt在这里才导入，回测、压测、列出策略等不需要密钥文件，也不用等待ccxt导入）
+        from config.api_keys import api_config
+        from core.trader import OkxTrader
         trader = OkxTrader(
             api_config['api_key'], 
             api_config['secret_key'], 
@@ -132,6 +115,16 @@ def run_strategy():
         logger.info(f"\n策略将按照{timeframe}周期同步执行")
         logger.info("策略将在每个新K线形成后立即执行")
         
+        # 订阅K线推送，收到K线确认后立即运行策略；未启用或不可用时按时钟等待
+        from config.config import websocket_config
+        from core.okx_websocket import create_market_stream
+        stream = create_market_stream(api_config['api_key'], api_config['secret_key'], api_config['passphrase'])
+        if stream:
+            stream.subscribe_candles(symbol, timeframe)
+            logger.info("已订阅WebSocket K线推送，K线确认后立即执行策略")
+            # 下单后等待订单频道的成交推送，不再轮询订单状态
+            strategy.order_tracker.attach_stream(stream)
+        
 
         # 循环运行策略
         while True:
@@ -142,8 +135,15 @@ def run_strategy():
                 local_tz_name = local_next_candle_time.tzinfo.tzname(local_next_candle_time)
                 logger.info(f"下一次运行时间: {local_next_candle_time.strftime('%Y-%m-%d %H:%M:%S')} ({local_tz_name}), 等待约 {wait_seconds:.1f} 秒")
                 
-                # 等待到下一根K线形成, 等30秒让交易所的k线数据产生
-                wait_for_next_candle(timeframe, buffer_seconds=30)
+                if stream:
+                    # 等待正在形成的这根K线收盘并被交易所确认，超时说明推送异常，直接用REST数据运行
+                    closing_ts = int(next_candle_time.replace(tzinfo=datetime.timezone.utc).timestamp() * 1000) - get_seconds_from_timeframe(timeframe) * 1000
+                    candle = stream.wait_for_confirmed_candle(symbol, timeframe, wait_seconds + websocket_config.get('candle_timeout', 60), after=closing_ts - 1)
+                    if candle is None:
+                        logger.warning("未收到K线确认推送，使用REST数据运行策略")
+                else:
+                    # 等待到下一根K线形成, 等30秒让交易所的k线数据产生
+                    wait_for_next_candle(timeframe, buffer_seconds=30)
 
                 
                 # 获取当前本地时间
@@ -176,7 +176,7 @@ def run_strategy():
         traceback.print_exc()
 
 def list_available_strategies():
-    """显示所有可用的策略"""
+    """显示所有可用的策略（从源文件读取描述，不导入策略模块）"""
     print("\n可用策略:")
     print("-" * 80)
     print(f"{'策略名称':<30} {'路径':<40} {'描述':<50}")
@@ -184,21 +184,45 @@ def list_available_strategies():
     
     for strategy_name, (module_path, class_name, _) in STRATEGY_MAPPING.items():
         try:
-            # 尝试导入模块并获取描述
-            strategy_module = importlib.import_module(module_path)
-            strategy_class = getattr(strategy_module, class_name)
-            description = getattr(strategy_class, '__doc__', '无描述').split('\n')[0].strip()
-            print(f"{strategy_name:<30} {module_path:<40} {description:<50}")
-        except (ImportError, AttributeError):
-            print(f"{strategy_name:<30} {module_path:<40} {'(模块未找到)':<50}")
+            description = strategy_registry.describe(strategy_name)
+        except SyntaxError:
+            description = '(源文件有语法错误)'
+        if description is None:
+            description = '(模块未找到)'
+        print(f"{strategy_name:<30} {module_path:<40} {description:<50}")
     
     print("-" * 80)
     print("\n使用方法: 在config/config.py中设置 trading_config['strategy'] = '策略名称'")
     print("示例: trading_config['strategy'] = 'bollinger_bands_strategy'")
 
+def print_import_profile(top=20):
+    """
+    显示实盘启动时各模块的导入耗时（main、交易接口、当前策略、WebSocket推送）
+    
+    Args:
+        top: 显示累计耗时最多的前top个模块
+    """
+    strategy_name = trading_config['strategy']
+    modules = ['main', 'core.trader', STRATEGY_MAPPING[strategy_name][0], 'core.okx_websocket']
+    try:
+        profile = import_profile(modules, top)
+    except RuntimeError as e:
+        print(f"导入失败: {str(e)}")
+        return
+    
+    print(f"\n启动导入耗时（策略: {strategy_name}）: 共 {profile['total_ms']:.1f}ms")
+    print("-" * 80)
+    print(f"{'模块':<50} {'累计(ms)':>12} {'自身(ms)':>12}")
+    print("-" * 80)
+    for module, cumulative_ms, self_ms in profile['modules']:
+        print(f"{module:<50} {cumulative_ms:>12.1f} {self_ms:>12.1f}")
+    print("-" * 80)
+
 if __name__ == "__main__":
     # 检查是否有命令行参数
     if len(sys.argv) > 1 and sys.argv[1] == '--list':
         list_available_strategies()
+    elif len(sys.argv) > 1 and sys.argv[1] == '--import-profile':
+        print_import_profile(int(sys.argv[2]) if len(sys.argv) > 2 else 20)
     else:
-        run_strategy() 
\ No newline at end of file
+        run_strategy()
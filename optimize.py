@@ -0,0 +1,93 @@
+"""
+策略参数寻优脚本
+
+用本地K线存储中的历史数据，在多进程中回测optimizer_config['param_space']里配置的参数组合，
+按目标指标排序后输出结果表格
+
+使用方法:
+    python optimize.py                                   # 寻优trading_config中配置的策略
+    python optimize.py dc_strategy --method random --trials 100
+    python optimize.py sar_emax_strategy --method bayes --workers 16 --fetch
+"""
+
+import os
+import argparse
+import datetime
+from backtest import load_history
+from core.optimizer import ParameterOptimizer
+from config.config import trading_config, position_config, backtest_config, optimizer_config
+
+
+def main():
+    """主函数，处理命令行参数"""
+    parser = argparse.ArgumentParser(description='策略参数并行寻优工具')
+    parser.add_argument('strategy', nargs='?', default=trading_config['strategy'], help='策略名称，默认使用trading_config中的策略')
+    parser.add_argument('--symbol', default=trading_config['symbol'], help='交易对')
+    parser.add_argument('--timeframe', default=trading_config['timeframe'], help='K线时间周期')
+    parser.add_argument('--bars', type=int, default=backtest_config.get('bars', 5000), help='回测K线数量')
+    parser.add_argument('--fetch', action='store_true', help='先从交易所获取K线写入本地存储')
+    parser.add_argument('--method', choices=['grid', 'random', 'bayes'], default=optimizer_config.get('method', 'grid'), help='寻优方式')
+    parser.add_argument('--trials', type=int, default=optimizer_config.get('n_trials', 200), help='random/bayes模式评估的组合数量')
+    parser.add_argument('--workers', type=int, default=optimizer_config.get('max_workers'), help='进程数，默认使用全部CPU核')
+    parser.add_argument('--objective', default=optimizer_config.get('objective', 'return_drawdown'), help='排序目标')
+    parser.add_argument('--seed', type=int, default=None, help='随机种子')
+    parser.add_argument('--top', type=int, default=10, help='打印排名前几的结果')
+    parser.add_argument('--output', default=None, help='结果CSV路径，默认写入optimizer_config中的output_dir')
+    args = parser.parse_args()
+
+    param_space = optimizer_config.get('param_space', {}).get(args.strategy)
+    if not param_space:
+        print(f"optimizer_config['param_space']中没有{args.strategy}的参数空间配置")
+        return
+
+    from main import get_strategy_class
+    strategy_class, strategy_config = get_strategy_class(args.strategy)
+
+    ohlcv, instrument = load_history(args.symbol, args.timeframe, args.bars, args.fetch)
+    if len(ohlcv) == 0:
+        print(f"本地没有{args.symbol} {args.timeframe}的K线数据，请使用--fetch从交易所获取")
+        return
+
+    # 与实盘main.py相同的配置合并方式
+    config = {**trading_config, **strategy_config, **position_config,
+              'symbol': args.symbol, 'timeframe': args.timeframe}
+    backtest_kwargs = {
+        'instrument': instrument,
+        'initial_balance': backtest_config.get('initial_balance', 10000),
+        'fee_rate': backtest_config.get('fee_rate', 0.0005),
+        'slippage': backtest_config.get('slippage', 0.0002),
+        'funding_rate': backtest_config.get('funding_rate', 0.0001),
+        'warmup_bars': backtest_config.get('warmup_bars', 100),
+    }
+
+    optimizer = ParameterOptimizer(
+        strategy_class, config, ohlcv, param_space,
+        objective=args.objective,
+        min_trades=optimizer_config.get('min_trades', 1),
+        max_workers=args.workers,
+        backtest_kwargs=backtest_kwargs,
+        seed=args.seed
+    )
+    results = optimizer.run(args.method, args.trials)
+
+    output = args.output or os.path.join(
+        optimizer_config.get('output_dir', 'optimize_results'),
+        f"{args.strategy}_{args.symbol}_{args.timeframe}_{datetime.datetime.now():%Y%m%d_%H%M%S}.csv")
+    optimizer.save(output)
+
+    print("=" * 50)
+    print(f"策略: {args.strategy}  交易对: {args.symbol}  周期: {args.timeframe}  K线数: {len(ohlcv)}")
+    print(f"寻优方式: {args.method}  评估组合数: {len(results)}  排序目标: {args.objective}")
+    for rank, item in enumerate(results[:args.top], 1):
+        metrics = item['metrics']
+        if 'error' in metrics:
+            print(f"{rank:>3}. {item['params']}  回测失败: {metrics['error']}")
+            continue
+        print(f"{rank:>3}. {item['params']}  目标值: {item['score']:.4f}  收益率: {metrics['total_return']:.2%}  "
+              f"最大回撤: {metrics['max_drawdown']:.2%}  交易次数: {metrics['trades']}  胜率: {metrics['win_rate']:.2%}")
+    print(f"完整结果已写入 {output}")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
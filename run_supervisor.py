@@ -0,0 +1,50 @@
+"""
+多账户多交易对运行脚本
+
+在一个进程中运行supervisor_config中配置的所有(账户, 交易对, 策略)实例和各账户的止盈止损监控器，
+代替每个账户目录分别用pm2启动main.py和tp_sl_monitor.py
+
+使用方法:
+    python run_supervisor.py                 # 按supervisor_config运行
+    python run_supervisor.py --no-monitor    # 不在本进程中运行止盈止损监控器
+    pm2 start python3 -n okx_supervisor -- run_supervisor.py
+"""
+
+import argparse
+import traceback
+from core.supervisor import Supervisor
+from core.logger_manager import logger_manager
+from config.config import supervisor_config, trading_config, position_config
+
+
+def main():
+    """主函数，处理命令行参数"""
+    parser = argparse.ArgumentParser(description='多账户多交易对运行器')
+    parser.add_argument('--no-monitor', action='store_true', help='不运行止盈止损监控器')
+    parser.add_argument('--workers', type=int, default=supervisor_config.get('max_workers', 8), help='同时运行的策略实例数上限')
+    args = parser.parse_args()
+
+    config = {**supervisor_config, 'max_workers': args.workers}
+    if args.no_monitor:
+        config['tp_sl_monitor'] = False
+
+    logger = logger_manager.get_logger("supervisor")
+    logger.info("=" * 50)
+    logger.info("OKX量化交易框架 - 多账户运行器启动")
+    logger.info("=" * 50)
+
+    supervisor = None
+    try:
+        supervisor = Supervisor(config, trading_config, position_config)
+        supervisor.run()
+    except KeyboardInterrupt:
+        logger.info("\n用户中断，程序结束")
+        if supervisor:
+            supervisor.stop()
+    except Exception as e:
+        logger.error(f"运行器发生错误: {str(e)}")
+        logger.error(traceback.format_exc())
+
+
+if __name__ == "__main__":
+    main()
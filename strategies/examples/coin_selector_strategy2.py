@@ -24,6 +24,9 @@ okx u本位择时策略实盘框架
 
 from core.strategy_template import StrategyTemplate
 from core.signal_types import BUY, SELL, OPEN_LONG, OPEN_SHORT
+from core.batch_fetcher import BatchOhlcvFetcher
+from core.coin_scoring import CoinScoringEngine
+from core.instrument_registry import InstrumentRegistry
 import pandas as pd
 import numpy as np
 import time
@@ -80,6 +83,13 @@ class CoinSelectorStrategy2(StrategyTemplate):
         self.rsi_period = config.get('rsi_period', 14)
         self.atr_period = config.get('atr_period', 14)
 
+        # K线并发获取配置
+        self.fetch_workers = config.get('fetch_workers', 8)  # 并发线程数
+        self.fetch_rate = config.get('fetch_rate', 15)  # 每秒最多请求次数
+
+        # 是否使用向量化评分引擎一次性计算所有币种的评分
+        self.vectorized_scoring = config.get('vectorized_scoring', True)
+
         # 选币权重配置
         self.weights = {
             'volume': config.get('volume_weight', 0.2),
@@ -345,6 +355,14 @@ class CoinSelectorStrategy2(StrategyTemplate):
         try:
             self.logger.info("正在获取所有可交易的U本位永续合约...")
 
+            # 优先从合约规格索引中筛选，不用再请求交易所
+            registry = InstrumentRegistry.get_instance(self.trader)
+            if registry:
+                usd_perpetuals = [symbol for symbol in registry.symbols() if symbol.endswith('-USDT-SWAP')]
+                if usd_perpetuals:
+                    self.logger.info(f"成功获取{len(usd_perpetuals)}个可交易的U本位永续合约")
+                    return usd_perpetuals
+
             # 获取所有合约信息
             instruments = self.trader.get_instruments("SWAP")
 
@@ -414,10 +432,26 @@ class CoinSelectorStrategy2(StrategyTemplate):
         """
         coin_metrics = []
 
+        # 并发获取BTC和所有候选币种的K线数据
+        fetcher = BatchOhlcvFetcher(self.trader, self.timeframe, limit=100,
+                                    max_workers=self.fetch_workers, rate=self.fetch_rate,
+                                    store=self.data_feed.store)
+        klines_map = fetcher.fetch(["BTC-USDT-SWAP"] + list(symbols))
+
         # 获取BTC数据作为基准
-        btc_klines = self.trader.fetch_ohlcv("BTC-USDT-SWAP", self.timeframe, 100)
+        btc_klines = klines_map.get("BTC-USDT-SWAP")
+
+        # 向量化评分：所有币种堆叠成矩阵一次计算
+        if self.vectorized_scoring:
+            engine = CoinScoringEngine(self.selection_mode, self.fast_ema, self.slow_ema,
+                                       self.rsi_period, self.atr_period)
+            coin_metrics = engine.score({symbol: klines_map.get(symbol) for symbol in symbols},
+                                        btc_klines, self.weights)
+            self.logger.info(f"向量化评分完成，共 {len(coin_metrics)}/{len(symbols)} 个币种K线数据充足")
+            return coin_metrics
+
         btc_df = None
-        if btc_klines and len(btc_klines) > 30:
+        if btc_klines is not None and len(btc_klines) > 30:
             # 创建DataFrame并指定列名
             btc_df = pd.DataFrame(btc_klines, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
             btc_df['close'] = btc_df['close'].astype(float)
@@ -425,16 +459,11 @@ class CoinSelectorStrategy2(StrategyTemplate):
         # 计算每个币种的指标
         for i, symbol in enumerate(symbols):
             try:
-                # 添加请求间隔，避免API请求过于频繁
-                if i > 0:
-                    time.sleep(1)  # 每次请求间隔1秒
-
-                self.logger.info(f"正在获取第{i + 1}/{len(symbols)}个币种 {symbol} 的K线数据")
+                self.logger.info(f"正在计算第{i + 1}/{len(symbols)}个币种 {symbol} 的指标")
 
-                # 获取K线数据
-                klines = self.trader.fetch_ohlcv(symbol, self.timeframe, 100)
+                klines = klines_map.get(symbol)
 
-                if not klines or len(klines) < 30:
+                if klines is None or len(klines) < 30:
                     self.logger.warning(f"{symbol} K线数据不足，跳过")
                     continue
 
@@ -25,7 +25,7 @@ SAR+EMA20策略
 from core.strategy_template import StrategyTemplate
 from core.signal_types import BUY, SELL, OPEN_LONG, OPEN_SHORT, CLOSE_LONG, CLOSE_SHORT, CLOSE_ALL
 import pandas as pd
-import numpy as np
+from indicators.sar_kernel import parabolic_sar
 
 
 class SarEmaXStrategy(StrategyTemplate):
@@ -82,70 +82,8 @@ class SarEmaXStrategy(StrategyTemplate):
 
         # 计算SAR指标
         try:
-            # 初始化SAR数组
-            sar = np.zeros(len(indicators_df))
-            is_uptrend = np.zeros(len(indicators_df), dtype=bool)
-
-            # 设置初始值
-            # 假设开始是下降趋势，SAR在第一根K线的最高价上方
-            is_uptrend[0] = False
-            sar[0] = indicators_df['high'].iloc[0]
-
-            # 记录极值点
-            extreme_point = indicators_df['low'].iloc[0]
-
-            # 当前加速因子
-            acceleration_factor = self.sar_acceleration
-
-            for i in range(1, len(indicators_df)):
-                # 上一个SAR值
-                prev_sar = sar[i - 1]
-
-                # 计算当前的SAR值
-                if is_uptrend[i - 1]:  # 如果前一周期是上升趋势
-                    # SAR值计算 = 前一周期的SAR + AF * (EP - 前一周期的SAR)
-                    sar[i] = prev_sar + acceleration_factor * (extreme_point - prev_sar)
-
-                    # 确保SAR不高于前两个周期的最低价
-                    if i > 1:
-                        sar[i] = min(sar[i], indicators_df['low'].iloc[i - 1], indicators_df['low'].iloc[i - 2])
-
-                    # 检查趋势是否转变
-                    if indicators_df['low'].iloc[i] < sar[i]:
-                        # 趋势转为下降
-                        is_uptrend[i] = False
-                        sar[i] = extreme_point  # SAR值设为之前的极值点
-                        extreme_point = indicators_df['high'].iloc[i]  # 重置极值点
-                        acceleration_factor = self.sar_acceleration  # 重置加速因子
-                    else:
-                        # 维持上升趋势
-                        is_uptrend[i] = True
-                        # 如果创新高，更新极值点和加速因子
-                        if indicators_df['high'].iloc[i] > extreme_point:
-                            extreme_point = indicators_df['high'].iloc[i]
-                            acceleration_factor = min(acceleration_factor + self.sar_acceleration, self.sar_maximum)
-                else:  # 如果前一周期是下降趋势
-                    # SAR值计算
-                    sar[i] = prev_sar + acceleration_factor * (extreme_point - prev_sar)
-
-                    # 确保SAR不低于前两个周期的最高价
-                    if i > 1:
-                        sar[i] = max(sar[i], indicators_df['high'].iloc[i - 1], indicators_df['high'].iloc[i - 2])
-
-                    # 检查趋势是否转变
-                    if indicators_df['high'].iloc[i] > sar[i]:
-                        # 趋势转为上升
-                        is_uptrend[i] = True
-                        sar[i] = extreme_point  # SAR值设为之前的极值点
-                        extreme_point = indicators_df['low'].iloc[i]  # 重置极值点
-                        acceleration_factor = self.sar_acceleration  # 重置加速因子
-                    else:
-                        # 维持下降趋势
-                        is_uptrend[i] = False
-                        # 如果创新低，更新极值点和加速因子
-                        if indicators_df['low'].iloc[i] < extreme_point:
-                            extreme_point = indicators_df['low'].iloc[i]
-                            acceleration_factor = min(acceleration_factor + self.sar_acceleration, self.sar_maximum)
+            sar, is_uptrend = parabolic_sar(indicators_df['high'].to_numpy(), indicators_df['low'].to_numpy(),
+                                            self.sar_acceleration, self.sar_maximum)
 
             # 将计算结果添加到DataFrame
             indicators_df['sar'] = sar
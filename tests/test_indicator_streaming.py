@@ -0,0 +1,76 @@
+"""
+流式指标计算测试
+
+每个支持流式计算的指标：用前一部分K线warmup()，之后逐根update()，
+每根K线的结果应与对完整数据调用calculate()得到的对应行一致
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import create_indicator
+from indicators.base_indicator import RollingWindow
+
+# (指标名称, 参数)
+STREAMING_INDICATORS = [
+    ('SMA', {'period': 20}),
+    ('EMA', {'period': 12}),
+    ('WMA', {'period': 10}),
+    pytest.param('HMA', {'period': 16}, marks=pytest.mark.xfail(
+        raises=ValueError, reason="HMA.calculate()使用的win_type='triangular'不是scipy.signal.windows中的窗口名")),
+    ('RSI', {'period': 14}),
+    ('MACD', {}),
+    ('KDJ', {}),
+    ('BB', {'period': 20, 'std_dev': 2.0}),
+    ('ATR', {'period': 14}),
+    ('ADX', {'period': 14}),
+    ('PSAR', {}),
+]
+
+BARS = 300
+WARMUP_BARS = 60
+
+
+def make_ohlcv(bars=BARS, seed=7):
+    """随机游走生成的K线数据"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, bars)))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, bars))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, bars))
+    volume = rng.uniform(100, 1000, bars)
+    return pd.DataFrame({'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume})
+
+
+@pytest.mark.parametrize('name, params', STREAMING_INDICATORS)
+def test_update_matches_calculate(name, params):
+    df = make_ohlcv()
+    expected = create_indicator(name, **params).calculate(df)
+
+    indicator = create_indicator(name, **params)
+    columns = indicator.get_output_column_names()
+    last = indicator.warmup(df.iloc[:WARMUP_BARS])
+    streamed = [last]
+    for row in df.iloc[WARMUP_BARS:].to_dict('records'):
+        streamed.append(indicator.update(row))
+
+    for column in columns:
+        actual = np.array([values[column] for values in streamed], dtype=np.float64)
+        np.testing.assert_allclose(actual, expected[column].to_numpy()[WARMUP_BARS - 1:],
+                                   rtol=1e-9, atol=1e-9, equal_nan=True, err_msg=f"{name} {column}")
+
+
+def test_rolling_window_matches_pandas():
+    values = make_ohlcv(bars=500)['close'].to_numpy().copy()
+    values[100] = np.nan
+    window = RollingWindow(20)
+    sums, means = [], []
+    for value in values:
+        window.append(value)
+        sums.append(window.sum())
+        means.append(window.mean())
+
+    series = pd.Series(values)
+    np.testing.assert_allclose(sums, series.rolling(20).sum().to_numpy(), rtol=1e-12, equal_nan=True)
+    np.testing.assert_allclose(means, series.rolling(20).mean().to_numpy(), rtol=1e-12, equal_nan=True)
@@ -0,0 +1,150 @@
+"""
+MarketDataStream推送测试
+
+用本地OKX WebSocket服务（core/okx_ws_server.py）代替交易所，
+验证K线确认、标记价格、持仓和订单推送的缓存与回调，以及断线重连后重新订阅
+"""
+
+import time
+
+import pytest
+
+pytest.importorskip('websocket')
+
+from core.okx_websocket import MarketDataStream, FINISHED_ORDERS_KEPT
+from core.okx_ws_server import LocalOkxWsServer
+
+SYMBOL = 'BTC-USDT-SWAP'
+HOUR_MS = 3600 * 1000
+
+
+def wait_until(predicate, timeout=5.0):
+    """等待条件成立，超时返回False"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.fixture
+def server():
+    server = LocalOkxWsServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def stream(server):
+    config = {'public_url': server.url, 'business_url': server.url, 'private_url': server.url,
+              'ping_interval': 20, 'reconnect_delay': 0.1}
+    stream = MarketDataStream('key', 'secret', 'pass', config)
+    yield stream
+    stream.stop()
+
+
+def test_confirmed_candle(server, stream):
+    received = []
+    stream.subscribe_candles(SYMBOL, '1h', received.append)
+    arg = {'channel': 'candle1H', 'instId': SYMBOL}
+    assert wait_until(lambda: server.subscriber_count(arg) == 1)
+
+    server.push_candle(SYMBOL, '1h', [HOUR_MS, 100, 110, 90, 105, 12.5], confirm=False)
+    assert wait_until(lambda: stream.get_latest_candle(SYMBOL, '1h') is not None)
+    assert stream.wait_for_confirmed_candle(SYMBOL, '1h', timeout=0.2, after=0) is None
+
+    server.push_candle(SYMBOL, '1h', [HOUR_MS, 100, 112, 90, 108, 20], confirm=True)
+    row = stream.wait_for_confirmed_candle(SYMBOL, '1h', timeout=5, after=HOUR_MS - 1)
+    assert row == [HOUR_MS, 100.0, 112.0, 90.0, 108.0, 20.0, True]
+    assert [r[6] for r in received] == [False, True]
+
+
+def test_mark_price(server, stream):
+    ticks = []
+    stream.subscribe_mark_price(SYMBOL, ticks.append)
+    assert wait_until(lambda: server.subscriber_count({'channel': 'mark-price', 'instId': SYMBOL}) == 1)
+
+    server.push_mark_price(SYMBOL, 65000.5, 1700000000000)
+    assert wait_until(lambda: stream.get_mark_price(SYMBOL) == 65000.5)
+    assert ticks == [(SYMBOL, 65000.5, 1700000000000)]
+
+
+def test_positions_use_latest_mark_price(server, stream):
+    stream.subscribe_positions()
+    stream.subscribe_mark_price(SYMBOL)
+    assert wait_until(lambda: server.subscriber_count({'channel': 'positions', 'instType': 'SWAP'}) == 1
+                      and server.subscriber_count({'channel': 'mark-price', 'instId': SYMBOL}) == 1)
+
+    server.push_positions([{'instId': SYMBOL, 'posSide': 'long', 'pos': '3', 'avgPx': '60000',
+                            'markPx': '61000', 'lever': '5', 'upl': '30', 'uTime': '1000'}])
+    assert stream.positions_ready.wait(5)
+    positions = stream.get_positions()
+    assert len(positions) == 1
+    assert positions[0]['side'] == 'long' and positions[0]['contracts'] == 3
+    assert positions[0]['markPrice'] == 61000
+
+    server.push_mark_price(SYMBOL, 62000, 2000)
+    assert wait_until(lambda: stream.get_positions()[0]['markPrice'] == 62000)
+
+    # 平仓推送contracts为0，从缓存中移除
+    server.push_positions([{'instId': SYMBOL, 'posSide': 'long', 'pos': '0', 'uTime': '3000'}])
+    assert wait_until(lambda: stream.get_positions() == [])
+
+
+def test_orders_evicted_after_final_state(server, stream):
+    stream.subscribe_orders()
+    assert wait_until(lambda: server.subscriber_count({'channel': 'orders', 'instType': 'SWAP'}) == 1)
+
+    server.push_orders([{'ordId': '1', 'instId': SYMBOL, 'state': 'live'}])
+    assert wait_until(lambda: stream.get_order('1') is not None)
+    assert stream.get_order('1')['state'] == 'live'
+
+    server.push_orders([{'ordId': '1', 'instId': SYMBOL, 'state': 'filled', 'accFillSz': '3'}])
+    assert wait_until(lambda: stream.get_order('1')['state'] == 'filled')
+    assert '1' not in stream._orders
+
+    # 已结束的订单只保留最近的若干条
+    server.push_orders([{'ordId': str(i), 'instId': SYMBOL, 'state': 'canceled'}
+                        for i in range(2, FINISHED_ORDERS_KEPT + 2)])
+    assert wait_until(lambda: stream.get_order(str(FINISHED_ORDERS_KEPT + 1)) is not None)
+    assert stream.get_order('1') is None
+    assert len(stream._finished) == FINISHED_ORDERS_KEPT
+
+
+def test_reconnect_resubscribes(server, stream):
+    stream.subscribe_mark_price(SYMBOL)
+    stream.subscribe_positions()
+    mark_arg = {'channel': 'mark-price', 'instId': SYMBOL}
+    positions_arg = {'channel': 'positions', 'instType': 'SWAP'}
+    assert wait_until(lambda: server.subscriber_count(mark_arg) == 1 and server.subscriber_count(positions_arg) == 1)
+    logins = sum(1 for msg in server.messages if msg.get('op') == 'login')
+
+    server.disconnect_all()
+    assert wait_until(lambda: server.subscriber_count(mark_arg) == 0)
+    assert wait_until(lambda: stream.is_connected and server.subscriber_count(mark_arg) == 1
+                      and server.subscriber_count(positions_arg) == 1)
+    # 私有连接重新登录后再订阅
+    assert sum(1 for msg in server.messages if msg.get('op') == 'login') == logins + 1
+
+    server.push_mark_price(SYMBOL, 70000, 5000)
+    assert wait_until(lambda: stream.get_mark_price(SYMBOL) == 70000)
+
+
+def test_reconnect_rebuilds_positions_from_snapshot(server, stream):
+    stream.subscribe_positions()
+    positions_arg = {'channel': 'positions', 'instType': 'SWAP'}
+    assert wait_until(lambda: server.subscriber_count(positions_arg) == 1)
+    server.push_positions([{'instId': SYMBOL, 'posSide': 'long', 'pos': '3', 'avgPx': '60000', 'uTime': '1000'},
+                           {'instId': 'ETH-USDT-SWAP', 'posSide': 'short', 'pos': '2', 'avgPx': '3000', 'uTime': '1000'}])
+    assert wait_until(lambda: len(stream.get_positions()) == 2)
+
+    # 断线期间BTC持仓被平掉，重连后的全量快照只包含ETH持仓
+    server.disconnect_all()
+    assert wait_until(lambda: server.subscriber_count(positions_arg) == 0)
+    assert wait_until(lambda: server.subscriber_count(positions_arg) == 1)
+    assert not stream.positions_ready.is_set()
+
+    server.push_positions([{'instId': 'ETH-USDT-SWAP', 'posSide': 'short', 'pos': '2', 'avgPx': '3000', 'uTime': '2000'}])
+    assert stream.positions_ready.wait(5)
+    assert [position['symbol'] for position in stream.get_positions()] == ['ETH-USDT-SWAP']
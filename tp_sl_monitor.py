@@ -22,6 +22,7 @@ okx u本位择时策略实盘框架
 """
 
 import time
+import threading
 import traceback
 import logging
 import os
@@ -32,17 +33,22 @@ from typing import Dict, List, Optional, Tuple
 # 导入配置和工具模块
 from config.config import position_config, symbol_position_config, notification_config, trading_config, position_report_config
 from config.tp_sl_config import monitor_config, global_tp_sl_rules
-from config.api_keys import api_config
 from core.trader import OkxTrader
 from core.position_tracker import PositionTracker
+from core.instrument_registry import InstrumentRegistry
 from core.logger_manager import logger_manager
 from core.notification_manager import NotificationManager
+from core.okx_websocket import create_market_stream
+from core.tp_sl_engine import TpSlEngine, calculate_profit_percentage, calculate_trigger_prices
 from core.signal_types import *  # 导入所有信号类型
 
 # 设置日志记录器
 logger = logger_manager.get_logger("tp_sl_monitor")
 trading_logger = logger_manager.get_trade_logger()
 
+# 监控器下的条件单使用此前缀的algoClOrdId，核对时只处理自己下的条件单
+ALGO_CL_ORD_PREFIX = 'lhtpsl'
+
 class TpSlMonitor:
     """
     止盈止损监控器
@@ -51,17 +57,34 @@ class TpSlMonitor:
     并在达到条件时执行平仓操作。
     """
     
-    def __init__(self):
-        """初始化止盈止损监控器"""
+    def __init__(self, api_keys: Optional[Dict] = None, trader: Optional[OkxTrader] = None,
+                 account_alias: Optional[str] = None, shared_stream=None, position_tracker=None,
+                 stream=None):
+        """
+        初始化止盈止损监控器
+        
+        Args:
+            api_keys: API密钥（api_key、secret_key、passphrase），默认使用config/api_keys.py中的api_config
+            trader: 复用已有的OkxTrader，默认按api_keys创建
+            account_alias: 持仓报告中的账户名，默认使用trading_config['account_alias']
+            shared_stream: 复用其公共行情连接的MarketDataStream，多账户同进程运行时传入
+            position_tracker: 账户的持仓跟踪器，默认使用单例，多账户同进程运行时传入
+            stream: 复用账户已有的MarketDataStream（含私有连接），在其上订阅持仓，默认按api_keys创建
+        """
+        if api_keys is None:
+            from config.api_keys import api_config
+            api_keys = api_config
+        self.account_alias = account_alias or trading_config['account_alias']
+        
         # 从api_config导入API密钥并初始化OkxTrader
-        self.trader = OkxTrader(
-            api_config['api_key'],
-            api_config['secret_key'],
-            api_config['passphrase']
+        self.trader = trader or OkxTrader(
+            api_keys['api_key'],
+            api_keys['secret_key'],
+            api_keys['passphrase']
         )
         
         # 获取持仓跟踪器实例
-        self.position_tracker = PositionTracker.get_instance()
+        self.position_tracker = position_tracker or PositionTracker.get_instance()
         
         # 设置持仓跟踪器的trader引用，用于获取实时价格
         self.position_tracker.set_trader(self.trader)
@@ -72,6 +95,33 @@ class TpSlMonitor:
         self.monitor_interval = monitor_config.get('check_interval', 5)
         self.logger = logger
         
+        # 止盈止损引擎：持仓常驻内存，按预先计算的触发价检查每次价格更新
+        self.tp_sl_engine = TpSlEngine()
+        self.reconcile_interval = monitor_config.get('reconcile_interval', 300)
+        self._last_reconcile = 0
+        
+        # exchange模式：在交易所挂条件单，由交易所按标记价格触发平仓，监控器只定期核对
+        self.algo_mode = monitor_config.get('mode', 'local') == 'exchange'
+        self._tick_sizes = {}
+        self._position_signatures = {}
+        self._algo_seq = 0
+        self._known_algo_orders = {}  # (交易对, 持仓方向) -> 上一轮核对时在挂的条件单和对应持仓
+        
+        # 订阅持仓和标记价格推送，价格变动时立即检查；未启用或不可用时按monitor_interval轮询
+        self._wake = threading.Event()
+        self._pending_lock = threading.Lock()
+        self._pending_positions = []
+        self._pending_prices = {}
+        self._price_symbols = set()
+        self.stream = stream or create_market_stream(
+            api_keys['api_key'],
+            api_keys['secret_key'],
+            api_keys['passphrase'],
+            shared=shared_stream
+        )
+        if self.stream:
+            self.stream.subscribe_positions(self._on_position_update)
+        
         # 记录每个交易对最后一次触发止盈止损的时间
         self.last_tp_sl_times = {}
         # 从配置文件中获取止盈止损操作之间的冷却时间
@@ -124,100 +174,146 @@ class TpSlMonitor:
                 
         return config
     
+    def _on_position_update(self, position: Dict) -> None:
+        """
+        持仓推送回调（在WebSocket线程中调用），为新持仓订阅标记价格并唤醒监控循环
+        
+        Args:
+            position: ccxt格式持仓
+        """
+        symbol = position.get('symbol')
+        if self.algo_mode:
+            # 条件单模式只在持仓数量、开仓价或杠杆变化时需要重新核对
+            signature = (position.get('contracts'), position.get('entryPrice'), position.get('leverage'))
+            if self._position_signatures.get((symbol, position.get('side'))) != signature:
+                self._position_signatures[(symbol, position.get('side'))] = signature
+                self._wake.set()
+            return
+        if position.get('contracts', 0) > 0 and symbol not in self._price_symbols:
+            self._price_symbols.add(symbol)
+            self.stream.subscribe_mark_price(symbol, self._on_mark_price)
+        with self._pending_lock:
+            self._pending_positions.append(position)
+        self._wake.set()
+    
+    def _on_mark_price(self, tick: Tuple) -> None:
+        """
+        标记价格推送回调（在WebSocket线程中调用），只保留每个交易对的最新价格
+        
+        Args:
+            tick: (instId, 标记价格, 毫秒时间戳)
+        """
+        with self._pending_lock:
+            self._pending_prices[tick[0]] = tick[1]
+        self._wake.set()
+    
+    def _stream_ready(self) -> bool:
+        """推送连接可用且已收到持仓快照"""
+        return bool(self.stream) and self.stream.is_connected and self.stream.positions_ready.is_set()
+    
+    def _sync_positions(self, positions_list: List[Dict], full: bool, log=None) -> None:
+        """
+        把持仓同步到止盈止损引擎，冷却期内的交易对撤防
+        
+        Args:
+            positions_list: ccxt格式持仓列表
+            full: 是否为全量快照，全量时引擎中不在列表里的持仓会被撤防
+            log: 日志函数，默认debug
+        """
+        log = log or self.logger.debug
+        current_time = time.time()
+        alive = set()
+        
+        for position in positions_list:
+            # 获取交易对符号 - 优先使用info中的instId，这个是交易所原始格式
+            # 如果没有，则回退到position的symbol
+            symbol = None
+            if position and 'info' in position and 'instId' in position['info']:
+                symbol = position['info']['instId']
+            elif position:
+                symbol = position.get('symbol')
+            
+            if not symbol or not position.get('side'):
+                self.logger.warning(f"持仓数据中无法找到交易对符号: {position}")
+                continue
+            
+            side = position['side']
+            if float(position.get('contracts', 0)) <= 0:
+                # 推送的平仓记录
+                self.tp_sl_engine.remove(symbol, side)
+                continue
+            
+            alive.add((symbol, side))
+            position = {**position, 'symbol': symbol}
+            
+            # 更新持仓记录 (仅用于记录历史数据)
+            self.position_tracker.update_position(symbol, position)
+            
+            # 获取交易对配置
+            config = self.get_position_config(symbol)
+            
+            # 检查是否在冷却期内
+            tp_sl_cooldown = config.get('tp_sl_cooldown', self.tp_sl_cooldown)
+            last_tp_sl_time = self.last_tp_sl_times.get(symbol, 0)
+            if last_tp_sl_time > 0 and current_time - last_tp_sl_time < tp_sl_cooldown:
+                remaining_cooldown = int(tp_sl_cooldown - (current_time - last_tp_sl_time))
+                log(f"{symbol} 在冷却期内，还剩 {remaining_cooldown} 秒")
+                self.tp_sl_engine.remove(symbol, side)
+                continue
+            
+            if not self.tp_sl_engine.upsert(position, config):
+                log(f"{symbol} 未启用止盈止损，跳过检查")
+                continue
+            
+            entry = self.tp_sl_engine.get(symbol, side)
+            current_price = float(position.get('markPrice', 0))
+            profit_percentage = calculate_profit_percentage(side, entry['entry_price'], current_price, entry['leverage'])
+            log(f"{symbol} {side} {position.get('contracts')}张 开仓价: {entry['entry_price']}, 当前价: {current_price}, "
+                f"盈亏: {profit_percentage:.2f}%, 杠杆: {entry['leverage']}倍, 止盈触发价: {entry['tp_price']}, 止损触发价: {entry['sl_price']}")
+        
+        if full:
+            self.tp_sl_engine.retain(alive)
+    
+    def _process_tick(self, symbol: str, price: float) -> None:
+        """
+        用最新价格检查一个交易对，只处理触发价被穿越的持仓
+        
+        Args:
+            symbol: 交易对
+            price: 最新标记价格
+        """
+        for trigger in self.tp_sl_engine.on_tick(symbol, price):
+            side = trigger['side']
+            trigger_type = trigger['trigger_type']
+            profit_percentage = trigger['profit_percentage']
+            self.logger.info(f"{symbol} 触发{trigger_type}: 价格 {price} 穿越触发价 {trigger['trigger_price']:.6g}，当前盈亏 {profit_percentage:.2f}%")
+            # 冷却按交易对计算，另一方向的持仓同样撤防
+            self.tp_sl_engine.remove(symbol, 'short' if side == 'long' else 'long')
+            self._execute_tp_sl_trade(symbol, CLOSE_LONG if side == 'long' else CLOSE_SHORT,
+                                      price, trigger['position'], trigger['config'], profit_percentage, trigger_type)
+            # 更新最后执行时间
+            self.last_tp_sl_times[symbol] = time.time()
+    
     def check_positions(self) -> None:
-        """检查所有持仓的止盈止损条件"""
+        """通过REST获取全部持仓，同步到止盈止损引擎并用持仓的标记价格检查一次"""
         try:
             # 获取所有交易对的持仓
             positions_list = self.trader.fetch_all_positions()
+            self._last_reconcile = time.time()
             
             if not positions_list:
                 # 没有持仓，不需要检查
                 self.logger.info("没有持仓，跳过止盈止损检查")
+                self.tp_sl_engine.retain(set())
                 return
             
             self.logger.info(f"获取到 {len(positions_list)} 个持仓")
-            # 获取当前时间用于冷却检查
-            current_time = time.time()
+            self._sync_positions(positions_list, full=True, log=self.logger.info)
             
-            # 处理返回的持仓列表
             for position in positions_list:
-                # 跳过无效持仓
-                if not position or not position.get('side') or float(position.get('contracts', 0)) <= 0:
-                    continue
-                
-                # 获取交易对符号 - 优先使用info中的instId，这个是交易所原始格式
-                # 如果没有，则回退到position的symbol
-                symbol = None
-                if 'info' in position and 'instId' in position['info']:
-                    symbol = position['info']['instId']
-                else:
-                    symbol = position.get('symbol')
-                
-                if not symbol:
-                    self.logger.warning(f"持仓数据中无法找到交易对符号: {position}")
-                    continue
-                
-                # 获取交易对配置
-                config = self.get_position_config(symbol)
-                
-                # 获取交易对特定的冷却时间配置
-                tp_sl_cooldown = config.get('tp_sl_cooldown', self.tp_sl_cooldown)
-                
-                # 检查是否在冷却期内
-                last_tp_sl_time = self.last_tp_sl_times.get(symbol, 0)
-                if last_tp_sl_time > 0 and current_time - last_tp_sl_time < tp_sl_cooldown:
-                    remaining_cooldown = int(tp_sl_cooldown - (current_time - last_tp_sl_time))
-                    self.logger.info(f"{symbol} 在冷却期内，还剩 {remaining_cooldown} 秒")
-                    continue
-                
-                # 获取持仓关键信息
-                side = position.get('side', '')
-                contracts = float(position.get('contracts', 0))
-                entry_price = float(position.get('entryPrice', 0))
-                current_price = float(position.get('markPrice', 0))
-                leverage = float(position.get('leverage', 1))
-                unrealized_pnl = float(position.get('unrealizedPnl', 0))
-                
-                # 计算盈亏百分比
-                profit_percentage = 0
-                if entry_price > 0 and current_price > 0:
-                    if side == 'long':
-                        profit_percentage = (current_price - entry_price) / entry_price * 100 * leverage
-                    else:  # short
-                        profit_percentage = (entry_price - current_price) / entry_price * 100 * leverage
-                
-                self.logger.info(f"检查持仓 {symbol} - {side} - {contracts} 的止盈止损条件")
-                self.logger.info(f"{symbol} 开仓价: {entry_price}, 当前价: {current_price}, 盈亏: {profit_percentage:.2f}%, 杠杆: {leverage}倍")
-                
-                # 更新持仓记录 (仅用于记录历史数据)
-                self.position_tracker.update_position(symbol, position)
-                
-                # 检查是否启用止盈止损
-                if not config.get('enable_take_profit', False) and not config.get('enable_stop_loss', False):
-                    self.logger.info(f"{symbol} 未启用止盈止损，跳过检查")
-                    continue
-                
-                # 获取止盈止损设置
-                tp_percentage = config.get('take_profit_percentage', 0)
-                sl_percentage = config.get('stop_loss_percentage', 0)
-                
-                # 检查止盈条件
-                if config.get('enable_take_profit', False) and tp_percentage > 0 and profit_percentage >= tp_percentage:
-                    self.logger.info(f"{symbol} 触发止盈: 当前盈利 {profit_percentage:.2f}% >= 设定 {tp_percentage}%")
-                    self._execute_tp_sl_trade(symbol, CLOSE_LONG if side == 'long' else CLOSE_SHORT, 
-                                              current_price, position, config, profit_percentage, "止盈")
-                    # 更新最后执行时间
-                    self.last_tp_sl_times[symbol] = current_time
-                
-                # 检查止损条件
-                elif config.get('enable_stop_loss', False) and sl_percentage > 0 and profit_percentage <= -sl_percentage:
-                    self.logger.info(f"{symbol} 触发止损: 当前亏损 {-profit_percentage:.2f}% >= 设定 {sl_percentage}%")
-                    self._execute_tp_sl_trade(symbol, CLOSE_LONG if side == 'long' else CLOSE_SHORT, 
-                                             current_price, position, config, profit_percentage, "止损")
-                    # 更新最后执行时间
-                    self.last_tp_sl_times[symbol] = current_time
-                else:
-                    self.logger.info(f"{symbol} 未触发止盈止损: 当前盈亏 {profit_percentage:.2f}%, 止盈线 {tp_percentage}%, 止损线 {-sl_percentage}%")
+                if position and float(position.get('contracts', 0)) > 0 and float(position.get('markPrice') or 0) > 0:
+                    symbol = position.get('info', {}).get('instId') or position.get('symbol')
+                    self._process_tick(symbol, float(position['markPrice']))
                     
         except Exception as e:
             error_msg = f"检查止盈止损时发生错误: {str(e)}"
@@ -319,15 +415,30 @@ class TpSlMonitor:
         
         try:
             while True:
-                # 检查持仓的止盈止损条件
-                self.check_positions()
+                if self.algo_mode:
+                    # 止盈止损由交易所条件单执行，只核对条件单，持仓推送变化时提前核对
+                    self.reconcile_algo_orders()
+                    if self.position_report_enabled:
+                        self.check_and_send_position_report()
+                    self._wake.wait(self.monitor_interval)
+                    self._wake.clear()
+                    continue
+                
+                # 检查持仓的止盈止损条件：推送可用时用内存持仓对账，每reconcile_interval秒才走一次REST
+                if self._stream_ready() and time.time() - self._last_reconcile < self.reconcile_interval:
+                    self._sync_positions(self.stream.get_positions(), full=True)
+                else:
+                    self.check_positions()
                 
                 # 检查是否需要发送持仓报告
                 if self.position_report_enabled:
                     self.check_and_send_position_report()
                 
                 # 等待下一次检查
-                time.sleep(self.monitor_interval)
+                if self.stream:
+                    self._wait_for_ticks()
+                else:
+                    time.sleep(self.monitor_interval)
                 
         except KeyboardInterrupt:
             self.logger.info("收到停止信号，止盈止损监控器正在停止...")
@@ -345,6 +456,172 @@ class TpSlMonitor:
         finally:
             self.logger.info("止盈止损监控器已停止")
 
+    def _get_tick_size(self, symbol: str) -> float:
+        """获取合约价格精度，获取失败时返回0（不取整）"""
+        if symbol not in self._tick_sizes:
+            registry = InstrumentRegistry.get_instance(self.trader)
+            tick = registry.tick_size(symbol) if registry else None
+            if tick is not None:
+                self._tick_sizes[symbol] = tick
+                return tick
+            response = self.trader.fetch_instrument(symbol)
+            if not response or not response.get('data'):
+                return 0
+            self._tick_sizes[symbol] = float(response['data'][0].get('tickSz') or 0)
+        return self._tick_sizes[symbol]
+    
+    @staticmethod
+    def _round_to_tick(price: Optional[float], tick: float) -> Optional[float]:
+        if price is None or tick <= 0:
+            return price
+        return round(round(price / tick) * tick, 12)
+    
+    @staticmethod
+    def _algo_matches(order: Dict, tp_price: Optional[float], sl_price: Optional[float], tick: float) -> bool:
+        """已挂条件单的触发价是否与目标一致（误差在半个价格精度内）"""
+        tolerance = tick / 2 if tick > 0 else 1e-12
+        for key, target in (('tpTriggerPx', tp_price), ('slTriggerPx', sl_price)):
+            current = float(order.get(key) or 0)
+            if abs(current - (target or 0)) > tolerance:
+                return False
+        return True
+    
+    def reconcile_algo_orders(self) -> None:
+        """
+        exchange模式下核对交易所条件单
+        
+        按当前持仓和止盈止损配置计算触发价，缺少条件单或触发价变化（加仓、改杠杆、改配置）时撤旧挂新，
+        持仓已不存在的条件单撤销。只处理algoClOrdId带ALGO_CL_ORD_PREFIX前缀的条件单。
+        上一轮在挂的条件单和持仓一起消失时查询条件单历史，已触发的发送止盈止损通知并设置冷却时间
+        """
+        try:
+            positions_list = [position for position in self.trader.fetch_all_positions() or []
+                              if position and position.get('side') and float(position.get('contracts', 0)) > 0]
+            existing = {}
+            for order in self.trader.fetch_pending_algo_orders():
+                if (order.get('algoClOrdId') or '').startswith(ALGO_CL_ORD_PREFIX):
+                    existing.setdefault((order['instId'], order.get('posSide')), []).append(order)
+            
+            held = {(position.get('info', {}).get('instId') or position.get('symbol'), position['side'])
+                    for position in positions_list}
+            for key, known in self._known_algo_orders.items():
+                if key not in held and key not in existing:
+                    self._report_algo_trigger(key[0], key[1], known)
+            self._known_algo_orders = {}
+            
+            for position in positions_list:
+                symbol = position.get('info', {}).get('instId') or position.get('symbol')
+                side = position['side']
+                orders = existing.pop((symbol, side), [])
+                
+                config = self.get_position_config(symbol)
+                tp_percentage = config.get('take_profit_percentage', 0) if config.get('enable_take_profit', False) else 0
+                sl_percentage = config.get('stop_loss_percentage', 0) if config.get('enable_stop_loss', False) else 0
+                entry_price = float(position.get('entryPrice', 0))
+                leverage = float(position.get('leverage', 1))
+                known = {'entry_price': entry_price, 'leverage': leverage, 'contracts': float(position['contracts'])}
+                tick = self._get_tick_size(symbol)
+                tp_price, sl_price = (self._round_to_tick(price, tick) for price in
+                                      calculate_trigger_prices(side, entry_price, leverage, tp_percentage, sl_percentage))
+                
+                if tp_price is None and sl_price is None:
+                    if orders:
+                        self.logger.info(f"{symbol} {side} 未启用止盈止损，撤销已挂条件单")
+                        self.trader.cancel_algo_orders(orders)
+                    continue
+                
+                if len(orders) == 1 and self._algo_matches(orders[0], tp_price, sl_price, tick):
+                    self.logger.debug(f"{symbol} {side} 条件单无需调整: 止盈 {tp_price}, 止损 {sl_price}")
+                    self._known_algo_orders[(symbol, side)] = dict(known, algo_id=orders[0]['algoId'])
+                    continue
+                
+                # 冷却时间内不挂新的条件单，与local模式冷却期内不触发止盈止损一致
+                tp_sl_cooldown = config.get('tp_sl_cooldown', self.tp_sl_cooldown)
+                remaining_cooldown = self.last_tp_sl_times.get(symbol, 0) + tp_sl_cooldown - time.time()
+                if not orders and remaining_cooldown > 0:
+                    self.logger.info(f"{symbol} 在冷却期内，剩余 {int(remaining_cooldown)} 秒，暂不挂止盈止损条件单")
+                    continue
+                
+                if orders:
+                    self.trader.cancel_algo_orders(orders)
+                self._algo_seq += 1
+                algo_cl_ord_id = f"{ALGO_CL_ORD_PREFIX}{int(time.time() * 1000)}{self._algo_seq % 1000}"
+                result = self.trader.place_tp_sl_algo(symbol, side, tp_price, sl_price, algo_cl_ord_id)
+                self._known_algo_orders[(symbol, side)] = dict(known, algo_id=result.get('algoId'))
+                self.logger.info(f"{symbol} {side} 已挂止盈止损条件单: 开仓价 {entry_price}, 杠杆 {leverage}倍, "
+                                 f"止盈触发价 {tp_price}, 止损触发价 {sl_price}")
+            
+            # 持仓已经不存在（条件单已触发或被手动平仓）的条件单
+            orphans = [order for orders in existing.values() for order in orders]
+            if orphans:
+                self.logger.info(f"撤销{len(orphans)}个已无持仓的条件单")
+                self.trader.cancel_algo_orders(orphans)
+                
+        except Exception as e:
+            error_msg = f"核对止盈止损条件单时发生错误: {str(e)}"
+            self.logger.error(error_msg)
+            self.logger.error(traceback.format_exc())
+            
+            # 发送错误通知
+            if notification_config.get('notify_on_error', True):
+                self.notification.send_error(error_msg, "止盈止损系统错误")
+
+    def _report_algo_trigger(self, symbol: str, side: str, known: Dict) -> None:
+        """
+        查询消失的条件单，确认是交易所触发的止盈止损后发送通知并设置冷却时间
+        
+        Args:
+            symbol: 交易对
+            side: 持仓方向
+            known: 上一轮核对时记录的条件单ID、开仓价、杠杆和持仓数量
+        """
+        history = self.trader.fetch_algo_order_history(known['algo_id']) if known.get('algo_id') else []
+        if not history or history[0].get('state') != 'effective':
+            self.logger.info(f"{symbol} {side} 持仓已不存在，条件单未触发（手动平仓或已撤销）")
+            return
+        
+        order = history[0]
+        trigger_type = '止盈' if order.get('actualSide') == 'tp' else '止损'
+        price = float(order.get('actualPx') or order.get('triggerPx') or 0)
+        profit_percentage = calculate_profit_percentage(side, known['entry_price'], price, known['leverage'])
+        self.last_tp_sl_times[symbol] = time.time()
+        self.logger.info(f"{symbol} {side} 交易所条件单已触发{trigger_type}: 价格 {price}, 开仓价 {known['entry_price']}, "
+                         f"盈亏 {profit_percentage:.2f}%")
+        
+        if notification_config.get('notify_on_take_profit_stop_loss', True):
+            self.notification.send_take_profit_stop_loss(
+                "止盈止损监控器",
+                symbol,
+                trigger_type,
+                '多头' if side == 'long' else '空头',
+                known['entry_price'],
+                price,
+                known['contracts'],
+                profit_percentage
+            )
+    
+    def _wait_for_ticks(self) -> None:
+        """
+        推送模式下的等待：每次收到价格或持仓推送就交给止盈止损引擎处理，
+        满monitor_interval或推送连接不可用时返回run()做一次对账
+        """
+        deadline = time.time() + self.monitor_interval
+        while self._wake.wait(max(0, deadline - time.time())):
+            self._wake.clear()
+            with self._pending_lock:
+                positions_list, self._pending_positions = self._pending_positions, []
+                prices, self._pending_prices = self._pending_prices, {}
+            try:
+                if positions_list:
+                    self._sync_positions(positions_list, full=False)
+                for symbol, price in prices.items():
+                    self._process_tick(symbol, price)
+            except Exception as e:
+                self.logger.error(f"处理推送时发生错误: {str(e)}")
+                self.logger.error(traceback.format_exc())
+            if not self._stream_ready():
+                return
+
     def generate_position_report(self) -> Tuple[str, float]:
         """
         生成持仓报告
@@ -371,8 +648,7 @@ class TpSlMonitor:
             
             # 报告头部
             now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            account_alias = trading_config['account_alias']
-            report = f"{account_alias}_持仓状态报告 - {now}\n\n"
+            report = f"{self.account_alias}_持仓状态报告 - {now}\n\n"
 
 
             # 添加账户总览